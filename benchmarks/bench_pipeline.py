@@ -0,0 +1,366 @@
+"""Benchmark every stage of the pipeline against a local PostgreSQL.
+
+For each requested size, generates a seeded data set with
+benchmarks.generate_data, builds the schema and migrations in a
+throwaway schema, and times the stages run.py goes through: reading
+each input file, each importer, each query and each exporter. Results
+are written as JSON so runs can be compared, and a previous result
+file can be passed with --baseline to print the change per stage.
+
+The database comes from the same DB_* variables as run.py (e.g. the
+docker-compose service). Everything is created in the schema given by
+--schema, which is dropped first and again at the end. Its name must
+start with 'bench_', and the benchmark marks the schemas it creates
+with a comment and refuses to drop any other, so an existing schema
+such as public is never dropped by mistake.
+
+Importer timings include parsing, since importers consume the file
+while it is read; subtract the matching read stage for the load cost
+alone. Tables are analyzed after loading so query plans do not depend
+on autovacuum timing.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--events 10000,1000000] [--load-mode insert|copy]
+                                        [--formats json,xml,csv] [--output <file>] [--baseline <file>]
+
+Example:
+    python -m benchmarks.bench_pipeline --events 10000,100000,1000000 --load-mode copy
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.generate_data import FILE_FORMATS, generate_dataset
+from config import Config
+from scripts.database import DatabaseManager
+from scripts.exporters import EXPORTERS
+from scripts.exporters.base import BaseQueryExporter
+from scripts.file_handler import FileHandler
+from scripts.importers import LocationImporter, DeviceImporter, EventImporter
+from scripts.importers.base import LOAD_MODES
+from scripts.migrations import MigrationRunner
+from scripts.queries import ALL_QUERIES
+
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SCHEMA_PREFIX = "bench_"
+DEFAULT_SCHEMA = f"{SCHEMA_PREFIX}pipeline"
+SCHEMA_COMMENT = "Created by benchmarks.bench_pipeline; dropped after each run."
+
+
+def timed(stages: List[Dict[str, Any]], name: str, func: Callable[[], Any], rows: Callable[[Any], int]) -> Any:
+    """Run a stage and append its timing to the stage list.
+
+    Args:
+        stages: List receiving the stage record.
+        name: Stage name, e.g. 'import.events'.
+        func: Callable running the stage.
+        rows: Callable computing the stage's row count from its result.
+
+    Returns:
+        Result of func.
+    """
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    result = func()
+    seconds = time.perf_counter() - started
+    count = rows(result)
+    stages.append({
+        "stage": name,
+        "seconds": round(seconds, 6),
+        "cpu_seconds": round(time.process_time() - cpu_started, 6),
+        "rows": count,
+        "rows_per_second": round(count / seconds, 1) if seconds else None,
+    })
+    print(f"  {name:<36}{seconds:>10.3f}s{count:>14,} rows")
+    return result
+
+
+def check_schema_owned(db: DatabaseManager, schema: str) -> bool:
+    """Check that a schema is absent or was created by this benchmark.
+
+    Args:
+        db: Connected DatabaseManager.
+        schema: Name of the benchmark schema.
+
+    Returns:
+        True if the schema exists, False if it does not.
+
+    Raises:
+        RuntimeError: If the schema exists without the benchmark's comment.
+    """
+    row = db.fetch_one(
+        "SELECT obj_description(oid, 'pg_namespace') FROM pg_namespace WHERE nspname = %s;", (schema,)
+    )
+    if row is None:
+        return False
+    if row[0] != SCHEMA_COMMENT:
+        raise RuntimeError(f"Schema {schema} was not created by this benchmark; refusing to drop it.")
+    return True
+
+
+def reset_schema(db_params: Dict[str, str], schema: str) -> None:
+    """Drop and recreate the benchmark schema with tables and migrations.
+
+    Args:
+        db_params: Connection parameters selecting the schema through
+            their search_path option.
+        schema: Name of the benchmark schema.
+
+    Raises:
+        RuntimeError: If the schema exists but was not created by this benchmark.
+    """
+    db = DatabaseManager(db_params)
+    db.connect()
+    try:
+        if check_schema_owned(db, schema):
+            db.execute_query(f"DROP SCHEMA {schema} CASCADE;")
+        db.execute_query(f"CREATE SCHEMA {schema}; COMMENT ON SCHEMA {schema} IS %s;", (SCHEMA_COMMENT,))
+        db.execute_query(SCHEMA_FILE.read_text(encoding="utf-8"))
+        db.commit()
+        MigrationRunner(db).apply_all()
+    finally:
+        db.close()
+
+
+def drop_schema(db_params: Dict[str, str], schema: str) -> None:
+    """Drop the benchmark schema, leaving schemas it did not create alone.
+
+    Args:
+        db_params: Connection parameters.
+        schema: Name of the benchmark schema.
+    """
+    db = DatabaseManager(db_params)
+    db.connect()
+    try:
+        if check_schema_owned(db, schema):
+            db.execute_query(f"DROP SCHEMA {schema} CASCADE;")
+            db.commit()
+    except RuntimeError:
+        pass
+    finally:
+        db.close()
+
+
+def run_size(
+    db_params: Dict[str, str],
+    paths: Dict[str, Path],
+    args: argparse.Namespace,
+    output_dir: Path
+) -> List[Dict[str, Any]]:
+    """Time all stages on one data set.
+
+    Args:
+        db_params: Connection parameters of the benchmark schema.
+        paths: Input files keyed by entity.
+        args: Parsed command-line arguments.
+        output_dir: Directory receiving exported files.
+
+    Returns:
+        Stage records in execution order.
+    """
+    stages: List[Dict[str, Any]] = []
+    reset_schema(db_params, args.schema)
+
+    for name, path in paths.items():
+        timed(stages, f"read.{name}", lambda path=path: sum(1 for _ in FileHandler.iter_records(str(path))), int)
+
+    db = DatabaseManager(db_params)
+    db.connect()
+    try:
+        partition_interval = None if args.partition_interval == "none" else args.partition_interval
+        importers = {
+            "locations": LocationImporter(db, args.load_mode),
+            "devices": DeviceImporter(db, args.load_mode),
+            "events": EventImporter(db, args.load_mode, partition_interval=partition_interval),
+        }
+        for name, importer in importers.items():
+            timed(
+                stages, f"import.{name}",
+                lambda importer=importer, name=name: importer.process_entities(
+                    FileHandler.iter_records(str(paths[name]))
+                ),
+                lambda result: result[0]
+            )
+        db.execute_query("ANALYZE;")
+        db.commit()
+
+        results = {}
+        for query_class in ALL_QUERIES:
+            query = query_class(db)
+            results[query.get_query_name()] = timed(
+                stages, f"query.{query.get_query_name()}", query.execute, len
+            )
+
+        total_rows = sum(len(rows) for rows in results.values())
+        for file_format in args.formats:
+            exporter = EXPORTERS[file_format]()
+            if isinstance(exporter, BaseQueryExporter):
+                directory = output_dir / file_format
+                timed(
+                    stages, f"export.{file_format}",
+                    lambda exporter=exporter, directory=directory: [
+                        exporter.export_query(query_class(db), str(directory)) for query_class in ALL_QUERIES
+                    ],
+                    lambda _: total_rows
+                )
+            else:
+                filepath = output_dir / f"results.{file_format}"
+                timed(
+                    stages, f"export.{file_format}",
+                    lambda exporter=exporter, filepath=filepath: exporter.export(results, str(filepath)),
+                    lambda _: total_rows
+                )
+    finally:
+        db.close()
+
+    return stages
+
+
+def environment(db_params: Dict[str, str]) -> Dict[str, Any]:
+    """Describe the machine and database a run used.
+
+    Args:
+        db_params: Connection parameters.
+
+    Returns:
+        Dictionary with Python, platform, CPU and PostgreSQL details.
+    """
+    db = DatabaseManager(db_params)
+    db.connect()
+    try:
+        server_version = db.fetch_one("SHOW server_version;")[0]
+    finally:
+        db.close()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "postgresql": server_version,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the change of every stage against a baseline result file.
+
+    Args:
+        current: Result document of this run.
+        baseline: Result document of an earlier run.
+    """
+    previous: Dict[Tuple[int, str], float] = {
+        (run["events"], stage["stage"]): stage["seconds"] for run in baseline["runs"] for stage in run["stages"]
+    }
+    print(f"\n{'events':>12}  {'stage':<36}{'baseline':>10}{'current':>10}{'change':>9}")
+    for run in current["runs"]:
+        for stage in run["stages"]:
+            before = previous.get((run["events"], stage["stage"]))
+            if before is None:
+                continue
+            change = f"{(stage['seconds'] - before) / before:+.1%}" if before else "n/a"
+            print(f"{run['events']:>12,}  {stage['stage']:<36}{before:>10.3f}{stage['seconds']:>10.3f}{change:>9}")
+
+
+def parse_size_list(value: str) -> List[int]:
+    """Parse a comma-separated list of sizes such as '10000,1e6'.
+
+    Args:
+        value: Comma-separated sizes.
+
+    Returns:
+        List of integer sizes.
+    """
+    return [int(float(size)) for size in value.split(",") if size]
+
+
+def main() -> None:
+    """Run the benchmark for every requested size and write the results."""
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data")
+    parser.add_argument("--events", type=parse_size_list, default=[10000, 100000],
+                        help="Comma-separated event counts, e.g. 10000,1000000,5e7 (default: 10000,100000)")
+    parser.add_argument("--devices", type=int, default=None,
+                        help="Number of devices (default: events / 100, at least 100)")
+    parser.add_argument("--roots", type=int, default=3, help="Number of top-level locations (default: 3)")
+    parser.add_argument("--depth", type=int, default=4, help="Levels of the location tree (default: 4)")
+    parser.add_argument("--fanout", type=int, default=5, help="Children per location (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--input-format", type=str, default="ndjson", choices=list(FILE_FORMATS),
+                        help="Format of the generated input files (default: ndjson)")
+    parser.add_argument("--load-mode", type=str, default="insert", choices=list(LOAD_MODES),
+                        help="Importer loading strategy (default: insert)")
+    parser.add_argument("--partition-interval", type=str, default="month", choices=["month", "day", "none"],
+                        help="Events partitions created while loading (default: month)")
+    parser.add_argument("--formats", type=lambda value: value.split(","), default=["json", "xml"],
+                        help=f"Comma-separated exporters to time, from {', '.join(EXPORTERS)} (default: json,xml)")
+    parser.add_argument("--schema", type=str, default=DEFAULT_SCHEMA,
+                        help=f"Throwaway schema holding the benchmark tables, dropped before and after the run; "
+                             f"must start with '{SCHEMA_PREFIX}' (default: {DEFAULT_SCHEMA})")
+    parser.add_argument("--data-dir", type=Path, default=None,
+                        help="Keep generated data sets in this directory instead of a temporary one")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Result file (default: benchmarks/results/pipeline-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    if not re.fullmatch(f"{SCHEMA_PREFIX}[a-z0-9_]+", args.schema):
+        parser.error(f"--schema must start with '{SCHEMA_PREFIX}' and use only lowercase letters, digits and "
+                     f"underscores, since it is dropped with CASCADE")
+
+    unknown = [file_format for file_format in args.formats if file_format not in EXPORTERS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+
+    db_params = {**Config.get_db_params(), "options": f"-c search_path={args.schema}"}
+    document: Dict[str, Any] = {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(db_params),
+        "parameters": {
+            key: value for key, value in vars(args).items() if key not in ("data_dir", "output", "baseline")
+        },
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = args.data_dir or Path(tmp)
+        try:
+            for events in args.events:
+                devices = args.devices or max(100, events // 100)
+                data_dir = data_root / f"events-{events}-seed-{args.seed}"
+                print(f"{events:,} events, {devices:,} devices")
+
+                started = time.perf_counter()
+                paths, counts = generate_dataset(
+                    data_dir, events, devices, args.roots, args.depth, args.fanout, args.seed, args.input_format
+                )
+                generate_seconds = time.perf_counter() - started
+
+                stages = run_size(db_params, paths, args, Path(tmp) / f"export-{events}")
+                document["runs"].append({
+                    "events": events,
+                    "counts": counts,
+                    "input_bytes": {name: path.stat().st_size for name, path in paths.items()},
+                    "generate_seconds": round(generate_seconds, 3),
+                    "stages": stages,
+                })
+        finally:
+            drop_schema(db_params, args.schema)
+
+    output = args.output or RESULTS_DIR / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        compare(document, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark the per-row cost of data-layer debug logging.
+
+Compares the f-string debug logs DatabaseManager used to emit on every
+insert and fetch with the lazy, sampled DataTracer calls replacing them.
+Rows are shaped like EventImporter output. Each variant is timed in a
+tight loop without a database, and its cost per row is reported with
+the cost of the bare loop subtracted.
+
+Logging is configured as in run.py, at INFO with a file handler (here
+writing to os.devnull), so the 'debug off' rows show the cost paid on
+every normal run, and the 'debug on' rows the cost of tracing.
+
+Usage:
+    python -m benchmarks.bench_tracing [--rows N] [--repeat N] [--sample-every N]
+"""
+
+import argparse
+import logging
+import os
+import random
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_xml_exporter import best_of
+from benchmarks.generate_data import generate_devices, generate_events
+from scripts.importers.events import EventImporter
+from scripts.queries import AvgBrightnessQuery
+from scripts.tracing import DataTracer, TRACE_LOGGER
+
+TABLE = "events"
+
+
+def generate_rows(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Build event rows as the importer hands them to DatabaseManager.
+
+    Args:
+        count: Number of rows.
+        seed: Random seed for reproducible data.
+
+    Returns:
+        List of transformed event dictionaries.
+    """
+    rng = random.Random(seed)
+    devices = list(generate_devices(max(count // 100, 1), list(range(1, 51)), rng))
+    importer = EventImporter(None)
+    return [importer.transform_data(event) for event in generate_events(count, devices, rng)]
+
+
+def variants(tracer: DataTracer, query: str) -> Dict[str, Callable[[Dict[str, Any]], None]]:
+    """Return the per-row logging calls to compare.
+
+    Args:
+        tracer: Tracer used by the 'after' variants.
+        query: Query text logged by the fetch variants.
+
+    Returns:
+        Dictionary mapping variant names to callables taking a row.
+    """
+    table = TABLE
+    return {
+        "insert, f-string (before)": lambda data: logging.debug(f"Inserted data into {table}: {data}"),
+        "insert, TRACE.row (after)": lambda data: tracer.row(table, data),
+        "fetch, f-string (before)": lambda data: logging.debug(f"Fetched 1 results for query: {query}"),
+        "fetch, TRACE.query (after)": lambda data: tracer.query("Fetched", query, 1),
+    }
+
+
+def time_per_row(rows: List[Dict[str, Any]], repeat: int, call: Callable[[Dict[str, Any]], None]) -> float:
+    """Return the best time per row of calling a function on every row.
+
+    Args:
+        rows: Rows to pass.
+        repeat: Number of runs.
+        call: Function called once per row.
+
+    Returns:
+        Nanoseconds per row.
+    """
+    def run() -> None:
+        for data in rows:
+            call(data)
+
+    return best_of(repeat, run) / len(rows) * 1e9
+
+
+def main() -> None:
+    """Run the benchmark and print the per-row overhead of each variant."""
+    parser = argparse.ArgumentParser(description="Benchmark data-layer debug logging")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per run (default: 200000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant (default: 5)")
+    parser.add_argument(
+        "--sample-every", type=int, default=1000, help="Row sampling interval of the tracer (default: 1000)"
+    )
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows)
+    query = AvgBrightnessQuery(None).get_sql()
+    tracer = DataTracer(TRACE_LOGGER, args.sample_every)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        logging.basicConfig(
+            stream=devnull, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True
+        )
+        baseline = time_per_row(rows, args.repeat, lambda data: None)
+
+        results = []
+        for debug in (False, True):
+            level = logging.DEBUG if debug else logging.INFO
+            logging.getLogger().setLevel(level)
+            tracer.configure(args.sample_every, level)
+            for name, call in variants(tracer, query).items():
+                results.append((name, "on" if debug else "off", time_per_row(rows, args.repeat, call) - baseline))
+
+    print(f"{args.rows} rows, bare loop {baseline:.0f} ns/row, tracer samples 1 row in {args.sample_every}")
+    print(f"{'variant':<30}{'debug':>7}{'ns/row':>12}")
+    for name, debug, overhead in results:
+        print(f"{name:<30}{debug:>7}{overhead:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark the native XML exporter against dicttoxml.
+
+Generates synthetic query results shaped like QueryRunner output,
+serializes them with dicttoxml and with XmlExporter, checks that both
+produce the same document, and reports the best time of each.
+
+Usage:
+    python -m benchmarks.bench_xml_exporter [--rows N] [--repeat N]
+
+dicttoxml is no longer a project dependency; install it separately
+to run the comparison.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from scripts.exporters.xml_exporter import XmlExporter
+
+try:
+    from dicttoxml import dicttoxml
+except ImportError:
+    dicttoxml = None
+
+
+def generate_results(rows: int, seed: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    """Build a results dictionary with the column types used by the queries.
+
+    Args:
+        rows: Number of rows per query.
+        seed: Random seed for reproducible data.
+
+    Returns:
+        Dictionary mapping query names to lists of row dictionaries.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return {
+        "leaf_locations": [
+            {"location_id": i, "location_name": f"Room {i} & Hall <{i % 7}>"}
+            for i in range(rows)
+        ],
+        "average_brightness": [
+            {"location_name": f"Location {i}", "average_brightness": Decimal(rng.randint(0, 10000)) / 100}
+            for i in range(rows)
+        ],
+        "devices_no_events": [
+            {"device_id": f"dev-{i}", "is_smart": rng.random() < 0.5, "last_seen": start + timedelta(minutes=i),
+             "firmware": None}
+            for i in range(rows)
+        ],
+    }
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    """Return the fastest wall-clock time of several runs.
+
+    Args:
+        repeat: Number of runs.
+        func: Callable to time.
+
+    Returns:
+        Best run time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark XML export")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per query (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per serializer (default: 3)")
+    args = parser.parse_args()
+
+    data = generate_results(args.rows)
+    exporter = XmlExporter()
+    native = exporter.convert(data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "results.xml"
+        timings = {
+            "XmlExporter.convert": best_of(args.repeat, lambda: exporter.convert(data)),
+            "XmlExporter.export_stream": best_of(
+                args.repeat, lambda: exporter.export_stream(data.items(), str(path))
+            ),
+        }
+        assert path.read_text(encoding="utf-8") == native, "streamed output differs from convert()"
+
+    if dicttoxml is not None:
+        expected = dicttoxml(data, custom_root="results", attr_type=False).decode("utf-8")
+        assert native == expected, "native output differs from dicttoxml"
+        timings["dicttoxml"] = best_of(
+            args.repeat, lambda: dicttoxml(data, custom_root="results", attr_type=False)
+        )
+    else:
+        print("dicttoxml is not installed; skipping the reference run.")
+
+    total_rows = args.rows * len(data)
+    print(f"{'serializer':<28}{'seconds':>10}{'rows/s':>14}")
+    for name, seconds in timings.items():
+        print(f"{name:<28}{seconds:>10.3f}{total_rows / seconds:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
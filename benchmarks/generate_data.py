@@ -0,0 +1,247 @@
+"""Generate synthetic IoT input files for benchmarks.
+
+Builds a location tree of configurable depth and fan-out, devices with
+a configurable device-type mix, and events with the JSONB details each
+device type reports. The same seed always produces the same files.
+Records are written one at a time, so event files far larger than
+memory can be generated.
+
+Usage:
+    python -m benchmarks.generate_data --output-dir <dir> [--events N] [--devices N]
+                                       [--roots N] [--depth N] [--fanout N] [--seed N]
+                                       [--format ndjson|json]
+
+Example:
+    python -m benchmarks.generate_data --output-dir /tmp/iot-1m --events 1000000
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+LEVEL_NAMES = ["Office Building", "Floor", "Room", "Zone", "Desk"]
+DEVICE_TYPE_MIX = {"Smart Lamp": 0.4, "Thermostat": 0.35, "Leak Sensor": 0.25}
+START_TIME = datetime(2024, 1, 1)
+DEFAULT_DAYS = 90
+SILENT_DEVICE_RATE = 0.02
+DUPLICATE_EVENT_RATE = 0.01
+FILE_FORMATS = {"ndjson": ".ndjson", "json": ".json"}
+
+
+def generate_locations(roots: int, depth: int, fanout: int) -> Iterator[Dict[str, Any]]:
+    """Generate a location hierarchy breadth-first.
+
+    Roots reference themselves as parent, as in jsons/locations.json.
+
+    Args:
+        roots: Number of top-level locations.
+        depth: Number of levels, including the roots.
+        fanout: Number of children of every non-leaf location.
+
+    Yields:
+        Location dictionaries with location_id, parent_location_id and
+        location_name keys.
+    """
+    next_id = 1
+    level = []
+    for _ in range(roots):
+        level.append(next_id)
+        yield {"location_id": next_id, "parent_location_id": next_id, "location_name": f"{LEVEL_NAMES[0]} {next_id}"}
+        next_id += 1
+
+    for depth_index in range(1, depth):
+        name = LEVEL_NAMES[min(depth_index, len(LEVEL_NAMES) - 1)]
+        children = []
+        for parent_id in level:
+            for _ in range(fanout):
+                children.append(next_id)
+                yield {"location_id": next_id, "parent_location_id": parent_id, "location_name": f"{name} {next_id}"}
+                next_id += 1
+        level = children
+
+
+def generate_devices(
+    count: int,
+    location_ids: List[int],
+    rng: random.Random,
+    type_mix: Dict[str, float] = DEVICE_TYPE_MIX
+) -> List[Dict[str, Any]]:
+    """Generate devices placed at random locations.
+
+    Args:
+        count: Number of devices.
+        location_ids: Locations the devices are placed in.
+        rng: Seeded random generator.
+        type_mix: Device types mapped to their share of the devices.
+
+    Returns:
+        Device dictionaries with device_id, device_type, device_name
+        and location_id keys.
+    """
+    types = list(type_mix)
+    weights = list(type_mix.values())
+    return [
+        {
+            "device_id": f"dev-{i}",
+            "device_type": device_type,
+            "device_name": f"{device_type} {i}",
+            "location_id": rng.choice(location_ids),
+        }
+        for i, device_type in enumerate(rng.choices(types, weights, k=count))
+    ]
+
+
+def event_details(device_type: str, rng: random.Random) -> Dict[str, Any]:
+    """Build the type-specific details of an event.
+
+    Args:
+        device_type: Type of the reporting device.
+        rng: Seeded random generator.
+
+    Returns:
+        Details dictionary without device_id and timestamp.
+    """
+    if device_type == "Smart Lamp":
+        status = rng.choice(("on", "off"))
+        details = {"new_status": status}
+        if status == "on":
+            details["brightness"] = rng.randint(1, 100)
+        return details
+    if device_type == "Leak Sensor":
+        return {"leak_detected": rng.random() < 0.02, "battery": rng.randint(5, 100)}
+    return {"temperature": round(rng.uniform(16.0, 28.0), 1), "humidity": rng.randint(20, 70)}
+
+
+def generate_events(
+    count: int,
+    devices: List[Dict[str, Any]],
+    rng: random.Random,
+    days: int = DEFAULT_DAYS
+) -> Iterator[Dict[str, Any]]:
+    """Generate events of the devices over a time window.
+
+    A small share of devices never reports, so DevicesNoEventsQuery has
+    results, and about one event in a hundred repeats an earlier event
+    id with the same details, as retried deliveries do.
+
+    Args:
+        count: Number of events, including duplicates.
+        devices: Devices reporting the events.
+        rng: Seeded random generator.
+        days: Length of the time window starting at START_TIME.
+
+    Yields:
+        Event dictionaries with event_id and nested details.
+    """
+    reporting = devices[:max(1, int(len(devices) * (1 - SILENT_DEVICE_RATE)))]
+    seconds = days * 24 * 3600
+    previous = None
+    for i in range(count):
+        if previous is not None and rng.random() < DUPLICATE_EVENT_RATE:
+            yield previous
+            continue
+        device = rng.choice(reporting)
+        details = {
+            "device_id": device["device_id"],
+            "timestamp": (START_TIME + timedelta(seconds=rng.randrange(seconds))).isoformat(),
+        }
+        details.update(event_details(device["device_type"], rng))
+        previous = {"event_id": f"evt-{i}", "details": details}
+        yield previous
+
+
+def write_records(records: Iterable[Dict[str, Any]], path: Path, file_format: str) -> int:
+    """Write records as NDJSON or as a JSON array.
+
+    Args:
+        records: Records to write.
+        path: Destination file.
+        file_format: One of FILE_FORMATS.
+
+    Returns:
+        Number of written records.
+    """
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        if file_format == "json":
+            file.write("[\n")
+        for record in records:
+            if file_format == "json" and written:
+                file.write(",\n")
+            file.write(json.dumps(record))
+            if file_format == "ndjson":
+                file.write("\n")
+            written += 1
+        if file_format == "json":
+            file.write("\n]\n")
+    return written
+
+
+def generate_dataset(
+    output_dir: Path,
+    events: int,
+    devices: int,
+    roots: int = 3,
+    depth: int = 4,
+    fanout: int = 5,
+    seed: int = 42,
+    file_format: str = "ndjson"
+) -> Tuple[Dict[str, Path], Dict[str, int]]:
+    """Write locations, devices and events files.
+
+    Args:
+        output_dir: Directory receiving the files; created if missing.
+        events: Number of events.
+        devices: Number of devices.
+        roots: Number of top-level locations.
+        depth: Number of location levels.
+        fanout: Children per non-leaf location.
+        seed: Random seed.
+        file_format: One of FILE_FORMATS.
+
+    Returns:
+        Tuple of (paths, counts), both keyed by 'locations', 'devices'
+        and 'events'.
+    """
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extension = FILE_FORMATS[file_format]
+    paths = {name: output_dir / f"{name}{extension}" for name in ("locations", "devices", "events")}
+
+    locations = list(generate_locations(roots, depth, fanout))
+    device_rows = generate_devices(devices, [location["location_id"] for location in locations], rng)
+    counts = {
+        "locations": write_records(locations, paths["locations"], file_format),
+        "devices": write_records(device_rows, paths["devices"], file_format),
+        "events": write_records(generate_events(events, device_rows, rng), paths["events"], file_format),
+    }
+    return paths, counts
+
+
+def main() -> None:
+    """Generate a data set from command-line arguments."""
+    parser = argparse.ArgumentParser(description="Generate synthetic IoT input files")
+    parser.add_argument("--output-dir", type=Path, required=True, help="Directory receiving the files")
+    parser.add_argument("--events", type=int, default=10000, help="Number of events (default: 10000)")
+    parser.add_argument("--devices", type=int, default=1000, help="Number of devices (default: 1000)")
+    parser.add_argument("--roots", type=int, default=3, help="Number of top-level locations (default: 3)")
+    parser.add_argument("--depth", type=int, default=4, help="Levels of the location tree (default: 4)")
+    parser.add_argument("--fanout", type=int, default=5, help="Children per location (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--format", type=str, default="ndjson", choices=list(FILE_FORMATS),
+                        help="File format (default: ndjson)")
+    args = parser.parse_args()
+
+    paths, counts = generate_dataset(
+        args.output_dir, args.events, args.devices, args.roots, args.depth, args.fanout, args.seed, args.format
+    )
+    for name, path in paths.items():
+        print(f"{counts[name]:>12,} {name:<10} {path}")
+
+
+if __name__ == "__main__":
+    main()
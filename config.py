@@ -24,6 +24,8 @@ class Config:
         DB_PASSWORD: Database password from DB_PASSWORD env variable.
         DB_HOST: Database host, defaults to 'localhost'.
         DB_PORT: Database port, defaults to '5432'.
+        DB_POOL_MIN: Connections opened when a pool is created, defaults to 1.
+        DB_POOL_MAX: Upper limit of pooled connections, defaults to 10.
     """
 
     DB_NAME = os.getenv("DB_NAME")
@@ -31,6 +33,8 @@ class Config:
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_PORT = os.getenv("DB_PORT", "5432")
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
 
     @classmethod
     def get_db_params(cls) -> dict:
@@ -47,3 +51,16 @@ class Config:
             "host": cls.DB_HOST,
             "port": cls.DB_PORT
         }
+
+    @classmethod
+    def get_pool_params(cls) -> dict:
+        """Generate connection pool size parameters.
+
+        Returns:
+            Dictionary with keys: minconn, maxconn.
+            Compatible with DatabaseManager's pool_params argument.
+        """
+        return {
+            "minconn": cls.DB_POOL_MIN,
+            "maxconn": cls.DB_POOL_MAX
+        }
@@ -0,0 +1,25 @@
+-- 001_query_indexes.sql
+-- Indexes for the joins and JSONB predicates used by the analytical queries.
+-- Expressions must match the query text exactly for the planner to use them.
+
+-- Foreign keys: PostgreSQL does not index the referencing side automatically.
+CREATE INDEX IF NOT EXISTS idx_devices_location_id ON devices (location_id);
+CREATE INDEX IF NOT EXISTS idx_events_device_id ON events (device_id);
+
+-- Device type filters (SmartLampEvents, AvgBrightness, TopSmartLampLocations).
+CREATE INDEX IF NOT EXISTS idx_devices_device_type ON devices (device_type);
+CREATE INDEX IF NOT EXISTS idx_devices_smart_lamp ON devices (device_id, location_id)
+    WHERE device_type = 'Smart Lamp';
+
+-- Lamps switched on, with their brightness (SmartLampEvents, AvgBrightness).
+-- Brightness is indexed as text: index expressions are evaluated on every insert,
+-- so a cast would reject any 'on' event whose brightness is not an integer.
+CREATE INDEX IF NOT EXISTS idx_events_lamp_on ON events (device_id, (details->>'brightness'))
+    WHERE details->>'new_status' = 'on';
+
+-- Leak events (LeakLocations).
+CREATE INDEX IF NOT EXISTS idx_events_leak ON events (device_id)
+    WHERE details->>'leak_detected' = 'true';
+
+ANALYZE devices;
+ANALYZE events;
@@ -0,0 +1,41 @@
+-- 002_rollup_tables.sql
+-- Pre-aggregated rollups read by AvgBrightness and TopSmartLampLocations.
+-- DeviceImporter and EventImporter add newly inserted rows to them in the
+-- same statement as the load; existing data is backfilled here once.
+
+-- Smart Lamp count per location (TopSmartLampLocations).
+CREATE TABLE IF NOT EXISTS location_lamp_counts (
+    location_id VARCHAR(50) PRIMARY KEY REFERENCES locations(location_id),
+    lamp_count INTEGER NOT NULL
+);
+
+-- Brightness of Smart Lamp on events per location and day (AvgBrightness).
+-- brightness_count only counts events that carry an integer brightness, as AVG
+-- does; other values are skipped rather than failing the cast.
+CREATE TABLE IF NOT EXISTS location_brightness_daily (
+    location_id VARCHAR(50) NOT NULL REFERENCES locations(location_id),
+    day DATE NOT NULL,
+    brightness_sum BIGINT NOT NULL,
+    brightness_count BIGINT NOT NULL,
+    PRIMARY KEY (location_id, day)
+);
+
+INSERT INTO location_lamp_counts (location_id, lamp_count)
+SELECT location_id, COUNT(*)
+FROM devices
+WHERE device_type = 'Smart Lamp'
+AND location_id IS NOT NULL
+GROUP BY location_id
+ON CONFLICT (location_id) DO NOTHING;
+
+INSERT INTO location_brightness_daily (location_id, day, brightness_sum, brightness_count)
+SELECT d.location_id, e.timestamp::date,
+       COALESCE(SUM(CASE WHEN e.details->>'brightness' ~ '^-?\d+$' THEN (e.details->>'brightness')::int END), 0),
+       COUNT(CASE WHEN e.details->>'brightness' ~ '^-?\d+$' THEN (e.details->>'brightness')::int END)
+FROM events e
+JOIN devices d ON d.device_id = e.device_id
+WHERE d.device_type = 'Smart Lamp'
+AND d.location_id IS NOT NULL
+AND e.details->>'new_status' = 'on'
+GROUP BY d.location_id, e.timestamp::date
+ON CONFLICT (location_id, day) DO NOTHING;
@@ -0,0 +1,13 @@
+-- 003_data_version.sql
+-- Single-row counter bumped by the importers and retention whenever they
+-- change the data, as the last statement before their commit. Cached query
+-- results are keyed on it, so they are reused until new data is committed.
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO data_version (id, version) VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
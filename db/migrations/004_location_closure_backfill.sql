@@ -0,0 +1,34 @@
+-- 004_location_closure_backfill.sql
+-- LeafLocations and LowestSublocations read only location_closure, which
+-- LocationImporter fills for the locations it inserts. Locations loaded
+-- before the table existed are added here once, walking every parent
+-- chain: a depth 0 row per location plus one row per ancestor.
+
+CREATE TABLE IF NOT EXISTS location_closure (
+    ancestor_id VARCHAR(50),
+    descendant_id VARCHAR(50),
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES locations(location_id),
+    FOREIGN KEY (descendant_id) REFERENCES locations(location_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_location_closure_ancestor_depth ON location_closure (ancestor_id, depth);
+
+-- path guards against parent cycles, which the foreign key does not prevent.
+INSERT INTO location_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE chain (ancestor_id, descendant_id, depth, path) AS (
+    SELECT location_id, location_id, 0, ARRAY[location_id]::VARCHAR(50)[]
+    FROM locations
+    UNION ALL
+    SELECT l.parent_location_id, c.descendant_id, c.depth + 1, (c.path || l.parent_location_id)::VARCHAR(50)[]
+    FROM chain c
+    JOIN locations l ON l.location_id = c.ancestor_id
+    WHERE l.parent_location_id IS NOT NULL
+    AND NOT l.parent_location_id = ANY(c.path)
+)
+SELECT ancestor_id, descendant_id, depth
+FROM chain
+ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+
+ANALYZE location_closure;
@@ -0,0 +1,10 @@
+-- 005_lamp_index_text.sql
+-- Earlier versions of 001 indexed (details->>'brightness')::int. Index
+-- expressions are evaluated on every insert, so any event with status 'on'
+-- and a non-integer brightness, from any device type, failed the whole load.
+-- Rebuild the index with the text value, as 001 now creates it.
+
+DROP INDEX IF EXISTS idx_events_lamp_on;
+
+CREATE INDEX idx_events_lamp_on ON events (device_id, (details->>'brightness'))
+    WHERE details->>'new_status' = 'on';
@@ -0,0 +1,49 @@
+-- 006_partition_events.sql
+-- Databases created before events was partitioned have a plain events
+-- table, which EventImporter cannot create partitions for. Convert it:
+-- the existing table becomes the default partition of a new partitioned
+-- events table without copying rows, and EventImporter moves its rows
+-- into monthly or daily partitions as it creates them. No-op when events
+-- is already partitioned.
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'events'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM events WHERE timestamp IS NULL) THEN
+        RAISE EXCEPTION 'events has rows without a timestamp, which cannot be partitioned'
+            USING HINT = 'Set or delete them, e.g. DELETE FROM events WHERE timestamp IS NULL, and rerun.';
+    END IF;
+
+    -- Index names are unique per schema; the parent recreates them below.
+    DROP INDEX IF EXISTS idx_events_device_id;
+    DROP INDEX IF EXISTS idx_events_lamp_on;
+    DROP INDEX IF EXISTS idx_events_leak;
+
+    -- A partition can only have the parent's primary key.
+    ALTER TABLE events DROP CONSTRAINT IF EXISTS events_pkey;
+    ALTER TABLE events ALTER COLUMN event_id SET NOT NULL, ALTER COLUMN timestamp SET NOT NULL;
+    ALTER TABLE events RENAME TO events_default;
+
+    CREATE TABLE events (
+        event_id VARCHAR(50) NOT NULL,
+        device_id VARCHAR(50),
+        timestamp TIMESTAMP NOT NULL,
+        details JSONB,
+        PRIMARY KEY (event_id, timestamp),
+        FOREIGN KEY (device_id) REFERENCES devices(device_id)
+    ) PARTITION BY RANGE (timestamp);
+
+    ALTER TABLE events ATTACH PARTITION events_default DEFAULT;
+
+    CREATE INDEX idx_events_device_id ON events (device_id);
+    CREATE INDEX idx_events_lamp_on ON events (device_id, (details->>'brightness'))
+        WHERE details->>'new_status' = 'on';
+    CREATE INDEX idx_events_leak ON events (device_id)
+        WHERE details->>'leak_detected' = 'true';
+END
+$$;
+
+ANALYZE events;
@@ -0,0 +1,38 @@
+-- 007_event_id_guard.sql
+-- The partitioned events table can only enforce (event_id, timestamp) as
+-- its key, so a redelivered event with a different timestamp would be
+-- stored twice and counted twice by the rollups. event_ids is not
+-- partitioned and holds one row per stored event_id. A BEFORE INSERT
+-- trigger claims the id in the inserting transaction and skips the event
+-- when the id is taken. Skipped rows are not returned by RETURNING, so
+-- the rollups and the inserted/skipped counts only see stored events.
+-- retention.py releases the ids of the partitions it drops.
+
+CREATE TABLE IF NOT EXISTS event_ids (
+    event_id VARCHAR(50) PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_event_ids_timestamp ON event_ids (timestamp);
+
+INSERT INTO event_ids (event_id, timestamp)
+SELECT DISTINCT ON (event_id) event_id, timestamp
+FROM events
+ORDER BY event_id, timestamp
+ON CONFLICT (event_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION claim_event_id() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO event_ids (event_id, timestamp) VALUES (NEW.event_id, NEW.timestamp)
+    ON CONFLICT (event_id) DO NOTHING;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS events_claim_event_id ON events;
+CREATE TRIGGER events_claim_event_id BEFORE INSERT ON events
+    FOR EACH ROW EXECUTE FUNCTION claim_event_id();
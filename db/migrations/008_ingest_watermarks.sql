@@ -0,0 +1,10 @@
+-- 008_ingest_watermarks.sql
+-- High-water marks read and advanced by EventImporter with --incremental.
+-- The table was only added to db/schema.sql, so databases created before
+-- it existed failed on the first incremental run.
+
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source VARCHAR(255) PRIMARY KEY,
+    last_timestamp TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
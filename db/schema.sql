@@ -17,11 +17,33 @@ CREATE TABLE IF NOT EXISTS devices (
     FOREIGN KEY (location_id) REFERENCES locations(location_id)
 );
 
--- 3. Events Table
+-- 3. Events Table (range-partitioned by timestamp; partitions are created by EventImporter)
 CREATE TABLE IF NOT EXISTS events (
-    event_id VARCHAR(50) PRIMARY KEY,
+    event_id VARCHAR(50) NOT NULL,
     device_id VARCHAR(50),
-    timestamp TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL,
     details JSONB,
+    PRIMARY KEY (event_id, timestamp),
     FOREIGN KEY (device_id) REFERENCES devices(device_id)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT;
+
+-- 4. Location Closure Table (one row per ancestor/descendant pair, maintained by LocationImporter)
+CREATE TABLE IF NOT EXISTS location_closure (
+    ancestor_id VARCHAR(50),
+    descendant_id VARCHAR(50),
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES locations(location_id),
+    FOREIGN KEY (descendant_id) REFERENCES locations(location_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_location_closure_ancestor_depth ON location_closure (ancestor_id, depth);
+
+-- 5. Ingest Watermarks Table (newest ingested event timestamp per source, maintained by EventImporter)
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source VARCHAR(255) PRIMARY KEY,
+    last_timestamp TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
@@ -2,10 +2,15 @@
 
 This module provides the command-line interface for the IoT data pipeline.
 It loads data from JSON files into PostgreSQL and executes analytical queries,
-exporting results to JSON or XML format.
+exporting results to JSON, XML, Parquet, CSV or TSV format.
 
 Usage:
-    python run.py --locations <path> --devices <path> --events <path> [--format json|xml]
+    python run.py --locations <path> --devices <path> --events <path> [--format json|xml|parquet|csv|tsv]
+                  [--load-mode insert|copy] [--input-format auto|json|ndjson] [--parse-workers N]
+                  [--parallel N] [--stream] [--incremental] [--source NAME] [--partition-interval month|day|none]
+                  [--shards N] [--cache] [--cache-size-mb N]
+                  [--metrics-file <path>] [--prometheus-file <path>] [--profile] [--trace-sample N]
+                  [--statement-cache-size N]
 
 Example:
     python run.py --locations jsons/locations.json --devices jsons/devices.json \
@@ -17,20 +22,20 @@ import logging
 from pathlib import Path
 
 from config import Config
-from scripts.database import DatabaseManager
-from scripts.file_handler import FileHandler
-from scripts.importers import LocationImporter, DeviceImporter, EventImporter
-from scripts.exporters import JsonExporter, XmlExporter
+from scripts.cache import QueryCache, DEFAULT_MAX_BYTES
+from scripts.database import DatabaseManager, DEFAULT_STATEMENT_CACHE_SIZE
+from scripts.metrics import METRICS
+from scripts.migrations import MigrationRunner
+from scripts.profiling import QueryProfiler, DEFAULT_PLANS_DIR
+from scripts.tracing import TRACE, TRACE_LOGGER
+from scripts.file_handler import FileHandler, INPUT_FORMATS
+from scripts.importers import LocationImporter, DeviceImporter, EventImporter, ShardedEventImporter
+from scripts.importers.base import LOAD_MODES
+from scripts.partitions import PARTITION_INTERVALS
+from scripts.exporters import EXPORTERS
+from scripts.exporters.base import BaseQueryExporter
 from scripts.query_runner import QueryRunner
-from scripts.queries import (
-    LeafLocationsQuery,
-    LowestSublocationsQuery,
-    SmartLampEventsQuery,
-    AvgBrightnessQuery,
-    LeakLocationsQuery,
-    DevicesNoEventsQuery,
-    TopSmartLampLocationsQuery
-)
+from scripts.queries import ALL_QUERIES
 
 BASE_DIR = Path(__file__).resolve().parent
 LOG_FILE = BASE_DIR / "logs" / "etl_pipeline.log"
@@ -43,7 +48,6 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s',
     force=True
 )
-logging.getLogger('dicttoxml').setLevel(logging.WARNING)
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,10 +55,26 @@ def parse_args() -> argparse.Namespace:
 
     Returns:
         Namespace object containing parsed arguments:
-        - locations: Path to locations JSON file.
-        - devices: Path to devices JSON file.
-        - events: Path to events JSON file.
-        - format: Output format ('json' or 'xml'), defaults to 'xml'.
+        - locations: Path to locations JSON or NDJSON file.
+        - devices: Path to devices JSON or NDJSON file.
+        - events: Path to events JSON or NDJSON file.
+        - format: Output format ('json', 'xml', 'parquet', 'csv' or 'tsv'), defaults to 'xml'.
+        - load_mode: Loading strategy ('insert' or 'copy'), defaults to 'insert'.
+        - input_format: Input file format ('auto', 'json' or 'ndjson'), defaults to 'auto'.
+        - parse_workers: Number of processes parsing NDJSON input, defaults to 1.
+        - parallel: Number of queries executed concurrently, defaults to 1.
+        - stream: Whether to stream query rows straight into the output file.
+        - incremental: Whether to skip events behind the events source's high-water mark.
+        - source: Name of the events source for --incremental, defaults to None
+          (the resolved events file path).
+        - partition_interval: Size of the events partitions created while loading
+          ('month', 'day' or 'none'), defaults to 'month'.
+        - shards: Number of processes loading the events file, defaults to 1.
+        - cache: Whether to reuse cached query results for the current data version.
+        - cache_size_mb: Size limit of the result cache in megabytes.
+        - metrics_file: Path of the JSON stage metrics summary.
+        - prometheus_file: Optional path of the metrics in Prometheus text format.
+        - profile: Whether to capture query plans and write a slow-query report.
     """
     parser = argparse.ArgumentParser(
         description="IoT Data Pipeline - Load data and run queries"
@@ -83,11 +103,146 @@ def parse_args() -> argparse.Namespace:
         type=str,
         required=False,
         default="xml",
-        choices=["json", "xml"],
-        help="Output format for query results (default: xml)"
+        choices=list(EXPORTERS),
+        help="Output format for query results; parquet, csv and tsv write one file per query (default: xml)"
+    )
+    parser.add_argument(
+        "--load-mode",
+        type=str,
+        required=False,
+        default="insert",
+        choices=list(LOAD_MODES),
+        help="Loading strategy: row inserts or bulk COPY via a staging table (default: insert)"
+    )
+    parser.add_argument(
+        "--input-format",
+        type=str,
+        required=False,
+        default="auto",
+        choices=list(INPUT_FORMATS),
+        help="Input file format; 'auto' treats .ndjson/.jsonl files as NDJSON (default: auto)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of processes used to parse NDJSON input (default: 1)"
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of queries executed concurrently on pooled connections (default: 1)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream query rows into the output file through server-side cursors "
+             "instead of collecting them in memory (queries run sequentially)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only load events at or after the high-water mark recorded for the events source"
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        required=False,
+        default=None,
+        help="Name the high-water mark of --incremental is kept under, e.g. to share it between "
+             "rotated files of one feed (default: the resolved path of the events file)"
+    )
+    parser.add_argument(
+        "--partition-interval",
+        type=str,
+        required=False,
+        default="month",
+        choices=list(PARTITION_INTERVALS) + ["none"],
+        help="Size of the events partitions created while loading; 'none' leaves "
+             "routing to existing partitions (default: month)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of processes each loading a share of an NDJSON events file in parallel through "
+             "a shared staging table, regardless of --load-mode; the run fails without loading anything "
+             "if any shard fails (default: 1)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse query results cached under output/.cache while no new data has been "
+             "loaded (json and xml without --stream)"
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        required=False,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Size limit of the result cache; least recently used results are evicted "
+             f"(default: {DEFAULT_MAX_BYTES // (1024 * 1024)})"
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        required=False,
+        default="output/metrics.json",
+        help="JSON summary of wall time, CPU time, rows, bytes and peak RSS per stage "
+             "(default: output/metrics.json)"
+    )
+    parser.add_argument(
+        "--prometheus-file",
+        type=str,
+        required=False,
+        default=None,
+        help="Also write the stage metrics in Prometheus text format to this file, "
+             "e.g. for the node exporter's textfile collector"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Run every query once more under EXPLAIN (ANALYZE, BUFFERS) and write the plans "
+             f"and a slow-query report to {DEFAULT_PLANS_DIR}"
+    )
+    parser.add_argument(
+        "--trace-sample",
+        type=int,
+        required=False,
+        default=None,
+        help=f"Write debug traces of the data layer to the log: one row out of every N per table, "
+             f"a summary line per batch and the executed queries, on the '{TRACE_LOGGER}' logger. "
+             f"0 traces batches and queries only (default: off)"
+    )
+    parser.add_argument(
+        "--statement-cache-size",
+        type=int,
+        required=False,
+        default=DEFAULT_STATEMENT_CACHE_SIZE,
+        help="Prepared statements kept per database connection for insert-mode pages; "
+             f"0 disables preparing (default: {DEFAULT_STATEMENT_CACHE_SIZE})"
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.shards > 1 and args.incremental:
+        parser.error("--incremental cannot be combined with --shards")
+    events_format = FileHandler.detect_format(args.events) if args.input_format == "auto" else args.input_format
+    if args.shards > 1 and events_format != "ndjson":
+        parser.error("--shards requires NDJSON events (a .ndjson or .jsonl file, or --input-format ndjson)")
+    if args.source and not args.incremental:
+        parser.error("--source requires --incremental")
+    if args.trace_sample is not None and args.trace_sample < 0:
+        parser.error("--trace-sample must not be negative")
+    if args.statement_cache_size < 0:
+        parser.error("--statement-cache-size must not be negative")
+    return args
 
 
 def main() -> None:
@@ -95,50 +250,74 @@ def main() -> None:
 
     Performs the following steps:
     1. Parses command-line arguments
-    2. Connects to PostgreSQL database
+    2. Connects to PostgreSQL database and applies pending schema migrations
     3. Loads data from JSON files into database tables
     4. Executes all analytical queries
     5. Exports results to the specified format
+    6. Optionally profiles the queries
+    7. Writes the per-stage metrics
     """
     args = parse_args()
+    if args.trace_sample is not None:
+        TRACE.configure(args.trace_sample)
 
     db_config = Config.get_db_params()
-    db = DatabaseManager(db_config)
+    pool_params = Config.get_pool_params() if args.parallel > 1 else None
+    db = DatabaseManager(db_config, pool_params=pool_params, statement_cache_size=args.statement_cache_size)
 
     try:
+        exporter = EXPORTERS[args.format]()
         db.connect()
+        MigrationRunner(db).apply_all()
 
-        locations_data = FileHandler.read_json(args.locations)
-        LocationImporter(db).process_entities(locations_data)
+        locations_data = FileHandler.iter_records(args.locations, args.input_format, args.parse_workers)
+        LocationImporter(db, args.load_mode).process_entities(locations_data)
 
-        devices_data = FileHandler.read_json(args.devices)
-        DeviceImporter(db).process_entities(devices_data)
+        devices_data = FileHandler.iter_records(args.devices, args.input_format, args.parse_workers)
+        DeviceImporter(db, args.load_mode).process_entities(devices_data)
 
-        events_data = FileHandler.read_json(args.events)
-        EventImporter(db).process_entities(events_data)
+        partition_interval = None if args.partition_interval == "none" else args.partition_interval
+        if args.shards > 1:
+            ShardedEventImporter(
+                db, db_config, args.shards, partition_interval=partition_interval
+            ).import_file(args.events, args.input_format)
+        else:
+            events_data = FileHandler.iter_records(args.events, args.input_format, args.parse_workers)
+            events_source = (args.source or str(Path(args.events).resolve())) if args.incremental else None
+            EventImporter(
+                db, args.load_mode, source=events_source, partition_interval=partition_interval
+            ).process_entities(events_data)
 
         logging.info("All ETL processes finished successfully.")
 
-        if args.format == "json":
-            exporter = JsonExporter()
+        cache = None
+        if args.cache:
+            cache = QueryCache(
+                max_bytes=args.cache_size_mb * 1024 * 1024,
+                namespace="{host}:{port}/{dbname}".format(**db_config)
+            )
+        runner = QueryRunner(db, exporter, workers=args.parallel, cache=cache)
+
+        if isinstance(exporter, BaseQueryExporter):
+            output_dir = f"output/{args.format}"
+            runner.export_each(ALL_QUERIES, output_dir)
+            print(f"Results exported to {output_dir}/")
         else:
-            exporter = XmlExporter()
-
-        runner = QueryRunner(db, exporter)
-
-        all_queries = [
-            LeafLocationsQuery,
-            LowestSublocationsQuery,
-            SmartLampEventsQuery,
-            AvgBrightnessQuery,
-            LeakLocationsQuery,
-            DevicesNoEventsQuery,
-            TopSmartLampLocationsQuery
-        ]
-
-        output_file = f"output/results.{args.format}"
-        runner.run_all(all_queries, output_file)
-        print(f"Results exported to {output_file}")
+            output_file = f"output/results.{args.format}"
+            if args.stream:
+                runner.stream_all(ALL_QUERIES, output_file)
+            else:
+                runner.run_all(ALL_QUERIES, output_file)
+            print(f"Results exported to {output_file}")
+
+        if args.profile:
+            runner.profile_all(ALL_QUERIES, QueryProfiler(DEFAULT_PLANS_DIR))
+            print(f"Query plans and report written to {DEFAULT_PLANS_DIR}/")
+
+        METRICS.write_json(args.metrics_file)
+        if args.prometheus_file:
+            METRICS.write_prometheus(args.prometheus_file)
+        print(f"Stage metrics written to {args.metrics_file}")
 
     except Exception as e:
         logging.critical(f"Pipeline failed: {e}")
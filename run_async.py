@@ -0,0 +1,182 @@
+"""IoT Data Pipeline asynchronous CLI application.
+
+This module is an alternate entry point to run.py built on asyncio and
+asyncpg. Parsing of the input files overlaps with the database writes,
+and the analytical queries run concurrently once loading is done.
+Results are exported to JSON or XML, exactly as run.py writes them.
+
+Usage:
+    python run_async.py --locations <path> --devices <path> --events <path> [--format json|xml]
+                        [--input-format auto|json|ndjson] [--parse-workers N] [--concurrency N]
+
+Example:
+    python run_async.py --locations jsons/locations.json --devices jsons/devices.json \
+                        --events jsons/events.json --format json
+"""
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from config import Config
+from scripts.async_pipeline import AsyncPipeline, DEFAULT_CONCURRENCY
+from scripts.database import DatabaseManager
+from scripts.migrations import MigrationRunner
+from scripts.file_handler import FileHandler, INPUT_FORMATS
+from scripts.exporters import JsonExporter, XmlExporter
+from scripts.queries import ALL_QUERIES
+
+BASE_DIR = Path(__file__).resolve().parent
+LOG_FILE = BASE_DIR / "logs" / "etl_pipeline.log"
+LOG_FILE.parent.mkdir(exist_ok=True)
+
+logging.basicConfig(
+    filename=str(LOG_FILE),
+    filemode='a',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    force=True
+)
+
+EXPORTERS = {
+    "json": JsonExporter,
+    "xml": XmlExporter,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments.
+
+    Returns:
+        Namespace object containing parsed arguments:
+        - locations: Path to locations JSON or NDJSON file.
+        - devices: Path to devices JSON or NDJSON file.
+        - events: Path to events JSON or NDJSON file.
+        - format: Output format ('json' or 'xml'), defaults to 'xml'.
+        - input_format: Input file format ('auto', 'json' or 'ndjson'), defaults to 'auto'.
+        - parse_workers: Number of processes parsing NDJSON input, defaults to 1.
+        - concurrency: Number of pooled connections running queries concurrently.
+    """
+    parser = argparse.ArgumentParser(
+        description="IoT Data Pipeline - Load data and run queries with asyncio"
+    )
+
+    parser.add_argument(
+        "--locations",
+        type=str,
+        required=True,
+        help="Path to locations JSON file"
+    )
+    parser.add_argument(
+        "--devices",
+        type=str,
+        required=True,
+        help="Path to devices JSON file"
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        required=True,
+        help="Path to events JSON file"
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        required=False,
+        default="xml",
+        choices=list(EXPORTERS),
+        help="Output format for query results (default: xml)"
+    )
+    parser.add_argument(
+        "--input-format",
+        type=str,
+        required=False,
+        default="auto",
+        choices=list(INPUT_FORMATS),
+        help="Input file format; 'auto' treats .ndjson/.jsonl files as NDJSON (default: auto)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of processes used to parse NDJSON input (default: 1)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        required=False,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of pooled connections; queries run concurrently on them (default: {DEFAULT_CONCURRENCY})"
+    )
+
+    return parser.parse_args()
+
+
+def apply_migrations(db_config: dict) -> None:
+    """Apply pending schema migrations through the synchronous driver.
+
+    Args:
+        db_config: Connection parameters from Config.get_db_params().
+    """
+    db = DatabaseManager(db_config)
+    try:
+        db.connect()
+        MigrationRunner(db).apply_all()
+    finally:
+        db.close()
+
+
+async def run_pipeline(args: argparse.Namespace, db_config: dict) -> dict:
+    """Load the input files and run every query on asyncpg.
+
+    Args:
+        args: Parsed command-line arguments.
+        db_config: Connection parameters from Config.get_db_params().
+
+    Returns:
+        Dictionary of query results keyed by query name.
+    """
+    pipeline = AsyncPipeline(db_config, concurrency=args.concurrency)
+    await pipeline.connect()
+    try:
+        await pipeline.load(
+            FileHandler.iter_records(args.locations, args.input_format, args.parse_workers),
+            FileHandler.iter_records(args.devices, args.input_format, args.parse_workers),
+            FileHandler.iter_records(args.events, args.input_format, args.parse_workers)
+        )
+        logging.info("All async ETL processes finished successfully.")
+        return await pipeline.run_queries(ALL_QUERIES)
+    finally:
+        await pipeline.close()
+
+
+def main() -> None:
+    """Main entry point for the asynchronous IoT data pipeline.
+
+    Performs the following steps:
+    1. Parses command-line arguments
+    2. Applies pending schema migrations
+    3. Loads the JSON files while they are parsed
+    4. Executes all analytical queries concurrently
+    5. Exports results to the specified format
+    """
+    args = parse_args()
+    db_config = Config.get_db_params()
+
+    try:
+        exporter = EXPORTERS[args.format]()
+        apply_migrations(db_config)
+        results = asyncio.run(run_pipeline(args, db_config))
+
+        output_file = f"output/results.{args.format}"
+        exporter.export(results, output_file)
+        print(f"Results exported to {output_file}")
+    except Exception as e:
+        logging.critical(f"Async pipeline failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""Asynchronous load-and-query pipeline built on asyncpg.
+
+This module provides the AsyncPipeline class, an asyncio variant of the
+run.py flow. Input files are parsed and transformed page by page on
+worker threads while the previous page is being written, devices and
+events start parsing while locations load, and once loading is done the
+queries run concurrently on a connection pool.
+
+It reuses the importers' transform_data(), conflict columns and rollup
+SQL and the queries' get_sql(), so both pipelines load and report the
+same data. asyncpg is an optional dependency and is only required when
+this pipeline is used.
+"""
+
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from scripts.cache import BUMP_DATA_VERSION_SQL
+from scripts.database import DEFAULT_PAGE_SIZE
+from scripts.importers import LocationImporter, DeviceImporter, EventImporter
+from scripts.importers.locations import CLOSURE_TABLE, CLOSURE_CONFLICT_COLUMNS
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+DEFAULT_CONCURRENCY = 4
+
+
+def _take(rows: Iterator[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """Read up to size rows from an iterator.
+
+    Args:
+        rows: Iterator over rows.
+        size: Maximum number of rows to read.
+
+    Returns:
+        List of rows, empty when the iterator is exhausted.
+    """
+    return list(islice(rows, size))
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Render a value the way its column's text input function expects.
+
+    Args:
+        value: Transformed row value.
+
+    Returns:
+        Text representation, or None for NULL.
+    """
+    return None if value is None else str(value)
+
+
+def _connect_params(db_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate Config.get_db_params() into asyncpg connection arguments.
+
+    Args:
+        db_params: Dictionary with dbname, user, password, host and port.
+
+    Returns:
+        Keyword arguments for asyncpg.create_pool().
+    """
+    return {
+        "database": db_params.get("dbname"),
+        "user": db_params.get("user"),
+        "password": db_params.get("password"),
+        "host": db_params.get("host"),
+        "port": int(db_params["port"]) if db_params.get("port") else None,
+    }
+
+
+class _PagePrefetcher:
+    """Reads pages from a blocking iterator on a worker thread, one page ahead.
+
+    As soon as a page is handed out the next one is requested, so the
+    iterator's parsing and transformation run while the caller writes.
+    Only one read is in flight at a time, which keeps the iterator
+    single-threaded and memory bounded to two pages.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], page_size: int):
+        """Initialize the prefetcher.
+
+        Args:
+            rows: Iterable of rows, typically a lazy file parser.
+            page_size: Number of rows per page.
+        """
+        self._rows = iter(rows)
+        self._page_size = page_size
+        self._next: Optional[asyncio.Future] = None
+
+    def start(self) -> None:
+        """Start reading the next page if no read is in flight."""
+        if self._next is None:
+            self._next = asyncio.ensure_future(asyncio.to_thread(_take, self._rows, self._page_size))
+
+    def cancel(self) -> None:
+        """Cancel a read in flight, e.g. when loading fails."""
+        if self._next is not None:
+            self._next.cancel()
+            self._next = None
+
+    async def next_page(self) -> List[Dict[str, Any]]:
+        """Return the next page and start reading the one after it.
+
+        Returns:
+            List of rows, empty when the input is exhausted.
+        """
+        self.start()
+        page = await self._next
+        self._next = None
+        if page:
+            self.start()
+        return page
+
+    async def __aiter__(self):
+        """Iterate over the remaining pages.
+
+        Yields:
+            Non-empty lists of rows.
+        """
+        while True:
+            page = await self.next_page()
+            if not page:
+                return
+            yield page
+
+
+class AsyncPipeline:
+    """Loads the IoT data and runs the analytical queries on asyncpg.
+
+    Each entity is loaded in its own transaction, locations together
+    with their closure rows, in the same order as run.py so foreign keys
+    are satisfied. Pages are sent as one INSERT ... SELECT FROM unnest()
+    per page with the importers' ON CONFLICT and rollup clauses. A
+    transaction that inserted rows bumps the data version as its last
+    statement before committing.
+
+    Events are routed to the existing partitions of the events table,
+    or to its default partition; creating partitions is left to run.py.
+
+    Attributes:
+        db_params: Connection parameters from Config.get_db_params().
+        page_size: Number of rows per INSERT statement.
+        concurrency: Size of the connection pool, and so the number of
+            queries running at the same time.
+        pool: asyncpg connection pool, set by connect().
+    """
+
+    def __init__(
+        self,
+        db_params: Dict[str, Any],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            db_params: Connection parameters from Config.get_db_params().
+            page_size: Number of rows per INSERT statement.
+            concurrency: Maximum number of pooled connections.
+
+        Raises:
+            RuntimeError: If asyncpg is not installed.
+        """
+        if asyncpg is None:
+            raise RuntimeError("The async pipeline requires asyncpg. Install it with 'pip install asyncpg'.")
+        self.db_params = db_params
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.pool = None
+        self._column_types: Dict[str, Dict[str, str]] = {}
+
+    async def connect(self) -> None:
+        """Open the connection pool.
+
+        Raises:
+            Exception: If the connection fails.
+        """
+        try:
+            self.pool = await asyncpg.create_pool(
+                min_size=1, max_size=self.concurrency, **_connect_params(self.db_params)
+            )
+        except Exception as e:
+            logging.error(f"Async connection failed: {e}")
+            raise
+        logging.info("Async connection pool established.")
+
+    async def close(self) -> None:
+        """Close the connection pool if it is open."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            logging.info("Async connection pool closed.")
+
+    async def load(
+        self,
+        locations: Iterable[Dict[str, Any]],
+        devices: Iterable[Dict[str, Any]],
+        events: Iterable[Dict[str, Any]]
+    ) -> Dict[str, Tuple[int, int]]:
+        """Load locations, devices and events.
+
+        Devices and events start parsing right away and wait one page
+        ahead while the earlier entities are written.
+
+        Args:
+            locations: Raw location records.
+            devices: Raw device records.
+            events: Raw event records.
+
+        Returns:
+            Dictionary mapping table names to (inserted, skipped) counts.
+
+        Raises:
+            RuntimeError: If connect() has not been called.
+        """
+        if self.pool is None:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        device_importer = DeviceImporter(None)
+        event_importer = EventImporter(None)
+        device_pages = _PagePrefetcher(map(device_importer.transform_data, devices), self.page_size)
+        event_pages = _PagePrefetcher(map(event_importer.transform_data, events), self.page_size)
+        device_pages.start()
+        event_pages.start()
+
+        try:
+            results = await self._load_locations(locations)
+            results[device_importer.get_table_name()] = await self._load_entity(device_importer, device_pages)
+            results[event_importer.get_table_name()] = await self._load_entity(event_importer, event_pages)
+        finally:
+            device_pages.cancel()
+            event_pages.cancel()
+        return results
+
+    async def run_queries(self, queries: List[Type]) -> Dict[str, List[Dict[str, Any]]]:
+        """Execute queries concurrently, each on its own pooled connection.
+
+        Args:
+            queries: List of BaseQuery subclass types to execute.
+
+        Returns:
+            Dictionary of results keyed by query name, in queries order.
+
+        Raises:
+            RuntimeError: If connect() has not been called.
+        """
+        if self.pool is None:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+        results = await asyncio.gather(*(self._run_query(QueryClass(None)) for QueryClass in queries))
+        return dict(results)
+
+    async def _run_query(self, query) -> Tuple[str, List[Dict[str, Any]]]:
+        """Execute a single query.
+
+        Args:
+            query: BaseQuery instance.
+
+        Returns:
+            Tuple of (query name, result rows as dictionaries).
+        """
+        async with self.pool.acquire() as conn:
+            try:
+                rows = await conn.fetch(query.get_sql())
+            except asyncpg.PostgresError as e:
+                logging.error(f"Query {query.get_query_name()} failed: {e}")
+                raise
+        columns = query.get_columns()
+        return query.get_query_name(), [dict(zip(columns, row)) for row in rows]
+
+    async def _load_locations(self, locations: Iterable[Dict[str, Any]]) -> Dict[str, Tuple[int, int]]:
+        """Load locations and their closure rows in one transaction.
+
+        The hierarchy is ordered on a worker thread, since ordering
+        needs every location.
+
+        Args:
+            locations: Raw location records.
+
+        Returns:
+            Dictionary with the locations and closure (inserted, skipped) counts.
+        """
+        importer = LocationImporter(None)
+        ordered = await asyncio.to_thread(lambda: importer.resolve_insert_order(list(locations)))
+        location_pages = _PagePrefetcher(map(importer.transform_data, ordered), self.page_size)
+        closure_pages = _PagePrefetcher(importer.iter_closure_rows(ordered), self.page_size)
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                counts = await self._insert_pages(
+                    conn, importer.get_table_name(), location_pages, importer.get_conflict_column()
+                )
+                closure = await self._insert_pages(conn, CLOSURE_TABLE, closure_pages, CLOSURE_CONFLICT_COLUMNS)
+                if counts[0] or closure[0]:
+                    await conn.execute(BUMP_DATA_VERSION_SQL)
+
+        self._log_load(importer.get_table_name(), counts)
+        self._log_load(CLOSURE_TABLE, closure)
+        return {importer.get_table_name(): counts, CLOSURE_TABLE: closure}
+
+    async def _load_entity(self, importer, pages: _PagePrefetcher) -> Tuple[int, int]:
+        """Load one entity's pages in a transaction.
+
+        Args:
+            importer: BaseImporter describing the target table.
+            pages: Prefetcher over transformed rows.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+        """
+        table = importer.get_table_name()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                counts = await self._insert_pages(
+                    conn, table, pages, importer.get_conflict_column(), importer.get_rollup_sql()
+                )
+                if counts[0]:
+                    await conn.execute(BUMP_DATA_VERSION_SQL)
+
+        self._log_load(table, counts)
+        return counts
+
+    async def _insert_pages(
+        self,
+        conn,
+        table: str,
+        pages: _PagePrefetcher,
+        conflict_column: Optional[str] = None,
+        on_inserted: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Insert every page, one statement per page.
+
+        Args:
+            conn: asyncpg connection inside a transaction.
+            table: Name of the target table.
+            pages: Prefetcher over database-ready rows.
+            conflict_column: Column list for the ON CONFLICT clause.
+            on_inserted: Optional SQL reading the 'inserted' CTE, as in
+                DatabaseManager.insert_many().
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+        """
+        inserted = 0
+        total = 0
+        query = None
+        columns: List[str] = []
+
+        async for page in pages:
+            if query is None:
+                columns = list(page[0].keys())
+                query = await self._insert_sql(conn, table, columns, conflict_column, on_inserted)
+            arrays = [[_as_text(row.get(column)) for row in page] for column in columns]
+            try:
+                inserted += await conn.fetchval(query, *arrays)
+            except asyncpg.PostgresError as e:
+                logging.error(f"Failed to insert into {table}: {e}")
+                raise
+            total += len(page)
+
+        return inserted, total - inserted
+
+    async def _insert_sql(
+        self,
+        conn,
+        table: str,
+        columns: List[str],
+        conflict_column: Optional[str],
+        on_inserted: Optional[str]
+    ) -> str:
+        """Build the INSERT statement for a page of text arrays.
+
+        Each column is sent as a text[] parameter and cast to the
+        column's type, so one statement shape serves every table and
+        asyncpg prepares it once per connection. The cast leaves out
+        length modifiers: an explicit cast to VARCHAR(50) truncates
+        silently, while the assignment to the column rejects values
+        that are too long.
+
+        Args:
+            conn: asyncpg connection.
+            table: Name of the target table.
+            columns: Column names, in parameter order.
+            conflict_column: Column list for the ON CONFLICT clause.
+            on_inserted: Optional SQL reading the 'inserted' CTE.
+
+        Returns:
+            SQL returning the number of inserted rows.
+        """
+        types = await self._get_column_types(conn, table)
+        columns_string = ", ".join(columns)
+        arrays = ", ".join(f"${position}::text[]" for position in range(1, len(columns) + 1))
+        values = ", ".join(f"page.{column}::{types[column]}" for column in columns)
+
+        insert = (
+            f"INSERT INTO {table} ({columns_string}) "
+            f"SELECT {values} FROM unnest({arrays}) AS page ({columns_string})"
+        )
+        if conflict_column:
+            insert += f" ON CONFLICT ({conflict_column}) DO NOTHING"
+
+        derived = f", derived AS ({on_inserted})" if on_inserted else ""
+        return f"WITH inserted AS ({insert} RETURNING *){derived} SELECT COUNT(*) FROM inserted"
+
+    async def _get_column_types(self, conn, table: str) -> Dict[str, str]:
+        """Look up the SQL types of a table's columns, once per table.
+
+        Args:
+            conn: asyncpg connection.
+            table: Name of the table.
+
+        Returns:
+            Dictionary mapping column names to type names without length
+            modifiers, such as 'character varying' or 'jsonb'.
+        """
+        if table not in self._column_types:
+            rows = await conn.fetch(
+                """
+                SELECT attname, format_type(atttypid, NULL)
+                FROM pg_attribute
+                WHERE attrelid = $1::regclass AND attnum > 0 AND NOT attisdropped
+                """,
+                table
+            )
+            self._column_types[table] = {name: type_name for name, type_name in rows}
+        return self._column_types[table]
+
+    @staticmethod
+    def _log_load(table: str, counts: Tuple[int, int]) -> None:
+        """Log the result of loading a table.
+
+        Args:
+            table: Name of the table.
+            counts: Tuple of (inserted, skipped) row counts.
+        """
+        logging.info(f"Loaded {table} asynchronously: {counts[0]} inserted, {counts[1]} skipped as duplicates.")
@@ -0,0 +1,200 @@
+"""On-disk cache for query results keyed on the data version.
+
+This module provides the QueryCache class that stores query results
+under output/.cache, together with helpers reading and bumping the
+data_version counter. Importers bump the counter as the last statement
+of every load transaction that inserted rows, and retention in the same
+transaction as its drops, so a cached result is reused exactly until
+new data is committed.
+
+Entries are pickled. Only point the cache at a directory written by
+this pipeline, since unpickling untrusted files can execute code.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DATA_VERSION_TABLE = "data_version"
+CACHE_DIR = Path("output") / ".cache"
+CACHE_SUFFIX = ".pickle"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+BUMP_DATA_VERSION_SQL = f"""
+    INSERT INTO {DATA_VERSION_TABLE} (id, version, updated_at) VALUES (TRUE, 1, NOW())
+    ON CONFLICT (id) DO UPDATE
+    SET version = {DATA_VERSION_TABLE}.version + 1, updated_at = NOW();
+"""
+
+
+def read_data_version(db_manager) -> int:
+    """Return the current data version.
+
+    Args:
+        db_manager: DatabaseManager instance for database operations.
+
+    Returns:
+        Version counter, or 0 if it has never been bumped.
+    """
+    row = db_manager.fetch_one(f"SELECT version FROM {DATA_VERSION_TABLE};")
+    return row[0] if row else 0
+
+
+def bump_data_version(db_manager) -> None:
+    """Increment the data version. Does not commit.
+
+    Args:
+        db_manager: DatabaseManager instance for database operations.
+    """
+    db_manager.execute_query(BUMP_DATA_VERSION_SQL)
+
+
+class QueryCache:
+    """Stores query results on disk, keyed by query, SQL and data version.
+
+    Each entry is one file named after its key. When the directory
+    grows beyond max_bytes, the least recently used entries are removed;
+    reading an entry refreshes its modification time.
+
+    Attributes:
+        directory: Directory holding the cache files.
+        max_bytes: Size limit of the cache directory.
+        namespace: Identifies the database the results come from, so
+            several databases can share the directory.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, namespace: str = ""):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache files.
+            max_bytes: Size limit of the cache directory.
+            namespace: Identifier of the source database.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+
+    def key(self, query, version: int) -> str:
+        """Build the cache key of a query result.
+
+        Args:
+            query: BaseQuery instance.
+            version: Data version the result belongs to.
+
+        Returns:
+            Key of the form '<query name>-<hex digest>'.
+        """
+        digest = hashlib.sha256(
+            "\0".join([self.namespace, query.get_query_name(), query.get_sql(), str(version)]).encode("utf-8")
+        ).hexdigest()
+        return f"{query.get_query_name()}-{digest[:32]}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Load a cached result.
+
+        Unreadable entries are treated as missing.
+
+        Args:
+            key: Cache key from key().
+
+        Returns:
+            Cached result rows, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                rows = pickle.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+        return rows
+
+    def put(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        """Store a result and evict old entries if the cache is too large.
+
+        The entry is written to a temporary file and renamed, so
+        concurrent readers never see a partial file.
+
+        Args:
+            key: Cache key from key().
+            rows: Result rows to store.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(rows, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def lookup(self, query, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached result of a query without executing it.
+
+        Args:
+            query: BaseQuery instance.
+            version: Current data version.
+
+        Returns:
+            Cached result rows, or None on a miss.
+        """
+        rows = self.get(self.key(query, version))
+        if rows is not None:
+            logging.info(f"Cache hit for {query.get_query_name()} at data version {version}.")
+        return rows
+
+    def execute(self, query, version: int) -> List[Dict[str, Any]]:
+        """Return a query result from the cache, executing the query on a miss.
+
+        Args:
+            query: BaseQuery instance.
+            version: Current data version.
+
+        Returns:
+            List of result row dictionaries.
+        """
+        rows = self.lookup(query, version)
+        if rows is not None:
+            return rows
+
+        rows = query.execute()
+        self.put(self.key(query, version), rows)
+        return rows
+
+    def _path(self, key: str) -> Path:
+        """Return the file path of a cache key.
+
+        Args:
+            key: Cache key from key().
+
+        Returns:
+            Path of the cache file.
+        """
+        return self.directory / f"{key}{CACHE_SUFFIX}"
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logging.info(f"Evicted cache entry {path.name}.")
@@ -6,8 +6,169 @@ interactions including connections, CRUD operations, and transaction management.
 
 import psycopg2
 import logging
-from typing import Dict, Any, Optional, List
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain, count, islice
+from typing import Dict, Any, BinaryIO, Callable, Hashable, Optional, List, Iterable, Iterator, Tuple
+from weakref import WeakKeyDictionary
 from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from scripts.tracing import TRACE
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_ITERSIZE = 2000
+DEFAULT_STATEMENT_CACHE_SIZE = 64
+MAX_STATEMENT_PARAMETERS = 65535
+
+_cursor_ids = count(1)
+_statement_ids = count(1)
+
+# Prepared statements live in the server session, so they are tracked per
+# connection and shared by every manager using it, e.g. pooled sessions.
+_prepared_statements: "WeakKeyDictionary[connection, OrderedDict[Hashable, str]]" = WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+})
+
+
+def _to_copy_line(row: Dict[str, Any], columns: List[str]) -> str:
+    """Format a record as a line of PostgreSQL COPY text format.
+
+    Args:
+        row: Dictionary mapping column names to values.
+        columns: Column names defining the field order.
+
+    Returns:
+        Tab-separated line terminated by a newline, with NULLs written
+        as \\N and special characters escaped.
+    """
+    fields = []
+    for column in columns:
+        value = row.get(column)
+        if value is None:
+            fields.append("\\N")
+        else:
+            fields.append(str(value).translate(COPY_ESCAPES))
+    return "\t".join(fields) + "\n"
+
+
+def _server_placeholders(query: str) -> Tuple[str, int]:
+    """Rewrite psycopg2 %s placeholders as PREPARE parameters $1, $2, ...
+
+    Args:
+        query: SQL with %s placeholders and %% for literal percent signs.
+
+    Returns:
+        Tuple of (SQL with numbered parameters and single percent signs,
+        number of parameters).
+    """
+    numbers = count(1)
+    parameters = 0
+
+    def replace(match: "re.Match[str]") -> str:
+        nonlocal parameters
+        if match.group() == "%%":
+            return "%"
+        parameters = next(numbers)
+        return f"${parameters}"
+
+    return _PLACEHOLDER.sub(replace, query), parameters
+
+
+def _merge_sql(
+    table: str,
+    staging: str,
+    columns_string: str,
+    conflict_column: Optional[str] = None,
+    on_inserted: Optional[str] = None,
+    order_by: Optional[str] = None
+) -> str:
+    """Build the INSERT ... SELECT moving staged rows into their table.
+
+    Args:
+        table: Name of the target table.
+        staging: Name of the table holding the staged rows.
+        columns_string: Comma-separated column list.
+        conflict_column: Column name for ON CONFLICT DO NOTHING clause.
+        on_inserted: Optional data-modifying SQL reading the inserted rows
+            from a CTE named 'inserted'. When given, the statement returns
+            the inserted row count as its single result.
+        order_by: Optional staging column the rows are inserted in order
+            of, so the first of several conflicting rows is the one kept.
+
+    Returns:
+        SQL statement merging the staged rows.
+    """
+    query = f"""
+        INSERT INTO {table} ({columns_string})
+        SELECT {columns_string} FROM {staging}
+    """
+
+    if order_by:
+        query += f" ORDER BY {order_by}"
+
+    if conflict_column:
+        query += f" ON CONFLICT ({conflict_column}) DO NOTHING"
+
+    if on_inserted:
+        return f"WITH inserted AS ({query} RETURNING *), derived AS ({on_inserted}) SELECT COUNT(*) FROM inserted;"
+    return query + ";"
+
+
+class _CopyStream:
+    """File-like adapter that feeds records to COPY FROM STDIN lazily.
+
+    psycopg2's copy_expert() pulls data by calling read(size), so rows
+    are formatted only as the server consumes them and the full data
+    set never has to be materialized.
+
+    Attributes:
+        row_count: Number of records formatted so far.
+    """
+
+    def __init__(self, rows: Iterator[Dict[str, Any]], columns: List[str]):
+        """Initialize the stream over an iterator of records.
+
+        Args:
+            rows: Iterator of dictionaries to stream.
+            columns: Column names defining the field order.
+        """
+        self._lines = (_to_copy_line(row, columns) for row in rows)
+        self._buffer = ""
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> str:
+        """Return up to size characters of COPY data.
+
+        Args:
+            size: Maximum number of characters to return, or -1 for all.
+
+        Returns:
+            Next chunk of COPY data, or empty string when exhausted.
+        """
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.row_count += 1
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
 
 
 class DatabaseManager:
@@ -17,34 +178,230 @@ class DatabaseManager:
     executing queries, and managing transactions. It follows the context
     manager pattern for safe resource handling.
 
+    In pooled mode connections come from a thread-safe pool: conn is
+    checked out from it on connect(), and further connections can be
+    checked out with connection() or session() for concurrent work.
+
+    Full insert_many() pages and fetch_all(prepare=True) queries run as
+    server-side prepared statements, so repeating them skips parsing
+    and planning. Each connection keeps up to statement_cache_size of
+    them, deallocating the least recently used one beyond that.
+
     Attributes:
         config: Database connection parameters.
+        pool_params: Pool size with 'minconn' and 'maxconn' keys, or None
+            to use a single dedicated connection.
+        statement_cache_size: Prepared statements kept per connection;
+            0 disables preparing.
         conn: Active database connection or None if not connected.
+        pool: Connection pool in pooled mode, otherwise None.
     """
 
-    def __init__(self, config: Dict[str, str]):
+    def __init__(
+        self,
+        config: Dict[str, str],
+        pool_params: Optional[Dict[str, int]] = None,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE
+    ):
         """Initialize DatabaseManager with connection configuration.
 
         Args:
             config: Dictionary containing database connection parameters
                 including 'dbname', 'user', 'password', 'host', and 'port'.
+            pool_params: Optional dictionary with 'minconn' and 'maxconn'
+                keys enabling pooled mode. See Config.get_pool_params().
+            statement_cache_size: Prepared statements kept per connection;
+                0 disables preparing.
         """
         self.config = config
+        self.pool_params = pool_params
+        self.statement_cache_size = statement_cache_size
         self.conn: Optional[connection] = None
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self._pool_slots: Optional[threading.BoundedSemaphore] = None
 
     def connect(self) -> None:
         """Establish a connection to the PostgreSQL database.
 
+        In pooled mode, creates the pool and checks out the primary
+        connection from it.
+
         Raises:
             psycopg2.Error: If connection cannot be established.
         """
         try:
-            self.conn = psycopg2.connect(**self.config)
-            logging.info("Database connection established successfully.")
+            if self.pool_params:
+                self.pool = ThreadedConnectionPool(
+                    self.pool_params["minconn"],
+                    self.pool_params["maxconn"],
+                    **self.config
+                )
+                self._pool_slots = threading.BoundedSemaphore(self.pool_params["maxconn"])
+                self.conn = self._checkout()
+                logging.info(
+                    f"Database connection pool established "
+                    f"(min={self.pool_params['minconn']}, max={self.pool_params['maxconn']})."
+                )
+            else:
+                self.conn = psycopg2.connect(**self.config)
+                logging.info("Database connection established successfully.")
         except psycopg2.Error as e:
             logging.error(f"Failed to connect to database: {e}")
             raise
 
+    @contextmanager
+    def connection(self) -> Iterator[connection]:
+        """Check a healthy connection out of the pool for the duration of a block.
+
+        Blocks while all pool connections are in use. On exit the
+        connection is returned to the pool, and any open transaction
+        is rolled back by the pool.
+
+        Yields:
+            A psycopg2 connection reserved for the caller.
+
+        Raises:
+            RuntimeError: If the manager is not in pooled mode or not connected.
+            psycopg2.Error: If no healthy connection can be obtained.
+        """
+        if not self.pool:
+            raise RuntimeError("Connection pool not established. Pass pool_params and call connect() first.")
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    @contextmanager
+    def session(self) -> Iterator["DatabaseManager"]:
+        """Provide a DatabaseManager bound to its own connection.
+
+        In pooled mode the connection is checked out of the pool;
+        otherwise a new connection is opened and closed at the end of
+        the block. Intended for work that runs concurrently with the
+        primary connection, such as parallel queries.
+
+        Yields:
+            DatabaseManager instance with a dedicated connection.
+        """
+        if self.pool:
+            with self.connection() as conn:
+                db = DatabaseManager(self.config, statement_cache_size=self.statement_cache_size)
+                db.conn = conn
+                yield db
+        else:
+            db = DatabaseManager(self.config, statement_cache_size=self.statement_cache_size)
+            db.connect()
+            try:
+                yield db
+            finally:
+                db.close()
+
+    def _checkout(self) -> connection:
+        """Take a connection from the pool, replacing broken ones.
+
+        Returns:
+            A connection that answered a health check.
+
+        Raises:
+            psycopg2.Error: If no healthy connection can be obtained.
+        """
+        self._pool_slots.acquire()
+        try:
+            for _ in range(self.pool_params["maxconn"] + 1):
+                conn = self.pool.getconn()
+                if self._is_healthy(conn):
+                    return conn
+                logging.warning("Discarding broken pooled database connection.")
+                self.pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("No healthy database connection available in pool.")
+        except Exception:
+            self._pool_slots.release()
+            raise
+
+    def _checkin(self, conn: connection) -> None:
+        """Return a checked out connection to the pool.
+
+        Args:
+            conn: Connection previously obtained from _checkout().
+        """
+        try:
+            self.pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._pool_slots.release()
+
+    @staticmethod
+    def _is_healthy(conn: connection) -> bool:
+        """Check that a connection is open and responsive.
+
+        Args:
+            conn: Connection to check.
+
+        Returns:
+            True if a trivial query succeeds on the connection.
+        """
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _prepared(
+        self, cursor, key: Hashable, build_sql: Callable[[], str], parameterized: bool = True
+    ) -> Optional[str]:
+        """Return the EXECUTE command of the statement prepared for a key.
+
+        The statement is prepared on the connection the first time its
+        key is seen. Prepared statements outlive transactions, including
+        rolled back ones, and are dropped by the server when the session
+        ends. Beyond statement_cache_size statements on a connection, the
+        least recently used one is deallocated.
+
+        Args:
+            cursor: Cursor of the connection to prepare on.
+            key: Cache key identifying the statement.
+            build_sql: Callable returning the statement SQL; only called
+                when the statement is not prepared yet.
+            parameterized: Whether the SQL uses %s placeholders to turn
+                into statement parameters.
+
+        Returns:
+            EXECUTE command, with a %s placeholder per parameter, to run
+            with the statement's parameters, or None if preparing is disabled.
+
+        Raises:
+            psycopg2.Error: If the statement cannot be prepared.
+        """
+        if not self.statement_cache_size:
+            return None
+
+        with _prepared_lock:
+            statements = _prepared_statements.setdefault(self.conn, OrderedDict())
+
+        if key in statements:
+            statements.move_to_end(key)
+            return statements[key][1]
+
+        name = f"stmt_{next(_statement_ids)}"
+        sql = build_sql().strip().rstrip(";")
+        parameters = 0
+        if parameterized:
+            sql, parameters = _server_placeholders(sql)
+        cursor.execute(f"PREPARE {name} AS {sql};")
+        command = f"EXECUTE {name} ({', '.join(['%s'] * parameters)});" if parameters else f"EXECUTE {name};"
+        statements[key] = (name, command)
+
+        while len(statements) > self.statement_cache_size:
+            _, (evicted, _) = statements.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted};")
+            logging.debug(f"Deallocated least recently used prepared statement {evicted}.")
+        return command
+
     def insert(self, table: str, data: Dict[str, Any], conflict_column: Optional[str] = None) -> None:
         """Insert a single record into the specified table.
 
@@ -86,11 +443,260 @@ class DatabaseManager:
         try:
             with self.conn.cursor() as cursor:
                 cursor.execute(query, values)
-                logging.debug(f"Inserted data into {table}: {data}")
+                TRACE.row(table, data)
+        except psycopg2.Error as e:
+            logging.error(f"Failed to insert into {table}: {e}")
+            raise
+
+    def insert_many(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        conflict_column: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        on_inserted: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Insert records in pages of multi-row VALUES statements.
+
+        Records are sent page_size at a time, so each page costs a
+        single round trip instead of one per record. Every page but the
+        last has exactly page_size rows, so full pages run as a statement
+        prepared once per connection for each (table, columns,
+        conflict_column, on_inserted, page_size) combination, and only
+        the last page is sent with psycopg2's execute_values(). Only one
+        page is held in memory, which allows rows to be supplied by a
+        generator.
+
+        Args:
+            table: Name of the target table.
+            rows: Iterable of dictionaries mapping column names to values.
+                All records must share the keys of the first record.
+            conflict_column: Column name for ON CONFLICT DO NOTHING clause.
+                If None, duplicate key violations will raise an exception.
+            page_size: Maximum number of records per INSERT statement.
+            on_inserted: Optional data-modifying SQL run in the same statement
+                as each page, e.g. to maintain rollup tables. It reads the
+                rows actually inserted from a CTE named 'inserted', so rows
+                skipped by ON CONFLICT are not seen. Must not contain '%'.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts, where skipped rows
+            are those ignored by the ON CONFLICT clause.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If an insert operation fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if not first:
+            logging.warning(f"Attempted to insert empty data into {table}")
+            return 0, 0
+
+        columns = list(first.keys())
+        columns_string = ', '.join(columns)
+
+        query = f"INSERT INTO {table} ({columns_string}) VALUES %s"
+
+        if conflict_column:
+            query += f" ON CONFLICT ({conflict_column}) DO NOTHING"
+
+        if on_inserted:
+            query = f"WITH inserted AS ({query} RETURNING *), derived AS ({on_inserted}) SELECT 1 FROM inserted;"
+        else:
+            query += " RETURNING 1;"
+
+        records = chain([first], iterator)
+        inserted = 0
+        total = 0
+        key = ("insert_many", table, tuple(columns), conflict_column, on_inserted, page_size)
+        row_values = f"({', '.join(['%s'] * len(columns))})"
+        prepare_pages = page_size * len(columns) <= MAX_STATEMENT_PARAMETERS
+
+        try:
+            with self.conn.cursor() as cursor:
+                while True:
+                    page = [tuple(row.get(column) for column in columns) for row in islice(records, page_size)]
+                    if not page:
+                        break
+                    started = time.perf_counter()
+                    command = None
+                    if prepare_pages and len(page) == page_size:
+                        command = self._prepared(
+                            cursor, key, lambda: query.replace("%s", ", ".join([row_values] * page_size), 1)
+                        )
+                    if command:
+                        cursor.execute(command, [value for row in page for value in row])
+                        result = cursor.fetchall()
+                    else:
+                        result = execute_values(cursor, query, page, page_size=len(page), fetch=True)
+                    TRACE.rows(table, page)
+                    TRACE.batch("insert_many", table, len(page), len(result), started)
+                    inserted += len(result)
+                    total += len(page)
         except psycopg2.Error as e:
             logging.error(f"Failed to insert into {table}: {e}")
             raise
 
+        return inserted, total - inserted
+
+    def copy_insert(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        conflict_column: Optional[str] = None,
+        before_merge: Optional[Callable[[], None]] = None,
+        on_inserted: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Bulk load records using COPY into a staging table.
+
+        Streams the records into a temporary table with COPY FROM STDIN,
+        then merges them into the target table with a single
+        INSERT ... SELECT. Duplicate keys are skipped through the optional
+        ON CONFLICT clause, matching the behavior of insert().
+
+        Args:
+            table: Name of the target table.
+            rows: Iterable of dictionaries mapping column names to values.
+                All records must share the keys of the first record.
+            conflict_column: Column name for ON CONFLICT DO NOTHING clause.
+                If None, duplicate key violations will raise an exception.
+            before_merge: Optional callback run on the same connection after
+                the COPY has consumed all rows and before they are merged,
+                e.g. to create partitions the rows need.
+            on_inserted: Optional data-modifying SQL run in the same statement
+                as the merge. It reads the rows actually inserted from a CTE
+                named 'inserted', as in insert_many().
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If the copy or merge operation fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if not first:
+            logging.warning(f"Attempted to bulk load empty data into {table}")
+            return 0, 0
+
+        columns = list(first.keys())
+        columns_string = ', '.join(columns)
+        staging = f"{table}_staging"
+        stream = _CopyStream(chain([first], iterator), columns)
+
+        merge_query = _merge_sql(table, staging, columns_string, conflict_column, on_inserted)
+        started = time.perf_counter()
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;"
+                )
+                cursor.copy_expert(f"COPY {staging} ({columns_string}) FROM STDIN", stream)
+                if before_merge:
+                    before_merge()
+                cursor.execute(merge_query)
+                inserted = cursor.fetchone()[0] if on_inserted else cursor.rowcount
+                cursor.execute(f"DROP TABLE {staging};")
+        except psycopg2.Error as e:
+            logging.error(f"Failed to bulk load into {table}: {e}")
+            raise
+
+        TRACE.batch("copy_insert", table, stream.row_count, inserted, started)
+
+        return inserted, stream.row_count - inserted
+
+    def copy_rows(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Stream records into a table with COPY FROM STDIN.
+
+        Unlike copy_insert(), the records go straight into the table,
+        without a staging table or conflict handling. Intended for
+        loading staging tables shared between connections. Does not commit.
+
+        Args:
+            table: Name of the target table.
+            rows: Iterable of dictionaries mapping column names to values.
+                All records must share the keys of the first record.
+
+        Returns:
+            Number of copied rows.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If the copy operation fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if not first:
+            return 0
+
+        columns = list(first.keys())
+        stream = _CopyStream(chain([first], iterator), columns)
+        started = time.perf_counter()
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream)
+        except psycopg2.Error as e:
+            logging.error(f"Failed to copy into {table}: {e}")
+            raise
+
+        TRACE.batch("copy_rows", table, stream.row_count, started=started)
+
+        return stream.row_count
+
+    def merge_staging(
+        self,
+        table: str,
+        staging: str,
+        columns: List[str],
+        conflict_column: Optional[str] = None,
+        on_inserted: Optional[str] = None,
+        order_by: Optional[str] = None
+    ) -> int:
+        """Move the rows of a staging table into their target table.
+
+        Runs the same INSERT ... SELECT as copy_insert(). Does not commit.
+
+        Args:
+            table: Name of the target table.
+            staging: Name of the staging table.
+            columns: Columns to copy from the staging table.
+            conflict_column: Column name for ON CONFLICT DO NOTHING clause.
+            on_inserted: Optional data-modifying SQL run in the same statement,
+                as in copy_insert().
+            order_by: Optional staging column giving the insertion order,
+                e.g. the rows' position in the input file.
+
+        Returns:
+            Number of inserted rows.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If the merge fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(_merge_sql(table, staging, ', '.join(columns), conflict_column, on_inserted, order_by))
+                return cursor.fetchone()[0] if on_inserted else cursor.rowcount
+        except psycopg2.Error as e:
+            logging.error(f"Failed to merge {staging} into {table}: {e}")
+            raise
+
     def execute_query(self, query: str, params: Optional[tuple] = None) -> None:
         """Execute a SQL query without returning results.
 
@@ -111,7 +717,7 @@ class DatabaseManager:
         try:
             with self.conn.cursor() as cursor:
                 cursor.execute(query, params)
-                logging.debug(f"Executed query: {query}")
+                TRACE.query("Executed", query)
         except psycopg2.Error as e:
             logging.error(f"Failed to execute query: {e}")
             raise
@@ -137,18 +743,20 @@ class DatabaseManager:
             with self.conn.cursor() as cursor:
                 cursor.execute(query, params)
                 result = cursor.fetchone()
-                logging.debug(f"Fetched one result for query: {query}")
+                TRACE.query("Fetched", query, 0 if result is None else 1)
                 return result
         except psycopg2.Error as e:
             logging.error(f"Failed to fetch data: {e}")
             raise
 
-    def fetch_all(self, query: str, params: Optional[tuple] = None) -> List[tuple]:
+    def fetch_all(self, query: str, params: Optional[tuple] = None, prepare: bool = False) -> List[tuple]:
         """Execute a query and fetch all result rows.
 
         Args:
             query: SQL SELECT query string.
             params: Optional tuple of parameters for query placeholders.
+            prepare: Run the query as a prepared statement kept for the
+                connection, for queries that are executed repeatedly.
 
         Returns:
             List of tuples, where each tuple represents a row.
@@ -163,14 +771,153 @@ class DatabaseManager:
 
         try:
             with self.conn.cursor() as cursor:
-                cursor.execute(query, params)
+                command = None
+                if prepare:
+                    command = self._prepared(cursor, (query, params is not None), lambda: query, params is not None)
+                cursor.execute(command or query, params)
                 results = cursor.fetchall()
-                logging.debug(f"Fetched {len(results)} results for query: {query}")
+                TRACE.query("Fetched", query, len(results))
                 return results
         except psycopg2.Error as e:
             logging.error(f"Failed to fetch data: {e}")
             raise
 
+    def iter_all(self, query: str, params: Optional[tuple] = None, itersize: int = DEFAULT_ITERSIZE) -> Iterator[tuple]:
+        """Execute a query and lazily yield its rows from a server-side cursor.
+
+        Uses a named psycopg2 cursor, so the result set stays on the
+        server and is transferred itersize rows at a time while the
+        caller iterates. Unlike fetch_all(), memory use does not grow
+        with the size of the result.
+
+        Args:
+            query: SQL SELECT query string.
+            params: Optional tuple of parameters for query placeholders.
+            itersize: Number of rows fetched per network round trip.
+
+        Returns:
+            Iterator over result rows as tuples.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If query execution fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        return self._stream_rows(query, params, itersize)
+
+    def _stream_rows(self, query: str, params: Optional[tuple], itersize: int) -> Iterator[tuple]:
+        """Yield rows of a query through a uniquely named server-side cursor.
+
+        Args:
+            query: SQL SELECT query string.
+            params: Optional tuple of parameters for query placeholders.
+            itersize: Number of rows fetched per network round trip.
+
+        Yields:
+            Result rows as tuples.
+        """
+        cursor_name = f"stream_cursor_{next(_cursor_ids)}"
+        try:
+            with self.conn.cursor(name=cursor_name) as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+                TRACE.query(f"Streaming through {cursor_name}", query)
+                yield from cursor
+        except psycopg2.Error as e:
+            logging.error(f"Failed to stream data: {e}")
+            raise
+
+    def iter_batches(
+        self, query: str, params: Optional[tuple] = None, batch_size: int = DEFAULT_ITERSIZE
+    ) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Execute a query and lazily yield its rows in batches.
+
+        Like iter_all(), rows are read through a server-side cursor,
+        but they are handed over batch_size rows at a time together
+        with the cursor description, for consumers that build columnar
+        output. At least one batch is yielded, possibly empty, so the
+        description is available even for an empty result.
+
+        Args:
+            query: SQL SELECT query string.
+            params: Optional tuple of parameters for query placeholders.
+            batch_size: Number of rows fetched and yielded per batch.
+
+        Returns:
+            Iterator over (cursor description, list of row tuples) pairs.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If query execution fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        return self._stream_batches(query, params, batch_size)
+
+    def _stream_batches(
+        self, query: str, params: Optional[tuple], batch_size: int
+    ) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Yield batches of a query through a uniquely named server-side cursor.
+
+        Args:
+            query: SQL SELECT query string.
+            params: Optional tuple of parameters for query placeholders.
+            batch_size: Number of rows fetched and yielded per batch.
+
+        Yields:
+            Tuples of (cursor description, list of row tuples).
+        """
+        cursor_name = f"stream_cursor_{next(_cursor_ids)}"
+        try:
+            with self.conn.cursor(name=cursor_name) as cursor:
+                cursor.execute(query, params)
+                TRACE.query(f"Streaming batches through {cursor_name}", query)
+                rows = cursor.fetchmany(batch_size)
+                yield cursor.description, rows
+                while rows:
+                    rows = cursor.fetchmany(batch_size)
+                    if rows:
+                        yield cursor.description, rows
+        except psycopg2.Error as e:
+            logging.error(f"Failed to stream data: {e}")
+            raise
+
+    def copy_to(self, query: str, file: BinaryIO, options: str = "FORMAT csv, HEADER true") -> int:
+        """Stream the result of a query into a file with COPY TO STDOUT.
+
+        The server formats the rows itself and psycopg2 writes the raw
+        bytes to the file, so no Python row objects are created.
+
+        Args:
+            query: SQL SELECT query string. A trailing semicolon is
+                removed since the query is embedded in the COPY command.
+            file: Binary file object receiving the output.
+            options: COPY options, e.g. "FORMAT csv, HEADER true".
+
+        Returns:
+            Number of rows copied, as reported by the server.
+
+        Raises:
+            RuntimeError: If no database connection exists.
+            psycopg2.Error: If the copy operation fails.
+        """
+        if not self.conn:
+            raise RuntimeError("Database connection not established. Call connect() first.")
+
+        copy_query = f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH ({options})"
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.copy_expert(copy_query, file)
+                TRACE.query("Copied", query, cursor.rowcount)
+                return cursor.rowcount
+        except psycopg2.Error as e:
+            logging.error(f"Failed to copy query results: {e}")
+            raise
+
     def commit(self) -> None:
         """Commit the current transaction.
 
@@ -204,13 +951,26 @@ class DatabaseManager:
     def close(self) -> None:
         """Close the database connection.
 
-        Releases the connection back to the system. After calling this method,
-        connect() must be called again before any database operations.
+        Releases the connection back to the system. In pooled mode the
+        primary connection is returned and all pooled connections are
+        closed. After calling this method, connect() must be called
+        again before any database operations.
 
         Raises:
             psycopg2.Error: If closing the connection fails.
         """
-        if self.conn:
+        if self.pool:
+            try:
+                if self.conn:
+                    self._checkin(self.conn)
+                    self.conn = None
+                self.pool.closeall()
+                self.pool = None
+                logging.info("Database connection pool closed.")
+            except psycopg2.Error as e:
+                logging.error(f"Failed to close connection pool: {e}")
+                raise
+        elif self.conn:
             try:
                 self.conn.close()
                 logging.info("Database connection closed.")
@@ -1,8 +1,19 @@
 """Exporter package for query result output.
 
 This package provides format-specific exporters for saving query
-results to files. Currently supports JSON and XML formats.
+results to files. Currently supports JSON, XML, Parquet, CSV and TSV formats,
+registered by format name in EXPORTERS.
 """
 
-from .json_exporter import JsonExporter  # noqa: F401
-from .xml_exporter import XmlExporter  # noqa: F401
+from .json_exporter import JsonExporter
+from .xml_exporter import XmlExporter
+from .parquet_exporter import ParquetExporter
+from .csv_exporter import CsvExporter, TsvExporter
+
+EXPORTERS = {
+    "json": JsonExporter,
+    "xml": XmlExporter,
+    "parquet": ParquetExporter,
+    "csv": CsvExporter,
+    "tsv": TsvExporter,
+}
@@ -1,12 +1,19 @@
 """Base exporter module defining the abstract interface for data exporters.
 
-This module provides the BaseExporter abstract class that all format-specific
-exporters must inherit from, following the Template Method design pattern.
+This module provides the BaseExporter abstract class for exporters that
+write all query results into a single document, and the BaseQueryExporter
+abstract class for exporters that write one file per query, both following
+the Template Method design pattern.
 """
 
+import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, TextIO, Tuple
+from scripts.metrics import METRICS, file_size
+
+Sections = Iterable[Tuple[str, Iterable[Dict[str, Any]]]]
+STREAM_BUFFER_SIZE = 1024 * 1024
 
 
 class BaseExporter(ABC):
@@ -45,14 +52,103 @@ class BaseExporter(ABC):
         """Export data to a file in the target format.
 
         Creates parent directories if they don't exist, converts
-        the data, and writes to the specified file.
+        the data, and writes to the specified file. The export is
+        recorded in METRICS as the stage 'export.<extension>'.
 
         Args:
             data: Dictionary containing query results to export.
             filepath: Destination file path.
         """
-        path = Path(filepath)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        content = self.convert(data)
-        with open(filepath, "w") as file:
-            file.write(content)
+        with METRICS.stage(f"export.{self.get_file_extension()}") as stage:
+            path = Path(filepath)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            content = self.convert(data)
+            with open(filepath, "w") as file:
+                file.write(content)
+            stage.rows_in = sum(len(rows) for rows in data.values() if isinstance(rows, list))
+            stage.bytes_written = file_size(filepath)
+
+    def export_stream(self, sections: Sections, filepath: str) -> None:
+        """Export query results to a file while they are being produced.
+
+        Each section is a (query name, rows) pair whose rows may be a
+        generator, e.g. BaseQuery.iter_execute(). Rows are written as
+        they arrive, so the full result set is never held in memory.
+
+        Args:
+            sections: Iterable of (query name, iterable of row dicts) pairs.
+            filepath: Destination file path.
+        """
+        with METRICS.stage(f"export.{self.get_file_extension()}") as stage:
+            path = Path(filepath)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(filepath, "w", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as file:
+                self.write_stream(sections, file)
+            stage.bytes_written = file_size(filepath)
+
+    def write_stream(self, sections: Sections, file: TextIO) -> None:
+        """Write sections to an open file in the target format.
+
+        The default implementation collects all rows and delegates to
+        convert(). Subclasses override it to write incrementally.
+
+        Args:
+            sections: Iterable of (query name, iterable of row dicts) pairs.
+            file: Open text file to write to.
+        """
+        file.write(self.convert({name: list(rows) for name, rows in sections}))
+
+
+class BaseQueryExporter(ABC):
+    """Abstract base class for exporters writing one file per query.
+
+    Instead of receiving collected result dictionaries, these exporters
+    read each query's rows from the database themselves, so formats
+    with their own container (e.g. Parquet) can be written batch by
+    batch without holding the result in memory.
+    """
+
+    @abstractmethod
+    def get_file_extension(self) -> str:
+        """Return the file extension for this export format.
+
+        Returns:
+            String file extension without the leading dot.
+        """
+        pass
+
+    @abstractmethod
+    def write_query(self, query, filepath: str) -> int:
+        """Execute a query and write its result to a file.
+
+        Args:
+            query: BaseQuery instance to execute.
+            filepath: Destination file path.
+
+        Returns:
+            Number of rows written.
+        """
+        pass
+
+    def export_query(self, query, directory: str) -> str:
+        """Export a query result to a file named after the query.
+
+        Creates the directory if it doesn't exist and writes the
+        result to '<directory>/<query name>.<extension>'.
+
+        Args:
+            query: BaseQuery instance to execute.
+            directory: Destination directory.
+
+        Returns:
+            Path of the written file.
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        filepath = str(path / f"{query.get_query_name()}.{self.get_file_extension()}")
+        with METRICS.stage(f"export.{self.get_file_extension()}") as stage:
+            row_count = self.write_query(query, filepath)
+            stage.rows_in = row_count
+            stage.bytes_written = file_size(filepath)
+        logging.info(f"Exported {row_count} rows of {query.get_query_name()} to {filepath}")
+        return filepath
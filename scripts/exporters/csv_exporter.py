@@ -0,0 +1,62 @@
+"""CSV and TSV exporters for query results.
+
+This module provides delimited-text export built on PostgreSQL's
+COPY ... TO STDOUT. The server formats each query result and the bytes
+are streamed straight into one file per query, without materializing
+rows as Python objects.
+"""
+
+from .base import BaseQueryExporter, STREAM_BUFFER_SIZE
+
+
+class CsvExporter(BaseQueryExporter):
+    """Exporter writing each query result to a CSV file with a header row.
+
+    Attributes:
+        delimiter: Field delimiter passed to COPY.
+        extension: File extension of the written files.
+    """
+
+    delimiter = ","
+    extension = "csv"
+
+    def get_file_extension(self) -> str:
+        """Return the file extension for this delimiter.
+
+        Returns:
+            String file extension without the leading dot.
+        """
+        return self.extension
+
+    def get_copy_options(self) -> str:
+        """Return the COPY options producing this format.
+
+        Returns:
+            Options string for the WITH clause of COPY.
+        """
+        delimiter = "E'\\t'" if self.delimiter == "\t" else f"'{self.delimiter}'"
+        return f"FORMAT csv, HEADER true, DELIMITER {delimiter}"
+
+    def write_query(self, query, filepath: str) -> int:
+        """Copy a query result into a file.
+
+        Args:
+            query: BaseQuery instance to execute.
+            filepath: Destination file path.
+
+        Returns:
+            Number of rows written, excluding the header.
+        """
+        with open(filepath, "wb", buffering=STREAM_BUFFER_SIZE) as file:
+            return query.copy_to(file, self.get_copy_options())
+
+
+class TsvExporter(CsvExporter):
+    """Exporter writing each query result to a tab-separated file.
+
+    Uses CSV quoting rules with a tab delimiter, so values containing
+    tabs or newlines are still quoted correctly.
+    """
+
+    delimiter = "\t"
+    extension = "tsv"
@@ -6,8 +6,8 @@ handling of PostgreSQL-specific data types like Decimal.
 
 import json
 from decimal import Decimal
-from typing import Dict, Any
-from .base import BaseExporter
+from typing import Dict, Any, TextIO
+from .base import BaseExporter, Sections
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -61,3 +61,32 @@ class JsonExporter(BaseExporter):
             Pretty-printed JSON string with 2-space indentation.
         """
         return json.dumps(data, indent=2, cls=DecimalEncoder)
+
+    def write_stream(self, sections: Sections, file: TextIO) -> None:
+        """Write sections as a JSON object, one row at a time.
+
+        Produces the same document as convert() would for the collected
+        data: an object keyed by query name whose values are arrays of
+        row objects, with 2-space indentation.
+
+        Args:
+            sections: Iterable of (query name, iterable of row dicts) pairs.
+            file: Open text file to write to.
+        """
+        encoder = DecimalEncoder(indent=2)
+        file.write("{")
+        section_separator = "\n"
+
+        for name, rows in sections:
+            file.write(f"{section_separator}  {encoder.encode(name)}: [")
+            section_separator = ",\n"
+            row_separator = "\n    "
+
+            for row in rows:
+                file.write(row_separator)
+                file.write(encoder.encode(row).replace("\n", "\n    "))
+                row_separator = ",\n    "
+
+            file.write("]" if row_separator == "\n    " else "\n  ]")
+
+        file.write("}" if section_separator == "\n" else "\n}")
@@ -0,0 +1,182 @@
+"""Parquet exporter for query results.
+
+This module provides columnar export functionality using pyarrow. Each
+query result is written to its own Parquet file in record batches read
+straight from a server-side cursor, with column types derived from the
+PostgreSQL type OIDs in the cursor description.
+
+pyarrow is an optional dependency and is only required when this
+exporter is used.
+"""
+
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from .base import BaseQueryExporter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_COMPRESSION = "snappy"
+MAX_DECIMAL_PRECISION = 38
+
+BOOL_OID = 16
+BYTEA_OID = 17
+NUMERIC_OID = 1700
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+JSON_OIDS = (114, 3802)
+
+SIMPLE_TYPES = {
+    BOOL_OID: "bool_",
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    26: "int64",
+    700: "float32",
+    701: "float64",
+    19: "string",
+    25: "string",
+    1042: "string",
+    1043: "string",
+    1082: "date32",
+}
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _arrow_column(column: Any) -> Tuple["pa.DataType", Converter]:
+    """Map a cursor description column to an Arrow type.
+
+    Unconstrained NUMERIC values (e.g. AVG results) have no fixed
+    scale and are written as doubles, matching the JSON export.
+    Types without a dedicated mapping are written as strings.
+
+    Args:
+        column: Column entry from cursor.description.
+
+    Returns:
+        Tuple of (Arrow data type, value converter or None when the
+        database value can be used as is).
+    """
+    type_code = column.type_code
+    if type_code in SIMPLE_TYPES:
+        return getattr(pa, SIMPLE_TYPES[type_code])(), None
+    if type_code == TIMESTAMP_OID:
+        return pa.timestamp("us"), None
+    if type_code == TIMESTAMPTZ_OID:
+        return pa.timestamp("us", tz="UTC"), None
+    if type_code == NUMERIC_OID:
+        if column.precision and column.scale is not None and column.precision <= MAX_DECIMAL_PRECISION:
+            return pa.decimal128(column.precision, column.scale), None
+        return pa.float64(), float
+    if type_code == BYTEA_OID:
+        return pa.binary(), bytes
+    if type_code in JSON_OIDS:
+        return pa.string(), json.dumps
+    return pa.string(), str
+
+
+def _build_schema(names: Sequence[str], description: Sequence[Any]) -> Tuple["pa.Schema", List[Converter]]:
+    """Build an Arrow schema from query column names and a cursor description.
+
+    Args:
+        names: Column names, in SELECT order.
+        description: cursor.description of the executed query.
+
+    Returns:
+        Tuple of (Arrow schema, per-column value converters).
+    """
+    fields = []
+    converters = []
+    for name, column in zip(names, description):
+        arrow_type, converter = _arrow_column(column)
+        fields.append(pa.field(name, arrow_type))
+        converters.append(converter)
+    return pa.schema(fields), converters
+
+
+def _to_record_batch(rows: List[tuple], schema: "pa.Schema", converters: List[Converter]) -> "pa.RecordBatch":
+    """Transpose a batch of row tuples into an Arrow record batch.
+
+    Args:
+        rows: Non-empty list of row tuples.
+        schema: Arrow schema of the result.
+        converters: Per-column value converters from _build_schema().
+
+    Returns:
+        Record batch with one array per column.
+    """
+    arrays = []
+    for values, field, converter in zip(zip(*rows), schema, converters):
+        if converter is not None:
+            values = [None if value is None else converter(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ParquetExporter(BaseQueryExporter):
+    """Exporter writing each query result to a Parquet file.
+
+    Attributes:
+        batch_size: Number of rows read from the cursor per record batch.
+        compression: Parquet compression codec.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, compression: str = DEFAULT_COMPRESSION):
+        """Initialize the exporter.
+
+        Args:
+            batch_size: Number of rows read from the cursor per record batch.
+            compression: Parquet compression codec.
+
+        Raises:
+            RuntimeError: If pyarrow is not installed.
+        """
+        if pa is None:
+            raise RuntimeError("Parquet export requires pyarrow. Install it with 'pip install pyarrow'.")
+        self.batch_size = batch_size
+        self.compression = compression
+
+    def get_file_extension(self) -> str:
+        """Return the Parquet file extension.
+
+        Returns:
+            String 'parquet'.
+        """
+        return "parquet"
+
+    def write_query(self, query, filepath: str) -> int:
+        """Execute a query and write its rows to a Parquet file.
+
+        The schema is built from the first batch's cursor description,
+        and every batch is written as its own record batch.
+
+        Args:
+            query: BaseQuery instance to execute.
+            filepath: Destination file path.
+
+        Returns:
+            Number of rows written.
+        """
+        names = query.get_columns()
+        writer = None
+        row_count = 0
+
+        try:
+            for description, rows in query.iter_batches(self.batch_size):
+                if writer is None:
+                    schema, converters = _build_schema(names, description)
+                    writer = pq.ParquetWriter(filepath, schema, compression=self.compression)
+                if rows:
+                    writer.write_batch(_to_record_batch(rows, schema, converters))
+                    row_count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return row_count
@@ -1,19 +1,252 @@
 """XML exporter for query results.
 
-This module provides XML format export functionality using the
-dicttoxml library for automatic conversion.
+This module provides XML format export functionality through a
+purpose-built serializer for the {query name: [row dicts]} shape
+produced by QueryRunner. Its output is byte-identical to the layout
+previously generated by dicttoxml, without the per-value recursion
+and logging overhead of that library.
 """
 
-from typing import Dict, Any
-from dicttoxml import dicttoxml
-from .base import BaseExporter
+from collections.abc import Iterable
+from functools import lru_cache
+from numbers import Number
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+from xml.dom.minidom import parseString
+from .base import BaseExporter, Sections
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" ?>'
+ROOT_ELEMENT = "results"
+ITEM_ELEMENT = "item"
+FLUSH_PARTS = 4096
+
+
+def _escape(text: str) -> str:
+    """Escape XML special characters in a string.
+
+    Quotes are escaped as well so the same function can be used for
+    element text and attribute values.
+
+    Args:
+        text: String to escape.
+
+    Returns:
+        Escaped string.
+    """
+    return (
+        text.replace("&", "&amp;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+
+@lru_cache(maxsize=None)
+def _is_valid_xml_name(name: str) -> bool:
+    """Check whether a string can be used as an XML element name.
+
+    Args:
+        name: Candidate element name.
+
+    Returns:
+        True if an element with this name parses as well-formed XML.
+    """
+    try:
+        parseString(f'<?xml version="1.0" encoding="UTF-8" ?><{name}>foo</{name}>')
+        return True
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _element_name(key: Any) -> Tuple[str, Optional[str]]:
+    """Map a dictionary key to an element name.
+
+    Numeric keys get an 'n' prefix, spaces are replaced with
+    underscores, and keys that are still invalid become a 'key'
+    element carrying the escaped key in a name attribute.
+
+    Args:
+        key: Dictionary key to convert.
+
+    Returns:
+        Tuple of (element name, name attribute value or None).
+    """
+    name = _escape(key) if isinstance(key, str) else str(key)
+    if _is_valid_xml_name(name):
+        return name, None
+    if name.isdigit():
+        return f"n{name}", None
+    try:
+        return f"n{float(name)}", None
+    except ValueError:
+        pass
+    if _is_valid_xml_name(name.replace(" ", "_")):
+        return name.replace(" ", "_"), None
+    return "key", name
+
+
+@lru_cache(maxsize=None)
+def _tags(key: Any) -> Tuple[str, str]:
+    """Build the opening and closing tags for a dictionary key.
+
+    Column names repeat for every row, so the tag strings are built
+    once per key and cached.
+
+    Args:
+        key: Dictionary key naming the element.
+
+    Returns:
+        Tuple of (opening tag, closing tag).
+    """
+    tag, name_attr = _element_name(key)
+    attrs = f' name="{name_attr}"' if name_attr is not None else ""
+    return f"<{tag}{attrs}>", f"</{tag}>"
+
+
+ITEM_OPEN, ITEM_CLOSE = _tags(ITEM_ELEMENT)
+
+
+class _XmlWriter:
+    """Serializes query results into XML text.
+
+    Rendered fragments are collected in a list and handed to the
+    write callable in large joined chunks, which keeps the number of
+    file writes low regardless of how many rows are serialized.
+
+    Attributes:
+        write: Callable receiving each chunk of XML text.
+        flush_parts: Number of collected fragments that triggers a write.
+    """
+
+    def __init__(self, write: Callable[[str], Any], flush_parts: int = FLUSH_PARTS):
+        """Initialize the writer.
+
+        Args:
+            write: Callable receiving each chunk of XML text.
+            flush_parts: Number of collected fragments that triggers a write.
+        """
+        self.write = write
+        self.flush_parts = flush_parts
+        self._parts: List[str] = []
+
+    def write_document(self, data: Dict[str, Any]) -> None:
+        """Write a complete document for an in-memory results dictionary.
+
+        Args:
+            data: Dictionary containing query results.
+        """
+        self._parts.append(XML_DECLARATION)
+        self._parts.append(f"<{ROOT_ELEMENT}>")
+        self._write_dict(data)
+        self._parts.append(f"</{ROOT_ELEMENT}>")
+        self.flush()
+
+    def write_sections(self, sections: Sections) -> None:
+        """Write a complete document from lazily produced sections.
+
+        Args:
+            sections: Iterable of (query name, iterable of row dicts) pairs.
+        """
+        self._parts.append(XML_DECLARATION)
+        self._parts.append(f"<{ROOT_ELEMENT}>")
+        for name, rows in sections:
+            open_tag, close_tag = _tags(name)
+            self._parts.append(open_tag)
+            self._write_list(rows)
+            self._parts.append(close_tag)
+        self._parts.append(f"</{ROOT_ELEMENT}>")
+        self.flush()
+
+    def flush(self) -> None:
+        """Hand all collected fragments to the write callable."""
+        if self._parts:
+            self.write("".join(self._parts))
+            self._parts.clear()
+
+    def _write_dict(self, obj: Dict[Any, Any]) -> None:
+        """Render each key of a dictionary as a child element.
+
+        Booleans are lowercased, dates use ISO format and None
+        produces an empty element.
+
+        Args:
+            obj: Dictionary to render.
+
+        Raises:
+            TypeError: If a value has an unsupported type.
+        """
+        append = self._parts.append
+
+        for key, value in obj.items():
+            open_tag, close_tag = _tags(key)
+            if value.__class__ is str:
+                append(f"{open_tag}{_escape(value)}{close_tag}")
+            elif value.__class__ is bool:
+                append(f"{open_tag}{str(value).lower()}{close_tag}")
+            elif isinstance(value, Number):
+                append(f"{open_tag}{value}{close_tag}")
+            elif isinstance(value, str):
+                append(f"{open_tag}{_escape(value)}{close_tag}")
+            elif hasattr(value, "isoformat"):
+                append(f"{open_tag}{_escape(value.isoformat())}{close_tag}")
+            elif isinstance(value, dict):
+                append(open_tag)
+                self._write_dict(value)
+                append(close_tag)
+            elif isinstance(value, Iterable):
+                append(open_tag)
+                self._write_list(value)
+                append(close_tag)
+            elif value is None:
+                append(f"{open_tag}{close_tag}")
+            else:
+                raise TypeError(f"Unsupported data type: {value} ({type(value).__name__})")
+
+    def _write_list(self, items: Iterable) -> None:
+        """Render each element of an iterable as an 'item' element.
+
+        Collected fragments are flushed between items, so a generator
+        of rows is written out while it is being consumed.
+
+        Args:
+            items: Iterable to render.
+
+        Raises:
+            TypeError: If an element has an unsupported type.
+        """
+        append = self._parts.append
+
+        for item in items:
+            if isinstance(item, dict):
+                append(ITEM_OPEN)
+                self._write_dict(item)
+                append(ITEM_CLOSE)
+            elif isinstance(item, Number):
+                append(f"{ITEM_OPEN}{item}{ITEM_CLOSE}")
+            elif isinstance(item, str):
+                append(f"{ITEM_OPEN}{_escape(item)}{ITEM_CLOSE}")
+            elif hasattr(item, "isoformat"):
+                append(f"{ITEM_OPEN}{_escape(item.isoformat())}{ITEM_CLOSE}")
+            elif isinstance(item, Iterable):
+                append(f"<{ITEM_ELEMENT} >")
+                self._write_list(item)
+                append(ITEM_CLOSE)
+            elif item is None:
+                append(f"{ITEM_OPEN}{ITEM_CLOSE}")
+            else:
+                raise TypeError(f"Unsupported data type: {item} ({type(item).__name__})")
+
+            if len(self._parts) >= self.flush_parts:
+                self.flush()
 
 
 class XmlExporter(BaseExporter):
     """Exporter for XML format output.
 
-    Converts query results to XML using dicttoxml library,
-    with a custom root element and without type attributes.
+    Converts query results to XML with a 'results' root element,
+    one element per query and an 'item' element per row, without
+    type attributes.
     """
 
     def get_file_extension(self) -> str:
@@ -27,15 +260,25 @@ class XmlExporter(BaseExporter):
     def convert(self, data: Dict[str, Any]) -> str:
         """Convert data dictionary to XML string.
 
-        Uses dicttoxml to generate XML with 'results' as the
-        root element and without type attributes for cleaner output.
-
         Args:
             data: Dictionary containing query results.
 
         Returns:
-            UTF-8 decoded XML string.
+            XML string including the XML declaration.
+        """
+        chunks: List[str] = []
+        _XmlWriter(chunks.append).write_document(data)
+        return "".join(chunks)
+
+    def write_stream(self, sections: Sections, file: TextIO) -> None:
+        """Write sections as XML elements while rows are being produced.
+
+        Rows are rendered into fragments and written to the file in
+        joined chunks. The output is identical to convert() for the
+        same results.
+
+        Args:
+            sections: Iterable of (query name, iterable of row dicts) pairs.
+            file: Open text file to write to.
         """
-        xml_bytes = dicttoxml(data, custom_root='results', attr_type=False)
-        xml_string = xml_bytes.decode("utf-8")
-        return xml_string
+        _XmlWriter(file.write).write_sections(sections)
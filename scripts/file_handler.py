@@ -1,19 +1,165 @@
 """File handling utilities for reading JSON data files.
 
 This module provides static methods for reading and parsing JSON files
-used in the IoT data pipeline.
+used in the IoT data pipeline, either all at once or incrementally.
+Both JSON array documents and newline-delimited JSON (NDJSON) are supported.
 """
 
 import json
 import logging
-from typing import List, Dict, Any
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, TextIO, Tuple
+from scripts.metrics import METRICS, file_size
+
+READ_CHUNK_SIZE = 64 * 1024
+NDJSON_RANGE_SIZE = 8 * 1024 * 1024
+JSON_WHITESPACE = " \t\n\r"
+JSON_ELEMENT_END = JSON_WHITESPACE + ",]"
+INPUT_FORMATS = ("auto", "json", "ndjson")
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def _iter_json_array(file: TextIO, read_size: int) -> Iterator[Any]:
+    """Incrementally decode the elements of a top-level JSON array.
+
+    Reads the file in blocks of read_size characters and decodes one
+    element at a time with JSONDecoder.raw_decode(), so memory use is
+    bounded by the block size and the largest single element. An element
+    is only accepted once a delimiter follows it or the file has ended,
+    since raw_decode() also accepts a number cut off by a block boundary
+    (e.g. '1' of '1.5').
+
+    Args:
+        file: Open text file positioned at the start of the document.
+        read_size: Number of characters to read per block.
+
+    Yields:
+        Each element of the array in document order.
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    state = "start"
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+
+        if pos == len(buffer):
+            if eof:
+                if state == "start":
+                    return
+                raise ValueError("Unexpected end of JSON array")
+            chunk = file.read(read_size)
+            eof = not chunk
+            buffer = chunk
+            pos = 0
+            continue
+
+        char = buffer[pos]
+
+        if state == "start":
+            if char != "[":
+                raise ValueError("Expected a top-level JSON array")
+            pos += 1
+            state = "value_or_end"
+            continue
+
+        if char == "]":
+            if state == "value":
+                raise ValueError(f"Unexpected ']' after ',' at offset {pos}")
+            return
+
+        if state == "separator_or_end":
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {pos}")
+            pos += 1
+            state = "value"
+            continue
+
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+
+        if end is None or (not eof and (end == len(buffer) or buffer[end] not in JSON_ELEMENT_END)):
+            chunk = file.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield element
+        pos = end
+        state = "separator_or_end"
+
+
+def _iter_ndjson_range(file_path: str, start: int, end: int) -> Iterator[Tuple[int, Any]]:
+    """Lazily decode the NDJSON lines that start within a byte range.
+
+    A line belongs to the range in which its first byte lies, so
+    adjacent ranges can be parsed independently without splitting or
+    duplicating records.
+
+    Args:
+        file_path: Path to the NDJSON file.
+        start: Inclusive byte offset where the range begins.
+        end: Exclusive byte offset where the range ends.
+
+    Yields:
+        Tuples of (byte offset of the line, decoded record) in file order.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            file.seek(start - 1)
+            file.readline()
+        while file.tell() < end:
+            offset = file.tell()
+            line = file.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                yield offset, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON line at byte offset {offset}: {e}") from e
+
+
+def _parse_ndjson_range(file_path: str, start: int, end: int) -> List[Any]:
+    """Parse a byte range of an NDJSON file into a list.
+
+    Defined at module level so that it can be pickled into worker
+    processes.
+
+    Args:
+        file_path: Path to the NDJSON file.
+        start: Inclusive byte offset where the range begins.
+        end: Exclusive byte offset where the range ends.
+
+    Returns:
+        Decoded records of the range in file order.
+    """
+    return [record for _, record in _iter_ndjson_range(file_path, start, end)]
 
 
 class FileHandler:
     """Utility class for file operations.
 
     Provides static methods for reading various file formats.
-    Currently supports JSON file reading.
+    Currently supports JSON array files and NDJSON files.
     """
 
     @staticmethod
@@ -27,9 +173,163 @@ class FileHandler:
             List of dictionaries parsed from the JSON file.
             Returns empty list if file cannot be read or parsed.
         """
+        with METRICS.stage(f"read.{Path(file_path).name}") as stage:
+            try:
+                with open(file_path, 'r') as file:
+                    records = json.load(file)
+            except Exception as e:
+                logging.error(f"Failed to read file {file_path}: {e}")
+                return []
+            stage.bytes_read = file_size(file_path)
+            stage.rows_out = len(records)
+            return records
+
+    @staticmethod
+    def iter_json(file_path: str, read_size: int = READ_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the records of a JSON file containing a list.
+
+        Unlike read_json(), the file is parsed incrementally and records
+        are yielded as soon as they are decoded, so the whole array never
+        has to be held in memory.
+
+        Args:
+            file_path: Path to the JSON file to read.
+            read_size: Number of characters to read from disk at a time.
+
+        Yields:
+            Dictionaries parsed from the JSON array, in file order.
+            Yields nothing if the file cannot be opened or is empty.
+
+        Raises:
+            ValueError: If the file content is not a well-formed JSON array.
+        """
         try:
-            with open(file_path, 'r') as file:
-                return json.load(file)
+            file = open(file_path, 'r')
         except Exception as e:
             logging.error(f"Failed to read file {file_path}: {e}")
-            return []
+            return
+
+        with file:
+            try:
+                yield from _iter_json_array(file, read_size)
+            except ValueError as e:
+                logging.error(f"Failed to parse file {file_path}: {e}")
+                raise
+
+    @staticmethod
+    def detect_format(file_path: str) -> str:
+        """Detect the input format of a file from its extension.
+
+        Args:
+            file_path: Path to the data file.
+
+        Returns:
+            'ndjson' for .ndjson and .jsonl files, otherwise 'json'.
+        """
+        if Path(file_path).suffix.lower() in NDJSON_EXTENSIONS:
+            return "ndjson"
+        return "json"
+
+    @staticmethod
+    def iter_ndjson(
+        file_path: str,
+        workers: int = 1,
+        range_size: int = NDJSON_RANGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the records of a newline-delimited JSON file.
+
+        With a single worker the file is decoded line by line in this
+        process. With more workers the file is cut into byte ranges of
+        range_size which are parsed by a process pool; results are
+        yielded in file order and at most two ranges per worker are in
+        flight, which keeps memory bounded.
+
+        Args:
+            file_path: Path to the NDJSON file to read.
+            workers: Number of parser processes to use.
+            range_size: Size in bytes of each range handed to a worker.
+
+        Yields:
+            Dictionaries decoded from each non-blank line, in file order.
+            Yields nothing if the file cannot be opened.
+
+        Raises:
+            ValueError: If a line is not valid JSON.
+        """
+        try:
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            logging.error(f"Failed to read file {file_path}: {e}")
+            return
+
+        try:
+            if workers <= 1:
+                yield from (record for _, record in _iter_ndjson_range(file_path, 0, size))
+                return
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for start in range(0, size, range_size):
+                    end = min(start + range_size, size)
+                    pending.append(pool.submit(_parse_ndjson_range, file_path, start, end))
+                    if len(pending) >= workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+        except ValueError as e:
+            logging.error(f"Failed to parse file {file_path}: {e}")
+            raise
+
+    @staticmethod
+    def iter_ndjson_range(file_path: str, start: int, end: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Lazily yield the records of one byte range of an NDJSON file.
+
+        Lets separate processes each read their own share of a file:
+        every line is yielded by exactly one of a set of adjacent ranges.
+
+        Args:
+            file_path: Path to the NDJSON file to read.
+            start: Inclusive byte offset where the range begins.
+            end: Exclusive byte offset where the range ends.
+
+        Yields:
+            Tuples of (byte offset of the line, decoded record) in file
+            order; the offsets give the records' order across ranges.
+
+        Raises:
+            ValueError: If a line is not valid JSON.
+        """
+        try:
+            yield from _iter_ndjson_range(file_path, start, end)
+        except ValueError as e:
+            logging.error(f"Failed to parse file {file_path}: {e}")
+            raise
+
+    @staticmethod
+    def iter_records(file_path: str, input_format: str = "auto", workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """Lazily yield records from a JSON or NDJSON file.
+
+        Args:
+            file_path: Path to the data file.
+            input_format: One of INPUT_FORMATS. 'auto' picks the format
+                from the file extension.
+            workers: Number of parser processes used for NDJSON input.
+
+        The time spent reading is recorded in METRICS as the stage
+        'read.<file name>'.
+
+        Returns:
+            Iterator over the decoded records.
+
+        Raises:
+            ValueError: If input_format is not supported.
+        """
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported input format: {input_format}")
+        if input_format == "auto":
+            input_format = FileHandler.detect_format(file_path)
+        if input_format == "ndjson":
+            records = FileHandler.iter_ndjson(file_path, workers=workers)
+        else:
+            records = FileHandler.iter_json(file_path)
+        return METRICS.track(f"read.{Path(file_path).name}", records, bytes_read=file_size(file_path))
@@ -7,3 +7,4 @@ data from JSON files into the corresponding database tables.
 from .locations import LocationImporter  # noqa: F401
 from .devices import DeviceImporter  # noqa: F401
 from .events import EventImporter  # noqa: F401
+from .sharded import ShardedEventImporter  # noqa: F401
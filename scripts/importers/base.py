@@ -4,8 +4,14 @@ This module provides the BaseImporter abstract class that all entity-specific
 importers must inherit from, following the Template Method design pattern.
 """
 
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+from scripts.cache import bump_data_version
+from scripts.database import DEFAULT_PAGE_SIZE
+from scripts.metrics import METRICS
+
+LOAD_MODES = ("insert", "copy")
 
 
 class BaseImporter(ABC):
@@ -20,15 +26,27 @@ class BaseImporter(ABC):
 
     Attributes:
         db: DatabaseManager instance for database operations.
+        load_mode: Either 'insert' for batched multi-row inserts or 'copy'
+            for bulk loading through COPY and a staging table.
+        page_size: Number of rows sent per INSERT statement in 'insert' mode.
     """
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, load_mode: str = "insert", page_size: int = DEFAULT_PAGE_SIZE):
         """Initialize the importer with a database manager.
 
         Args:
             db_manager: DatabaseManager instance for executing database operations.
+            load_mode: Loading strategy, one of LOAD_MODES. Defaults to 'insert'.
+            page_size: Number of rows per INSERT statement in 'insert' mode.
+
+        Raises:
+            ValueError: If load_mode is not supported.
         """
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported load mode: {load_mode}")
         self.db = db_manager
+        self.load_mode = load_mode
+        self.page_size = page_size
 
     @abstractmethod
     def get_table_name(self) -> str:
@@ -61,28 +79,121 @@ class BaseImporter(ABC):
         """
         pass
 
-    def process_entities(self, data: List[Dict[str, Any]]) -> None:
-        """Process and insert a list of entities into the database.
+    def get_rollup_sql(self) -> Optional[str]:
+        """Return SQL that maintains rollup tables from newly inserted rows.
+
+        The statement runs together with each INSERT (or the COPY merge)
+        and reads the rows actually inserted from a CTE named 'inserted',
+        so rollups stay consistent with the table in the same transaction.
+        Importers without rollups return None.
+
+        Returns:
+            Data-modifying SQL statement, or None.
+        """
+        return None
+
+    def process_entities(self, data: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Process and insert entities into the database.
 
-        Iterates through each record, transforms it, and inserts it
-        into the target table. Commits all changes at the end.
+        Transforms each record and loads it into the target table
+        using the configured load mode. Commits all changes at the end.
+        Records are consumed lazily, so data may be a generator such as
+        FileHandler.iter_json() and loading overlaps with parsing.
 
         Args:
-            data: List of dictionaries containing raw entity data.
+            data: Iterable of dictionaries containing raw entity data.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
 
         Raises:
             Exception: If any insert operation fails. Transaction is
                 rolled back before re-raising.
         """
-        for record in data:
+        return self._load(self.transform_data(record) for record in data)
+
+    def _load(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        after_load: Optional[Callable[[], Optional[int]]] = None
+    ) -> Tuple[int, int]:
+        """Load transformed rows and commit the transaction.
+
+        When rows were inserted, the data version is bumped as the last
+        statement before the commit, so cached query results are
+        invalidated with the new data and the data_version row is only
+        locked while committing. The load is recorded in METRICS as the
+        stage 'import.<table>'.
+
+        Args:
+            rows: Iterable of transformed, database-ready dictionaries.
+            after_load: Optional callback run inside the same transaction
+                after the rows are loaded, e.g. to maintain derived tables.
+                It may return the number of rows it inserted, which also
+                bumps the data version.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+
+        Raises:
+            Exception: If loading fails. Transaction is rolled back
+                before re-raising.
+        """
+        with METRICS.stage(f"import.{self.get_table_name()}") as stage:
             try:
-                transformed_data = self.transform_data(record)
-                self.db.insert(
-                    table=self.get_table_name(),
-                    data=transformed_data,
-                    conflict_column=self.get_conflict_column()
+                inserted, skipped = self._load_rows(
+                    self.get_table_name(), rows, self.get_conflict_column(), on_inserted=self.get_rollup_sql()
                 )
+                derived = after_load() if after_load else None
+                if inserted or derived:
+                    bump_data_version(self.db)
             except Exception:
                 self.db.rollback()
                 raise
-        self.db.commit()
+            self.db.commit()
+            stage.rows_in = inserted + skipped
+            stage.rows_out = inserted
+        logging.info(
+            f"Loaded {self.get_table_name()} in {self.load_mode} mode: "
+            f"{inserted} inserted, {skipped} skipped as duplicates."
+        )
+        return inserted, skipped
+
+    def _load_rows(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        conflict_column: str,
+        on_inserted: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Send rows to a table using the configured load mode.
+
+        In 'insert' mode rows are sent in pages through
+        DatabaseManager.insert_many(). In 'copy' mode they are streamed
+        to DatabaseManager.copy_insert(). Both skip duplicate keys.
+        Does not commit.
+
+        Args:
+            table: Name of the target table.
+            rows: Iterable of database-ready dictionaries.
+            conflict_column: Column list for the ON CONFLICT clause.
+            on_inserted: Optional SQL run against the inserted rows,
+                see get_rollup_sql().
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+        """
+        if self.load_mode == "copy":
+            return self.db.copy_insert(
+                table=table,
+                rows=rows,
+                conflict_column=conflict_column,
+                on_inserted=on_inserted
+            )
+        return self.db.insert_many(
+            table=table,
+            rows=rows,
+            conflict_column=conflict_column,
+            page_size=self.page_size,
+            on_inserted=on_inserted
+        )
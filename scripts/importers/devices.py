@@ -1,12 +1,15 @@
 """Device importer for IoT device data.
 
 This module handles importing device records and linking them
-to their corresponding locations.
+to their corresponding locations. Newly inserted Smart Lamps are added
+to the per-location lamp count rollup in the same statement.
 """
 
 from typing import Dict, Any
 from .base import BaseImporter
 
+LAMP_COUNT_ROLLUP_TABLE = "location_lamp_counts"
+
 
 class DeviceImporter(BaseImporter):
     """Importer for IoT device entities.
@@ -32,6 +35,23 @@ class DeviceImporter(BaseImporter):
         """
         return "device_id"
 
+    def get_rollup_sql(self) -> str:
+        """Return SQL adding inserted Smart Lamps to the per-location counts.
+
+        Returns:
+            Upsert into the location_lamp_counts table.
+        """
+        return f"""
+            INSERT INTO {LAMP_COUNT_ROLLUP_TABLE} (location_id, lamp_count)
+            SELECT location_id, COUNT(*)
+            FROM inserted
+            WHERE device_type = 'Smart Lamp'
+            AND location_id IS NOT NULL
+            GROUP BY location_id
+            ON CONFLICT (location_id) DO UPDATE
+            SET lamp_count = {LAMP_COUNT_ROLLUP_TABLE}.lamp_count + EXCLUDED.lamp_count
+        """
+
     def transform_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform raw device data for database insertion.
 
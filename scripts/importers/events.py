@@ -2,12 +2,31 @@
 
 This module handles importing events with nested JSON details,
 extracting key fields while preserving the remaining data as JSONB.
+In incremental mode it keeps a per-source high-water mark so records
+that were already ingested are skipped before reaching the database.
+When the events table is partitioned, missing partitions are created
+while the events are loaded. Newly inserted Smart Lamp events are added
+to the per-location daily brightness rollup in the same statement.
 """
 
 import json
-from typing import Dict, Any
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+from scripts.database import DEFAULT_PAGE_SIZE
+from scripts.partitions import PartitionManager
 from .base import BaseImporter
 
+WATERMARK_TABLE = "ingest_watermarks"
+BRIGHTNESS_ROLLUP_TABLE = "location_brightness_daily"
+# Integer brightness, or NULL when the value is missing or not an integer,
+# so one malformed event cannot abort the load that carries it.
+BRIGHTNESS_VALUE_SQL = (
+    "CASE WHEN {alias}.details->>'brightness' ~ '^-?\\d+$' "
+    "THEN ({alias}.details->>'brightness')::int END"
+)
+EVENT_IDS_TABLE = "event_ids"
+
 
 class EventImporter(BaseImporter):
     """Importer for IoT event entities.
@@ -15,8 +34,42 @@ class EventImporter(BaseImporter):
     Handles the transformation of nested event data where device_id
     and timestamp are extracted from the details object and stored
     as separate columns, while remaining details are stored as JSONB.
+
+    Attributes:
+        source: Name of the event source (e.g. the input file name). When
+            set, only events at or after the source's high-water mark are
+            loaded, and the mark is advanced in the same transaction.
+        partitions: PartitionManager creating the range partitions the
+            events need, or None to let the database route them.
     """
 
+    def __init__(
+        self,
+        db_manager,
+        load_mode: str = "insert",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        source: Optional[str] = None,
+        partition_interval: Optional[str] = None
+    ):
+        """Initialize the importer.
+
+        Args:
+            db_manager: DatabaseManager instance for executing database operations.
+            load_mode: Loading strategy, one of LOAD_MODES. Defaults to 'insert'.
+            page_size: Number of rows per INSERT statement in 'insert' mode.
+            source: Optional source name enabling incremental loading.
+            partition_interval: Optional partition size ('month' or 'day')
+                of the timestamp-partitioned events table.
+        """
+        super().__init__(db_manager, load_mode, page_size)
+        self.source = source
+        self.partitions = (
+            PartitionManager(db_manager, self.get_table_name(), "timestamp", partition_interval)
+            if partition_interval else None
+        )
+        self._newest: Optional[datetime] = None
+        self._behind_watermark = 0
+
     def get_table_name(self) -> str:
         """Return the events table name.
 
@@ -26,12 +79,45 @@ class EventImporter(BaseImporter):
         return "events"
 
     def get_conflict_column(self) -> str:
-        """Return the primary key column for conflict resolution.
+        """Return the primary key columns for conflict resolution.
+
+        The events table is partitioned by timestamp, so its primary
+        key has to include the partition key. event_id alone is kept
+        unique by the trigger of migration 007, which skips events whose
+        id is already in the event_ids table.
 
         Returns:
-            String 'event_id'.
+            String 'event_id, timestamp'.
+        """
+        return "event_id, timestamp"
+
+    def get_rollup_sql(self) -> str:
+        """Return SQL adding inserted Smart Lamp on events to the brightness rollup.
+
+        Brightness sums and counts are kept per location and day, so
+        AvgBrightnessQuery reads a few rows per location instead of every
+        event. Events without a brightness still create the rollup row,
+        keeping their location in the report with a NULL average; a
+        brightness that is not an integer is skipped like a missing one.
+
+        Returns:
+            Upsert into the location_brightness_daily table.
+        """
+        return f"""
+            INSERT INTO {BRIGHTNESS_ROLLUP_TABLE} (location_id, day, brightness_sum, brightness_count)
+            SELECT d.location_id, inserted.timestamp::date,
+                   COALESCE(SUM({BRIGHTNESS_VALUE_SQL.format(alias="inserted")}), 0),
+                   COUNT({BRIGHTNESS_VALUE_SQL.format(alias="inserted")})
+            FROM inserted
+            JOIN devices d ON d.device_id = inserted.device_id
+            WHERE d.device_type = 'Smart Lamp'
+            AND d.location_id IS NOT NULL
+            AND inserted.details->>'new_status' = 'on'
+            GROUP BY d.location_id, inserted.timestamp::date
+            ON CONFLICT (location_id, day) DO UPDATE
+            SET brightness_sum = {BRIGHTNESS_ROLLUP_TABLE}.brightness_sum + EXCLUDED.brightness_sum,
+                brightness_count = {BRIGHTNESS_ROLLUP_TABLE}.brightness_count + EXCLUDED.brightness_count
         """
-        return "event_id"
 
     def transform_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform raw event data for database insertion.
@@ -60,3 +146,169 @@ class EventImporter(BaseImporter):
             "timestamp": ts,
             "details": json.dumps(details)
         }
+
+    def process_entities(self, data: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Process and insert events, skipping already ingested ones.
+
+        Without a source this behaves like BaseImporter.process_entities().
+        With a source, events whose timestamp is older than the stored
+        high-water mark are dropped before transformation. Events at the
+        mark itself are still sent, since several events can share a
+        timestamp, and are deduplicated by ON CONFLICT. The newest loaded
+        timestamp becomes the new mark when the transaction commits.
+
+        Incremental mode assumes each source only receives events at or
+        after the ones it already delivered.
+
+        Args:
+            data: Iterable of dictionaries containing raw event data.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts. Events dropped by the
+            high-water mark are logged separately and not counted.
+        """
+        if self.source is None:
+            return super().process_entities(data)
+
+        watermark = self._read_watermark()
+        self._newest = watermark
+        self._behind_watermark = 0
+
+        rows = (self.transform_data(record) for record in self._filter_new(data, watermark))
+        result = self._load(rows, after_load=self._save_watermark)
+
+        if watermark is None:
+            logging.info(f"No high-water mark for {self.source}; loaded all events.")
+        else:
+            logging.info(
+                f"Skipped {self._behind_watermark} events from {self.source} "
+                f"older than the high-water mark {watermark}."
+            )
+        return result
+
+    def _load_rows(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        conflict_column: str,
+        on_inserted: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Send rows to the table, creating the partitions they need first.
+
+        In 'insert' mode a missing partition is created as soon as the
+        first row for it is read, between two INSERT pages. In 'copy'
+        mode no statement can run while COPY consumes the rows, so the
+        partitions are created after the COPY and before the merge.
+
+        Args:
+            table: Name of the target table.
+            rows: Iterable of database-ready dictionaries.
+            conflict_column: Column list for the ON CONFLICT clause.
+            on_inserted: Optional SQL run against the inserted rows,
+                see get_rollup_sql().
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+        """
+        if self.partitions is None:
+            return super()._load_rows(table, rows, conflict_column, on_inserted)
+
+        if self.load_mode == "copy":
+            return self.db.copy_insert(
+                table=table,
+                rows=self._note_partitions(rows, create=False),
+                conflict_column=conflict_column,
+                before_merge=self.partitions.create_pending,
+                on_inserted=on_inserted
+            )
+        return super()._load_rows(table, self._note_partitions(rows, create=True), conflict_column, on_inserted)
+
+    def _note_partitions(self, rows: Iterable[Dict[str, Any]], create: bool) -> Iterator[Dict[str, Any]]:
+        """Pass rows through while recording the partitions they need.
+
+        Args:
+            rows: Iterable of database-ready dictionaries.
+            create: Whether to create a missing partition immediately.
+
+        Yields:
+            The rows, unchanged.
+        """
+        for row in rows:
+            if self.partitions.note(self._parse_timestamp(row["timestamp"])) and create:
+                self.partitions.create_pending()
+            yield row
+
+    def _filter_new(self, data: Iterable[Dict[str, Any]], watermark: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+        """Yield events at or after the watermark and track the newest timestamp.
+
+        Events without a parseable timestamp are always yielded and
+        left for the database to accept or reject.
+
+        Args:
+            data: Iterable of raw event dictionaries.
+            watermark: Current high-water mark, or None for a new source.
+
+        Yields:
+            Raw event dictionaries that may not have been ingested yet.
+        """
+        for record in data:
+            timestamp = self._parse_timestamp(record.get('details', {}).get('timestamp'))
+            if timestamp is not None:
+                if watermark is not None and timestamp < watermark:
+                    self._behind_watermark += 1
+                    continue
+                if self._newest is None or timestamp > self._newest:
+                    self._newest = timestamp
+            yield record
+
+    def _read_watermark(self) -> Optional[datetime]:
+        """Fetch the stored high-water mark of the source.
+
+        Returns:
+            Last ingested timestamp, or None if the source is new.
+        """
+        row = self.db.fetch_one(
+            f"SELECT last_timestamp FROM {WATERMARK_TABLE} WHERE source = %s;",
+            (self.source,)
+        )
+        return row[0] if row else None
+
+    def _save_watermark(self) -> None:
+        """Store the newest loaded timestamp as the source's high-water mark.
+
+        Runs inside the import transaction, so the mark only advances
+        when the events are committed. GREATEST keeps it from moving
+        backwards.
+        """
+        if self._newest is None:
+            return
+        self.db.execute_query(
+            f"""
+            INSERT INTO {WATERMARK_TABLE} (source, last_timestamp, updated_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (source) DO UPDATE
+            SET last_timestamp = GREATEST({WATERMARK_TABLE}.last_timestamp, EXCLUDED.last_timestamp),
+                updated_at = NOW();
+            """,
+            (self.source, self._newest)
+        )
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> Optional[datetime]:
+        """Parse an event timestamp the way the TIMESTAMP column stores it.
+
+        Offsets are dropped, as PostgreSQL does when casting to
+        TIMESTAMP WITHOUT TIME ZONE.
+
+        Args:
+            value: Raw timestamp value from the event details.
+
+        Returns:
+            Naive datetime, or None if the value is missing or invalid.
+        """
+        if not isinstance(value, str):
+            return None
+        try:
+            return datetime.fromisoformat(value).replace(tzinfo=None)
+        except ValueError:
+            return None
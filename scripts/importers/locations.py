@@ -1,20 +1,26 @@
 """Location importer for hierarchical location data.
 
 This module handles importing locations that have parent-child relationships,
-requiring special insertion order to satisfy foreign key constraints.
+requiring special insertion order to satisfy foreign key constraints. It also
+maintains the location_closure table used by the hierarchy queries.
 """
 
 import logging
-from typing import Dict, Any, List, Set
+from collections import defaultdict, deque
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 from .base import BaseImporter
 
+MAX_REPORTED_IDS = 10
+CLOSURE_TABLE = "location_closure"
+CLOSURE_CONFLICT_COLUMNS = "ancestor_id, descendant_id"
+
 
 class LocationImporter(BaseImporter):
     """Importer for location entities with hierarchical relationships.
 
     Handles the special case of self-referencing foreign keys where
-    parent locations must be inserted before their children. Uses
-    a deferred insertion strategy to resolve dependency order.
+    parent locations must be inserted before their children. Orders
+    the hierarchy breadth-first from its roots in a single pass.
     """
 
     def get_table_name(self) -> str:
@@ -49,56 +55,190 @@ class LocationImporter(BaseImporter):
             "location_name": raw_data.get("location_name")
         }
 
-    def process_entities(self, data: List[Dict[str, Any]]) -> None:
+    def process_entities(self, data: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
         """Process locations respecting hierarchical dependencies.
 
         Overrides the base implementation to handle self-referencing
-        foreign keys. Locations are inserted in waves: first those
-        with no parent, then those whose parents were just inserted,
-        and so on until all locations are processed.
+        foreign keys. Locations are ordered so that every parent is
+        loaded before its children, then loaded using the configured
+        load mode. The closure rows for the ordered hierarchy are loaded
+        into location_closure within the same transaction. The whole
+        hierarchy is materialized first, since ordering needs to see
+        every location.
 
         Args:
-            data: List of location dictionaries to import.
+            data: Iterable of location dictionaries to import.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
 
         Raises:
-            Exception: If insertion fails. Also logs warning if some
-                locations cannot be inserted due to missing parents.
+            Exception: If insertion fails. Also logs warnings if some
+                locations cannot be inserted due to missing parents
+                or parent cycles.
+        """
+        ordered = self.resolve_insert_order(list(data))
+        return self._load(
+            (self.transform_data(item) for item in ordered),
+            after_load=lambda: self._load_closure(ordered)
+        )
+
+    def _load_closure(self, ordered: List[Dict[str, Any]]) -> int:
+        """Load closure rows for the ordered locations.
+
+        Closure rows can be new even when every location already
+        existed (e.g. when backfilling), so their count is returned to
+        bump the data version on its own.
+
+        Args:
+            ordered: Locations in insertion order, parents first.
+
+        Returns:
+            Number of inserted closure rows.
+        """
+        inserted, skipped = self._load_rows(CLOSURE_TABLE, self.iter_closure_rows(ordered), CLOSURE_CONFLICT_COLUMNS)
+        logging.info(f"Loaded {CLOSURE_TABLE}: {inserted} inserted, {skipped} skipped as duplicates.")
+        return inserted
+
+    def iter_closure_rows(self, ordered: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Generate closure table rows from the in-memory hierarchy.
+
+        Every location gets a depth 0 row pointing at itself plus one
+        row per ancestor, found by walking the parent chain. Because
+        parents precede their children in ordered, each chain only
+        contains locations that are loaded in the same batch.
+
+        Args:
+            ordered: Locations in insertion order, parents first.
+
+        Yields:
+            Dictionaries with ancestor_id, descendant_id and depth keys.
+        """
+        parent_of: Dict[str, Optional[str]] = {}
+
+        for item in ordered:
+            loc_id = str(item.get('location_id'))
+            if loc_id in parent_of:
+                continue
+            parent_of[loc_id] = self._get_parent_id(item)
+
+            yield {"ancestor_id": loc_id, "descendant_id": loc_id, "depth": 0}
+
+            depth = 1
+            ancestor = parent_of[loc_id]
+            while ancestor is not None:
+                yield {"ancestor_id": ancestor, "descendant_id": loc_id, "depth": depth}
+                ancestor = parent_of[ancestor]
+                depth += 1
+
+    @staticmethod
+    def _get_parent_id(item: Dict[str, Any]) -> Optional[str]:
+        """Return the normalized parent id of a location.
+
+        Args:
+            item: Raw location dictionary.
+
+        Returns:
+            Parent location id as a string, or None for root locations,
+            including locations that reference themselves.
+        """
+        loc_id = str(item.get('location_id'))
+        p_id = item.get('parent_location_id')
+        p_id = str(p_id) if p_id is not None else None
+        return None if p_id == loc_id else p_id
+
+    def resolve_insert_order(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order locations so that parents precede their children.
+
+        Builds a parent to children index in one pass over the data,
+        then emits locations breadth-first starting from the roots.
+        Runs in O(n) regardless of how the input is ordered.
+
+        Args:
+            data: List of location dictionaries.
+
+        Returns:
+            Locations in insertion order. Locations that cannot be
+            reached from a root are left out and reported.
+        """
+        children: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        parents: Dict[str, Optional[str]] = {}
+        queue = deque()
+
+        for item in data:
+            p_id = self._get_parent_id(item)
+            parents.setdefault(str(item.get('location_id')), p_id)
+            if p_id is None:
+                queue.append(item)
+            else:
+                children[p_id].append(item)
+
+        ordered: List[Dict[str, Any]] = []
+        expanded: Set[str] = set()
+
+        while queue:
+            item = queue.popleft()
+            ordered.append(item)
+            loc_id = str(item.get('location_id'))
+            if loc_id not in expanded:
+                expanded.add(loc_id)
+                queue.extend(children.pop(loc_id, ()))
+
+        unresolved = [item for items in children.values() for item in items]
+        if unresolved:
+            self._report_unresolved(unresolved, parents)
+
+        return ordered
+
+    def _report_unresolved(self, unresolved: List[Dict[str, Any]], parents: Dict[str, Optional[str]]) -> None:
+        """Log locations that could not be ordered, grouped by cause.
+
+        Follows each location's ancestor chain until it reaches an id
+        missing from the data (orphan) or an id already on the chain
+        (cycle). Results are memoized per ancestor, so every chain is
+        walked only once.
+
+        Args:
+            unresolved: Locations not reachable from any root.
+            parents: Mapping of location id to parent id.
         """
-        inserted_ids: Set[str] = set()
-        to_insert = data
-
-        while to_insert:
-            deferred = []
-            progress = False
-
-            for item in to_insert:
-                loc_id = str(item.get('location_id'))
-                p_id = item.get('parent_location_id')
-                p_id = str(p_id) if p_id is not None else None
-
-                if p_id == loc_id:
-                    p_id = None
-
-                if p_id is None or p_id in inserted_ids:
-                    try:
-                        transformed_data = self.transform_data(item)
-                        self.db.insert(
-                            table=self.get_table_name(),
-                            data=transformed_data,
-                            conflict_column=self.get_conflict_column()
-                        )
-                        inserted_ids.add(loc_id)
-                        progress = True
-                    except Exception:
-                        self.db.rollback()
-                        raise
-                else:
-                    deferred.append(item)
-
-            if not progress and deferred:
-                logging.warning(f"Could not insert {len(deferred)} locations due to missing parents")
-                break
-
-            to_insert = deferred
-
-        self.db.commit()
+        causes: Dict[Optional[str], str] = {}
+        orphaned: List[str] = []
+        cyclic: List[str] = []
+
+        for item in unresolved:
+            chain: List[Optional[str]] = []
+            on_chain: Set[Optional[str]] = set()
+            node = self._get_parent_id(item)
+
+            while node not in causes:
+                if node not in parents:
+                    cause = "orphan"
+                    break
+                if node in on_chain:
+                    cause = "cycle"
+                    break
+                chain.append(node)
+                on_chain.add(node)
+                node = parents[node]
+            else:
+                cause = causes[node]
+
+            for ancestor in chain:
+                causes[ancestor] = cause
+
+            if cause == "orphan":
+                orphaned.append(str(item.get('location_id')))
+            else:
+                cyclic.append(str(item.get('location_id')))
+
+        if orphaned:
+            logging.warning(
+                f"Could not insert {len(orphaned)} locations due to missing parents: "
+                f"{orphaned[:MAX_REPORTED_IDS]}"
+            )
+        if cyclic:
+            logging.warning(
+                f"Could not insert {len(cyclic)} locations due to cycles in the hierarchy: "
+                f"{cyclic[:MAX_REPORTED_IDS]}"
+            )
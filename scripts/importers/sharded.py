@@ -0,0 +1,333 @@
+"""Sharded event importer loading one events file from several processes.
+
+This module provides the ShardedEventImporter class. An NDJSON events
+file is cut into one byte range per shard, and each shard is parsed,
+transformed and copied by its own worker process over its own
+connection into a shared UNLOGGED staging table. Once every shard has
+succeeded, the coordinator merges the staging table into events in a
+single transaction, so the run either loads all shards or none of them.
+
+Staging tables are named events_load_<id>. While a load runs, its
+coordinator holds a session advisory lock on the name, so a staging
+table whose lock is free was left behind by a killed coordinator and
+is dropped by the next sharded import.
+"""
+
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from scripts.cache import bump_data_version
+from scripts.database import DatabaseManager
+from scripts.file_handler import FileHandler, INPUT_FORMATS
+from scripts.metrics import METRICS, StageRecord
+from .events import EventImporter
+
+EVENT_COLUMNS = ["event_id", "device_id", "timestamp", "details"]
+POSITION_COLUMN = "load_position"
+STAGING_INFIX = "_load_"
+
+
+def _load_shard(
+    db_params: Dict[str, str],
+    file_path: str,
+    input_format: str,
+    staging: str,
+    start: int,
+    end: int
+) -> Tuple[int, float, float]:
+    """Copy one shard of an events file into the staging table.
+
+    Runs in a worker process with its own connection. For NDJSON the
+    shard is the lines starting in [start, end), stored with their byte
+    offset as position. A JSON array cannot be split, so it is loaded as
+    a single shard, stored with each record's index as position.
+
+    Args:
+        db_params: Connection parameters from Config.get_db_params().
+        file_path: Path to the events file.
+        input_format: Input file format, 'json' or 'ndjson'.
+        staging: Name of the staging table.
+        start: Inclusive byte offset where the shard begins.
+        end: Exclusive byte offset where the shard ends.
+
+    Returns:
+        Tuple of (copied rows, wall seconds, CPU seconds).
+    """
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+
+    if input_format == "ndjson":
+        records = FileHandler.iter_ndjson_range(file_path, start, end)
+    else:
+        records = enumerate(FileHandler.iter_json(file_path))
+
+    db = DatabaseManager(db_params)
+    db.connect()
+    try:
+        importer = EventImporter(db)
+        rows = (
+            {**importer.transform_data(record), POSITION_COLUMN: position}
+            for position, record in records
+        )
+        copied = db.copy_rows(staging, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return copied, time.perf_counter() - started, time.process_time() - cpu_started
+
+
+class ShardedEventImporter(EventImporter):
+    """Importer loading an events file through parallel shard workers.
+
+    Every staged row keeps its position in the file, and the merge
+    inserts them in that order, so the first occurrence of a duplicate
+    is kept as in a single-process load.
+
+    Attributes:
+        db_params: Connection parameters passed to the worker processes.
+        shards: Number of shards and worker processes.
+        shard_stats: Per-shard statistics of the last import_file() call,
+            dictionaries with 'shard', 'rows', 'seconds', 'cpu_seconds'
+            and 'rows_per_second' keys.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        db_params: Dict[str, str],
+        shards: int,
+        partition_interval: Optional[str] = None
+    ):
+        """Initialize the importer.
+
+        Args:
+            db_manager: DatabaseManager instance of the coordinator.
+            db_params: Connection parameters for the worker processes.
+            shards: Number of shards and worker processes.
+            partition_interval: Optional partition size ('month' or 'day')
+                of the timestamp-partitioned events table.
+
+        Raises:
+            ValueError: If shards is not positive.
+        """
+        if shards < 1:
+            raise ValueError(f"Number of shards must be positive: {shards}")
+        super().__init__(db_manager, "copy", partition_interval=partition_interval)
+        self.db_params = db_params
+        self.shards = shards
+        self.shard_stats: List[Dict[str, float]] = []
+
+    def import_file(self, file_path: str, input_format: str = "auto") -> Tuple[int, int]:
+        """Load an events file through the shard workers and merge the result.
+
+        Args:
+            file_path: Path to the events JSON or NDJSON file.
+            input_format: Input file format, one of INPUT_FORMATS.
+
+        Returns:
+            Tuple of (inserted, skipped) row counts.
+
+        Raises:
+            ValueError: If input_format is not supported.
+            RuntimeError: If any shard fails. Nothing is loaded.
+            Exception: If the merge fails. Its transaction is rolled back.
+        """
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported input format: {input_format}")
+        if input_format == "auto":
+            input_format = FileHandler.detect_format(file_path)
+        ranges = self._shard_ranges(file_path, input_format)
+        self.drop_stale_staging()
+
+        staging = f"{self.get_table_name()}{STAGING_INFIX}{uuid.uuid4().hex[:12]}"
+        self.db.execute_query("SELECT pg_advisory_lock(hashtext(%s));", (staging,))
+        self.db.execute_query(
+            f"CREATE UNLOGGED TABLE {staging} (LIKE {self.get_table_name()} INCLUDING DEFAULTS, "
+            f"{POSITION_COLUMN} BIGINT NOT NULL);"
+        )
+        self.db.commit()
+
+        started = time.perf_counter()
+        with METRICS.stage(f"import.{self.get_table_name()}") as stage:
+            try:
+                self.shard_stats = self._run_shards(file_path, input_format, staging, ranges)
+                copied = sum(stats["rows"] for stats in self.shard_stats)
+                inserted = self._merge(staging)
+            except Exception:
+                self.db.rollback()
+                self._drop_staging(staging)
+                raise
+            finally:
+                self._unlock_staging(staging)
+            stage.rows_in = copied
+            stage.rows_out = inserted
+
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Loaded {self.get_table_name()} from {len(ranges)} shards in {elapsed:.2f}s "
+            f"({copied / elapsed if elapsed else 0:.0f} rows/s): "
+            f"{inserted} inserted, {copied - inserted} skipped as duplicates."
+        )
+        return inserted, copied - inserted
+
+    def drop_stale_staging(self) -> List[str]:
+        """Drop staging tables left behind by killed sharded imports.
+
+        A staging table is stale when no coordinator holds its advisory
+        lock. Staging tables of imports still running are kept.
+
+        Returns:
+            Names of the dropped tables.
+        """
+        candidates = self.db.fetch_all(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND relname LIKE %s "
+            "AND relnamespace = current_schema()::regnamespace;",
+            (f"{self.get_table_name()}{STAGING_INFIX}%".replace("_", "\\_"),)
+        )
+        dropped = []
+        for (staging,) in candidates:
+            if not self.db.fetch_one("SELECT pg_try_advisory_lock(hashtext(%s));", (staging,))[0]:
+                continue
+            try:
+                self.db.execute_query(f"DROP TABLE IF EXISTS {staging};")
+                self.db.commit()
+                dropped.append(staging)
+            finally:
+                self._unlock_staging(staging)
+        if dropped:
+            logging.warning(f"Dropped staging tables left by interrupted sharded imports: {', '.join(dropped)}")
+        return dropped
+
+    def _shard_ranges(self, file_path: str, input_format: str) -> List[Tuple[int, int]]:
+        """Cut an events file into one byte range per shard.
+
+        Args:
+            file_path: Path to the events file.
+            input_format: Input file format, 'json' or 'ndjson'.
+
+        Returns:
+            List of (start, end) byte offsets; a single range covering
+            the whole file for a JSON array.
+        """
+        size = os.path.getsize(file_path)
+        if input_format != "ndjson":
+            if self.shards > 1:
+                logging.warning(
+                    f"{file_path} is a JSON array, which cannot be split; loading it in a single shard. "
+                    f"Use NDJSON input to load it in parallel."
+                )
+            return [(0, size)]
+        return [(size * shard // self.shards, size * (shard + 1) // self.shards) for shard in range(self.shards)]
+
+    def _run_shards(
+        self, file_path: str, input_format: str, staging: str, ranges: List[Tuple[int, int]]
+    ) -> List[Dict[str, float]]:
+        """Run one worker process per shard and wait for all of them.
+
+        Args:
+            file_path: Path to the events file.
+            input_format: Input file format, 'json' or 'ndjson'.
+            staging: Name of the staging table.
+            ranges: Byte range of each shard, from _shard_ranges().
+
+        Returns:
+            Per-shard statistics, see shard_stats.
+
+        Raises:
+            RuntimeError: If any shard failed, after all workers finished.
+        """
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [
+                pool.submit(_load_shard, self.db_params, file_path, input_format, staging, start, end)
+                for start, end in ranges
+            ]
+            wait(futures)
+
+        failed = [(shard, future.exception()) for shard, future in enumerate(futures) if future.exception()]
+        if failed:
+            shards = ", ".join(str(shard) for shard, _ in failed)
+            logging.error(f"Sharded import of {file_path} failed in shard(s) {shards}: {failed[0][1]}")
+            raise RuntimeError(f"Sharded import failed in shard(s) {shards}: {failed[0][1]}") from failed[0][1]
+
+        stats = []
+        for shard, future in enumerate(futures):
+            rows, seconds, cpu_seconds = future.result()
+            stats.append({
+                "shard": shard,
+                "rows": rows,
+                "seconds": seconds,
+                "cpu_seconds": cpu_seconds,
+                "rows_per_second": rows / seconds if seconds else 0.0,
+            })
+            record = StageRecord(f"import.{self.get_table_name()}.shard_{shard}")
+            record.rows_in = record.rows_out = rows
+            METRICS.record(record, seconds, cpu_seconds)
+            logging.info(
+                f"Shard {shard}/{len(ranges)} copied {rows} rows in {seconds:.2f}s "
+                f"({stats[-1]['rows_per_second']:.0f} rows/s, {cpu_seconds:.2f}s CPU)."
+            )
+        return stats
+
+    def _merge(self, staging: str) -> int:
+        """Move the staged events into the events table and commit.
+
+        Creates the partitions the staged events need, inserts them in
+        file order with the brightness rollup and drops the staging
+        table, all in one transaction. When events were inserted, the data
+        version is bumped as the last statement before the commit.
+
+        Args:
+            staging: Name of the staging table.
+
+        Returns:
+            Number of inserted events.
+        """
+        if self.partitions is not None:
+            periods = self.db.fetch_all(
+                f"SELECT DISTINCT date_trunc(%s, timestamp) FROM {staging} WHERE timestamp IS NOT NULL;",
+                (self.partitions.interval,)
+            )
+            for (start,) in periods:
+                self.partitions.note(start)
+            self.partitions.create_pending()
+
+        inserted = self.db.merge_staging(
+            self.get_table_name(), staging, EVENT_COLUMNS, self.get_conflict_column(), self.get_rollup_sql(),
+            order_by=POSITION_COLUMN
+        )
+        self.db.execute_query(f"DROP TABLE {staging};")
+        if inserted:
+            bump_data_version(self.db)
+        self.db.commit()
+        return inserted
+
+    def _unlock_staging(self, staging: str) -> None:
+        """Release the advisory lock marking a staging table as in use.
+
+        Args:
+            staging: Name of the staging table.
+        """
+        try:
+            self.db.fetch_one("SELECT pg_advisory_unlock(hashtext(%s));", (staging,))
+            self.db.commit()
+        except Exception as e:
+            logging.warning(f"Could not unlock staging table {staging}: {e}")
+
+    def _drop_staging(self, staging: str) -> None:
+        """Drop the staging table after a failed import.
+
+        Args:
+            staging: Name of the staging table.
+        """
+        try:
+            self.db.execute_query(f"DROP TABLE IF EXISTS {staging};")
+            self.db.commit()
+        except Exception as e:
+            logging.warning(f"Could not drop staging table {staging}: {e}")
@@ -0,0 +1,271 @@
+"""Per-stage metrics of the pipeline.
+
+This module provides the MetricsRegistry class that records wall time,
+CPU time, rows in and out, bytes read and written, and peak RSS for
+each pipeline stage: reading an input file, each importer, each query
+and each exporter. The instrumented classes report to the module-level
+METRICS registry, which run.py writes out as a JSON summary and
+optionally in the Prometheus text exposition format.
+
+Stages can nest: an importer consuming a file that is still being read
+includes the read time, which is also reported on its own. CPU time is
+the time of the thread running the stage; work done by parser or shard
+worker processes and by the database server is not included.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+METRIC_PREFIX = "iot_pipeline_stage"
+METRIC_FIELDS = {
+    "calls": "Number of times the stage ran.",
+    "wall_seconds": "Wall-clock time spent in the stage.",
+    "cpu_seconds": "CPU time of the thread running the stage.",
+    "rows_in": "Rows consumed by the stage.",
+    "rows_out": "Rows produced by the stage.",
+    "bytes_read": "Bytes read from input files by the stage.",
+    "bytes_written": "Bytes written to output files by the stage.",
+    "peak_rss_bytes": "Peak resident set size of the process when the stage finished.",
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process.
+
+    Returns:
+        Peak RSS in bytes, or None where the resource module is missing.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def file_size(filepath: str) -> int:
+    """Return the size of a file for the byte counters.
+
+    Args:
+        filepath: Path of the file.
+
+    Returns:
+        Size in bytes, or 0 if the file cannot be inspected.
+    """
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+class StageRecord:
+    """Counters of one stage run, filled in by the instrumented code.
+
+    Attributes:
+        name: Stage name, e.g. 'import.events'.
+        rows_in: Rows consumed by the stage.
+        rows_out: Rows produced by the stage.
+        bytes_read: Bytes read from input files.
+        bytes_written: Bytes written to output files.
+    """
+
+    def __init__(self, name: str):
+        """Initialize empty counters.
+
+        Args:
+            name: Stage name.
+        """
+        self.name = name
+        self.rows_in = 0
+        self.rows_out = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class MetricsRegistry:
+    """Collects stage metrics, aggregated per stage name.
+
+    Stages may be recorded from several threads, e.g. by queries run
+    in parallel. Runs of the same stage are summed, except peak RSS,
+    which keeps the highest value.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """Measure a block of code as a stage.
+
+        The block fills in the row and byte counters of the yielded
+        record. The stage is recorded even if the block raises.
+
+        Args:
+            name: Stage name.
+
+        Yields:
+            StageRecord for the block to update.
+        """
+        record = StageRecord(name)
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield record
+        finally:
+            self._add(record, time.perf_counter() - started, time.thread_time() - cpu_started)
+
+    def track(self, name: str, items: Iterable[Any], bytes_read: int = 0) -> Iterator[Any]:
+        """Measure the time spent producing the items of an iterable.
+
+        Only the time inside the iterable counts, not the time the
+        consumer spends between items, so a streamed file read is
+        reported separately from the importer consuming it. Each item
+        counts as a row out. The stage is recorded when iteration ends
+        or the generator is closed.
+
+        Args:
+            name: Stage name.
+            items: Iterable to measure.
+            bytes_read: Size of the input the items are read from.
+
+        Yields:
+            The items, unchanged.
+        """
+        record = StageRecord(name)
+        record.bytes_read = bytes_read
+        iterator = iter(items)
+        wall = 0.0
+        cpu = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                cpu_started = time.thread_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    wall += time.perf_counter() - started
+                    cpu += time.thread_time() - cpu_started
+                record.rows_out += 1
+                yield item
+        finally:
+            self._add(record, wall, cpu)
+
+    def record(self, record: StageRecord, wall_seconds: float, cpu_seconds: float) -> None:
+        """Record a stage run measured elsewhere, e.g. in a worker process.
+
+        Args:
+            record: Counters of the run.
+            wall_seconds: Wall-clock seconds of the run.
+            cpu_seconds: CPU seconds of the run.
+        """
+        self._add(record, wall_seconds, cpu_seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the collected metrics.
+
+        Returns:
+            Dictionary with the process wall time and peak RSS, and a
+            'stages' list of per-stage dictionaries in first-run order.
+        """
+        with self._lock:
+            stages = [dict(name=name, **values) for name, values in self._stages.items()]
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+    def reset(self) -> None:
+        """Forget all recorded stages and restart the process clock."""
+        with self._lock:
+            self._stages.clear()
+            self._started = time.perf_counter()
+
+    def write_json(self, filepath: str) -> None:
+        """Write the summary as a JSON document.
+
+        Args:
+            filepath: Destination file path.
+        """
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+
+    def write_prometheus(self, filepath: str) -> None:
+        """Write the metrics in the Prometheus text exposition format.
+
+        Every stage field becomes a gauge labelled with the stage name,
+        e.g. iot_pipeline_stage_wall_seconds{stage="query.leak_locations"},
+        suitable for the node exporter's textfile collector.
+
+        Args:
+            filepath: Destination file path.
+        """
+        stages = self.summary()["stages"]
+        lines: List[str] = []
+        for field, description in METRIC_FIELDS.items():
+            metric = f"{METRIC_PREFIX}_{field}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stage in stages:
+                if stage[field] is not None:
+                    lines.append(f'{metric}{{stage="{_escape_label(stage["name"])}"}} {stage[field]}')
+
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _add(self, record: StageRecord, wall: float, cpu: float) -> None:
+        """Add a finished stage run to its aggregate.
+
+        Args:
+            record: Counters of the run.
+            wall: Wall-clock seconds of the run.
+            cpu: CPU seconds of the run.
+        """
+        rss = peak_rss_bytes()
+        with self._lock:
+            stage = self._stages.setdefault(record.name, {
+                "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "rows_in": 0, "rows_out": 0,
+                "bytes_read": 0, "bytes_written": 0, "peak_rss_bytes": rss,
+            })
+            stage["calls"] += 1
+            stage["wall_seconds"] = round(stage["wall_seconds"] + wall, 6)
+            stage["cpu_seconds"] = round(stage["cpu_seconds"] + cpu, 6)
+            stage["rows_in"] += record.rows_in
+            stage["rows_out"] += record.rows_out
+            stage["bytes_read"] += record.bytes_read
+            stage["bytes_written"] += record.bytes_written
+            if rss is not None:
+                stage["peak_rss_bytes"] = max(stage["peak_rss_bytes"] or 0, rss)
+        logging.debug(f"Stage {record.name} finished in {wall:.3f}s.")
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value.
+
+    Args:
+        value: Raw label value.
+
+    Returns:
+        Value with backslashes, quotes and newlines escaped.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = MetricsRegistry()
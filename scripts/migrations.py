@@ -0,0 +1,101 @@
+"""Schema migration module for applying versioned SQL files.
+
+This module provides the MigrationRunner class that applies the numbered
+SQL files in db/migrations in order, recording each applied version in
+a schema_migrations table so every migration runs exactly once.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import List, Set
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "db" / "migrations"
+MIGRATIONS_TABLE = "schema_migrations"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{3})_\w+\.sql$")
+
+
+class MigrationRunner:
+    """Applies pending SQL migrations to the database.
+
+    Migration files are named 'NNN_description.sql' and applied in
+    version order. Each migration runs in its own transaction together
+    with its schema_migrations entry, so a failed migration leaves no
+    partial changes and is retried on the next run.
+
+    Attributes:
+        db: DatabaseManager instance for database operations.
+        directory: Directory containing the migration files.
+    """
+
+    def __init__(self, db_manager, directory: Path = MIGRATIONS_DIR):
+        """Initialize the runner.
+
+        Args:
+            db_manager: DatabaseManager instance for executing database operations.
+            directory: Directory containing the migration files.
+        """
+        self.db = db_manager
+        self.directory = Path(directory)
+
+    def available(self) -> List[Path]:
+        """List the migration files in version order.
+
+        Returns:
+            Paths of files matching the migration naming pattern.
+        """
+        files = [path for path in self.directory.glob("*.sql") if MIGRATION_FILE_PATTERN.match(path.name)]
+        return sorted(files, key=lambda path: path.name)
+
+    def applied(self) -> Set[str]:
+        """Return the versions already applied to the database.
+
+        Creates the schema_migrations table on first use.
+
+        Returns:
+            Set of applied migration file names.
+        """
+        self.db.execute_query(
+            f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                version VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+            """
+        )
+        rows = self.db.fetch_all(f"SELECT version FROM {MIGRATIONS_TABLE};")
+        self.db.commit()
+        return {row[0] for row in rows}
+
+    def pending(self) -> List[Path]:
+        """List the migration files not applied yet.
+
+        Returns:
+            Paths of pending migration files in version order.
+        """
+        applied = self.applied()
+        return [path for path in self.available() if path.name not in applied]
+
+    def apply_all(self) -> List[str]:
+        """Apply every pending migration in order.
+
+        Returns:
+            Names of the applied migration files.
+
+        Raises:
+            Exception: If a migration fails. Its transaction is rolled
+                back and the remaining migrations are not applied.
+        """
+        applied = []
+        for path in self.pending():
+            try:
+                self.db.execute_query(path.read_text(encoding="utf-8"))
+                self.db.execute_query(f"INSERT INTO {MIGRATIONS_TABLE} (version) VALUES (%s);", (path.name,))
+            except Exception:
+                self.db.rollback()
+                logging.error(f"Migration {path.name} failed; rolled back.")
+                raise
+            self.db.commit()
+            logging.info(f"Applied migration {path.name}.")
+            applied.append(path.name)
+        return applied
@@ -0,0 +1,230 @@
+"""Partition management for time-partitioned tables.
+
+This module provides the PartitionManager class that creates monthly or
+daily range partitions on demand while data is loaded, and drops whole
+partitions for retention instead of deleting rows.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+PARTITION_INTERVALS = ("month", "day")
+
+
+class PartitionManager:
+    """Creates and drops range partitions of a table partitioned by timestamp.
+
+    Partitions are named '<table>_pYYYY_MM' for monthly and
+    '<table>_pYYYY_MM_DD' for daily intervals. Rows whose range has no
+    partition land in '<table>_default'; when a partition for that range
+    is created later, those rows are moved into it before attaching.
+
+    Attributes:
+        db: DatabaseManager instance for database operations.
+        table: Name of the partitioned table.
+        column: Name of the partition key column.
+        interval: Partition size, one of PARTITION_INTERVALS.
+    """
+
+    def __init__(self, db_manager, table: str = "events", column: str = "timestamp", interval: str = "month"):
+        """Initialize the manager.
+
+        Args:
+            db_manager: DatabaseManager instance for executing database operations.
+            table: Name of the partitioned table.
+            column: Name of the partition key column.
+            interval: Partition size, one of PARTITION_INTERVALS.
+
+        Raises:
+            ValueError: If interval is not supported.
+        """
+        if interval not in PARTITION_INTERVALS:
+            raise ValueError(f"Unsupported partition interval: {interval}")
+        self.db = db_manager
+        self.table = table
+        self.column = column
+        self.interval = interval
+        self._existing: Optional[Set[str]] = None
+        self._pending: Set[datetime] = set()
+        self._name_pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})(?:_(\d{{2}}))?$")
+
+    def period_bounds(self, timestamp: datetime) -> Tuple[datetime, datetime]:
+        """Return the partition range containing a timestamp.
+
+        Args:
+            timestamp: Value of the partition key.
+
+        Returns:
+            Tuple of (inclusive start, exclusive end).
+        """
+        if self.interval == "day":
+            start = datetime(timestamp.year, timestamp.month, timestamp.day)
+            return start, start + timedelta(days=1)
+        start = datetime(timestamp.year, timestamp.month, 1)
+        return start, _next_month(start)
+
+    def partition_name(self, start: datetime) -> str:
+        """Return the name of the partition starting at a period start.
+
+        Args:
+            start: Start of the partition range.
+
+        Returns:
+            Partition table name.
+        """
+        if self.interval == "day":
+            return f"{self.table}_p{start:%Y_%m_%d}"
+        return f"{self.table}_p{start:%Y_%m}"
+
+    def note(self, timestamp: Optional[datetime]) -> bool:
+        """Record that a row with this timestamp is about to be loaded.
+
+        Args:
+            timestamp: Partition key value of the row, or None.
+
+        Returns:
+            True if the row's partition does not exist yet and is now pending.
+        """
+        if timestamp is None:
+            return False
+        start, _ = self.period_bounds(timestamp)
+        if start in self._pending or self.partition_name(start) in self._existing_partitions():
+            return False
+        self._pending.add(start)
+        return True
+
+    def create_pending(self) -> List[str]:
+        """Create all partitions recorded by note() that do not exist yet.
+
+        Must not run while a statement on the same connection is still
+        in progress (e.g. during COPY). Does not commit.
+
+        Returns:
+            Names of the created partitions.
+        """
+        created = [self.ensure_partition(start) for start in sorted(self._pending)]
+        self._pending.clear()
+        return created
+
+    def ensure_partition(self, start: datetime) -> str:
+        """Create and attach the partition for a period if it is missing.
+
+        The partition is created as a plain table, rows of its range are
+        moved out of the default partition, and it is then attached, since
+        PostgreSQL refuses to attach a range still present in the default
+        partition. Does not commit.
+
+        Args:
+            start: Start of the partition range.
+
+        Returns:
+            Name of the partition.
+        """
+        name = self.partition_name(start)
+        if name in self._existing_partitions():
+            return name
+
+        _, end = self.period_bounds(start)
+        self.db.execute_query(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {self.table} INCLUDING DEFAULTS);")
+        self.db.execute_query(
+            f"""
+            WITH moved AS (
+                DELETE FROM {self.table}_default
+                WHERE {self.column} >= %s AND {self.column} < %s
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved;
+            """,
+            (start, end)
+        )
+        self.db.execute_query(
+            f"ALTER TABLE {self.table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s);",
+            (start, end)
+        )
+        self._existing.add(name)
+        logging.info(f"Created partition {name} for [{start}, {end}).")
+        return name
+
+    def drop_before(self, cutoff: datetime, dry_run: bool = False) -> List[str]:
+        """Drop every partition whose whole range lies before a cutoff.
+
+        Rows older than the cutoff in the default partition or in the
+        partition containing the cutoff are left untouched. Does not commit.
+
+        Args:
+            cutoff: Partitions ending at or before this timestamp are dropped.
+            dry_run: If True, only report the partitions that would be dropped.
+
+        Returns:
+            Names of the dropped partitions, oldest first.
+        """
+        expired = []
+        for name in self._existing_partitions():
+            bounds = self.partition_bounds(name)
+            if bounds and bounds[1] <= cutoff:
+                expired.append((bounds[0], name))
+
+        dropped = [name for _, name in sorted(expired)]
+        if dry_run:
+            return dropped
+
+        for name in dropped:
+            self.db.execute_query(f"DROP TABLE {name};")
+            self._existing.discard(name)
+            logging.info(f"Dropped partition {name}.")
+        return dropped
+
+    def partition_bounds(self, name: str) -> Optional[Tuple[datetime, datetime]]:
+        """Recover the range of a partition from its name.
+
+        Args:
+            name: Partition table name.
+
+        Returns:
+            Tuple of (start, end), or None for partitions not managed
+            here, such as the default partition.
+        """
+        match = self._name_pattern.match(name)
+        if not match:
+            return None
+        year, month, day = match.groups()
+        if day:
+            start = datetime(int(year), int(month), int(day))
+            return start, start + timedelta(days=1)
+        start = datetime(int(year), int(month), 1)
+        return start, _next_month(start)
+
+    def _existing_partitions(self) -> Set[str]:
+        """Return the names of the table's partitions, loaded once.
+
+        Returns:
+            Set of partition table names.
+        """
+        if self._existing is None:
+            rows = self.db.fetch_all(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = %s::regclass;
+                """,
+                (self.table,)
+            )
+            self._existing = {row[0] for row in rows}
+        return self._existing
+
+
+def _next_month(start: datetime) -> datetime:
+    """Return the first day of the month following a month start.
+
+    Args:
+        start: First day of a month.
+
+    Returns:
+        First day of the next month.
+    """
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
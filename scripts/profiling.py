@@ -0,0 +1,229 @@
+"""Query plan capture and slow-query report.
+
+This module provides the QueryProfiler class that runs each query under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), stores every plan as a JSON
+file, and writes a report with the slowest queries, the plan nodes
+taking the most time, row estimates that are far off, and sequential
+scans reading many rows. Plans can be opened in any EXPLAIN visualizer
+that reads PostgreSQL's JSON format.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+DEFAULT_PLANS_DIR = "output/plans"
+LARGE_SCAN_ROWS = 10000
+MISMATCH_FACTOR = 10
+TOP_NODES = 3
+
+
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield a plan node and all nodes below it, depth first.
+
+    Args:
+        plan: Plan node from EXPLAIN (FORMAT JSON).
+
+    Yields:
+        Plan node dictionaries.
+    """
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def self_time(node: Dict[str, Any]) -> float:
+    """Return the time spent in a node itself, excluding its children.
+
+    Actual times are per loop, so they are multiplied by the loop count.
+
+    Args:
+        node: Plan node with ANALYZE timings.
+
+    Returns:
+        Milliseconds spent in the node.
+    """
+    total = node.get("Actual Total Time", 0.0) * node.get("Actual Loops", 1)
+    children = sum(
+        child.get("Actual Total Time", 0.0) * child.get("Actual Loops", 1) for child in node.get("Plans", [])
+    )
+    return max(total - children, 0.0)
+
+
+def describe_node(node: Dict[str, Any]) -> str:
+    """Return a short label of a plan node, e.g. 'Index Scan using idx on events'.
+
+    Args:
+        node: Plan node.
+
+    Returns:
+        Node type with its index and relation, when it has them.
+    """
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        label += f" on {node['Relation Name']}"
+    return label
+
+
+class QueryProfiler:
+    """Captures query plans and reports where query time goes.
+
+    Profiling executes every query once more, under EXPLAIN ANALYZE.
+
+    Attributes:
+        directory: Directory receiving the plan files and the report.
+        large_scan_rows: Rows a sequential scan has to read to be reported.
+        mismatch_factor: Ratio between estimated and actual rows from
+            which an estimate is reported.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_PLANS_DIR,
+        large_scan_rows: int = LARGE_SCAN_ROWS,
+        mismatch_factor: float = MISMATCH_FACTOR
+    ):
+        """Initialize the profiler.
+
+        Args:
+            directory: Directory receiving the plan files and the report.
+            large_scan_rows: Rows a sequential scan has to read to be reported.
+            mismatch_factor: Estimated to actual rows ratio to report.
+        """
+        self.directory = Path(directory)
+        self.large_scan_rows = large_scan_rows
+        self.mismatch_factor = mismatch_factor
+
+    def profile(self, query) -> Dict[str, Any]:
+        """Explain a query, store its plan and summarize it.
+
+        Args:
+            query: BaseQuery instance.
+
+        Returns:
+            Summary dictionary, see summarize().
+        """
+        explain = query.explain()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{query.get_query_name()}.json"
+        path.write_text(json.dumps(explain, indent=2), encoding="utf-8")
+        summary = self.summarize(query.get_query_name(), explain)
+        logging.info(
+            f"Profiled {query.get_query_name()}: {summary['execution_ms']:.2f} ms, plan saved to {path}"
+        )
+        return summary
+
+    def summarize(self, name: str, explain: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize an EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) result.
+
+        Args:
+            name: Query name.
+            explain: Single element of the EXPLAIN JSON output, with
+                'Plan', 'Planning Time' and 'Execution Time' keys.
+
+        Returns:
+            Dictionary with the query timings, shared buffer counts, the
+            nodes taking the most time, row estimate mismatches and
+            large sequential scans.
+        """
+        plan = explain["Plan"]
+        nodes = list(iter_nodes(plan))
+
+        slowest = sorted(nodes, key=self_time, reverse=True)[:TOP_NODES]
+        mismatches = []
+        for node in nodes:
+            estimated, actual = node.get("Plan Rows", 0), node.get("Actual Rows", 0)
+            ratio = (max(estimated, actual) + 1) / (min(estimated, actual) + 1)
+            if ratio >= self.mismatch_factor:
+                mismatches.append({
+                    "node": describe_node(node),
+                    "estimated_rows": estimated,
+                    "actual_rows": actual,
+                    "ratio": round(ratio, 1),
+                })
+
+        mismatches.sort(key=lambda mismatch: mismatch["ratio"], reverse=True)
+
+        seq_scans = []
+        for node in nodes:
+            if node["Node Type"] != "Seq Scan":
+                continue
+            loops = node.get("Actual Loops", 1)
+            scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+            if scanned >= self.large_scan_rows:
+                seq_scans.append({
+                    "relation": node.get("Relation Name"),
+                    "rows_scanned": scanned,
+                    "rows_returned": node.get("Actual Rows", 0) * loops,
+                    "filter": node.get("Filter"),
+                })
+
+        return {
+            "query": name,
+            "planning_ms": explain.get("Planning Time"),
+            "execution_ms": explain.get("Execution Time"),
+            "shared_hit_blocks": plan.get("Shared Hit Blocks"),
+            "shared_read_blocks": plan.get("Shared Read Blocks"),
+            "top_nodes": [
+                {
+                    "node": describe_node(node),
+                    "self_ms": round(self_time(node), 3),
+                    "total_cost": node.get("Total Cost"),
+                    "actual_rows": node.get("Actual Rows"),
+                    "loops": node.get("Actual Loops"),
+                }
+                for node in slowest
+            ],
+            "row_estimate_mismatches": mismatches,
+            "large_seq_scans": seq_scans,
+        }
+
+    def write_report(self, summaries: List[Dict[str, Any]]) -> Tuple[Path, Path]:
+        """Write the summaries, slowest query first, as JSON and text.
+
+        Args:
+            summaries: Summaries returned by profile().
+
+        Returns:
+            Tuple of (JSON report path, text report path).
+        """
+        ordered = sorted(summaries, key=lambda summary: summary["execution_ms"] or 0.0, reverse=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        json_path = self.directory / "report.json"
+        json_path.write_text(json.dumps(ordered, indent=2), encoding="utf-8")
+        text_path = self.directory / "report.txt"
+        text_path.write_text(self.format_report(ordered), encoding="utf-8")
+        return json_path, text_path
+
+    def format_report(self, summaries: List[Dict[str, Any]]) -> str:
+        """Render summaries as a plain-text report.
+
+        Args:
+            summaries: Summaries in the order to report them.
+
+        Returns:
+            Report text.
+        """
+        lines = []
+        for summary in summaries:
+            lines.append(
+                f"{summary['query']}: {summary['execution_ms']:.2f} ms execution, "
+                f"{summary['planning_ms']:.2f} ms planning"
+            )
+            for node in summary["top_nodes"]:
+                loops = f" x {node['loops']} loops" if (node["loops"] or 1) > 1 else ""
+                lines.append(f"  {node['self_ms']:>10.3f} ms  {node['node']} ({node['actual_rows']} rows{loops})")
+            for scan in summary["large_seq_scans"]:
+                lines.append(
+                    f"  seq scan on {scan['relation']}: {scan['rows_scanned']} rows read, "
+                    f"{scan['rows_returned']} returned"
+                )
+            for mismatch in summary["row_estimate_mismatches"]:
+                lines.append(
+                    f"  estimate off {mismatch['ratio']}x at {mismatch['node']}: "
+                    f"{mismatch['estimated_rows']} estimated, {mismatch['actual_rows']} actual"
+                )
+        return "\n".join(lines) + "\n"
@@ -2,13 +2,24 @@
 
 This package provides query classes for analyzing IoT data stored
 in PostgreSQL. Each query class encapsulates a single analytical query
-following the Single Responsibility Principle.
+following the Single Responsibility Principle. ALL_QUERIES lists them
+in the order the pipeline runs and exports them.
 """
 
-from .leaf_locations import LeafLocationsQuery  # noqa: F401
-from .lowest_sublocations import LowestSublocationsQuery  # noqa: F401
-from .smart_lamp_events import SmartLampEventsQuery  # noqa: F401
-from .avg_brightness import AvgBrightnessQuery  # noqa: F401
-from .leak_locations import LeakLocationsQuery  # noqa: F401
-from .devices_no_events import DevicesNoEventsQuery  # noqa: F401
-from .top_smart_lamp_locations import TopSmartLampLocationsQuery  # noqa: F401
+from .leaf_locations import LeafLocationsQuery
+from .lowest_sublocations import LowestSublocationsQuery
+from .smart_lamp_events import SmartLampEventsQuery
+from .avg_brightness import AvgBrightnessQuery
+from .leak_locations import LeakLocationsQuery
+from .devices_no_events import DevicesNoEventsQuery
+from .top_smart_lamp_locations import TopSmartLampLocationsQuery
+
+ALL_QUERIES = [
+    LeafLocationsQuery,
+    LowestSublocationsQuery,
+    SmartLampEventsQuery,
+    AvgBrightnessQuery,
+    LeakLocationsQuery,
+    DevicesNoEventsQuery,
+    TopSmartLampLocationsQuery
+]
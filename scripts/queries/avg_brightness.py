@@ -1,7 +1,8 @@
 """Query for calculating average Smart Lamp brightness by location.
 
-This module aggregates brightness values for Smart Lamp on events,
-grouped by location.
+This module averages brightness values for Smart Lamp on events,
+grouped by location, from the daily brightness rollup maintained by
+EventImporter.
 """
 
 from typing import List
@@ -26,19 +27,19 @@ class AvgBrightnessQuery(BaseQuery):
     def get_sql(self) -> str:
         """Return SQL to calculate average brightness by location.
 
-        Joins locations, devices, and events tables, filtering for
-        Smart Lamp on events and computing AVG on brightness.
+        Reads the per-location daily brightness sums and counts, so the
+        cost depends on the number of locations and days rather than
+        events. Dividing the numeric sums gives the same value and type
+        as AVG over the raw events.
 
         Returns:
             SQL query with aggregation grouped by location.
         """
         return """
-            SELECT locations.location_name, AVG((events.details->>'brightness')::int) AS average_brightness
+            SELECT locations.location_name,
+                SUM(daily.brightness_sum) / NULLIF(SUM(daily.brightness_count), 0) AS average_brightness
                 FROM locations
-                JOIN devices ON devices.location_id = locations.location_id
-                JOIN events ON events.device_id = devices.device_id
-                WHERE devices.device_type = 'Smart Lamp'
-                AND events.details->>'new_status' = 'on'
+                JOIN location_brightness_daily daily ON daily.location_id = locations.location_id
                 GROUP BY locations.location_name
         """
 
@@ -5,7 +5,9 @@ must inherit from, following the Template Method design pattern.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, BinaryIO, Iterator, List, Tuple
+from scripts.database import DEFAULT_ITERSIZE
+from scripts.metrics import METRICS
 
 
 class BaseQuery(ABC):
@@ -61,15 +63,81 @@ class BaseQuery(ABC):
         """
         pass
 
-    def execute(self) -> List[Dict[str, Any]]:
+    def execute(self, prepare: bool = False) -> List[Dict[str, Any]]:
         """Execute the query and return results as dictionaries.
 
+        The execution is recorded in METRICS as the stage 'query.<name>'.
+
+        Args:
+            prepare: Run the query as a statement prepared once per
+                connection. Only pays off when the same query runs
+                repeatedly on one connection; a single run costs an
+                extra PREPARE round trip.
+
         Returns:
             List of dictionaries where keys are column names
             and values are the corresponding row values.
         """
-        rows = self.db.fetch_all(self.get_sql())
-        return self._convert_to_dicts(rows)
+        with METRICS.stage(f"query.{self.get_query_name()}") as stage:
+            rows = self._convert_to_dicts(self.db.fetch_all(self.get_sql(), prepare=prepare))
+            stage.rows_out = len(rows)
+        return rows
+
+    def explain(self) -> Dict[str, Any]:
+        """Execute the query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+
+        The query really runs, so the plan carries actual row counts,
+        timings and buffer usage.
+
+        Returns:
+            Dictionary with 'Plan', 'Planning Time' and 'Execution Time' keys.
+        """
+        row = self.db.fetch_one(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {self.get_sql()}")
+        return row[0][0]
+
+    def iter_execute(self, itersize: int = DEFAULT_ITERSIZE) -> Iterator[Dict[str, Any]]:
+        """Execute the query and lazily yield results as dictionaries.
+
+        Rows are read through a server-side cursor and converted one at
+        a time, so large result sets can be consumed without holding
+        them in memory.
+
+        Args:
+            itersize: Number of rows fetched from the server per round trip.
+
+        Yields:
+            Dictionaries where keys are column names and values are
+            the corresponding row values.
+        """
+        columns = self.get_columns()
+        for row in self.db.iter_all(self.get_sql(), itersize=itersize):
+            yield dict(zip(columns, row))
+
+    def iter_batches(self, batch_size: int = DEFAULT_ITERSIZE) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Execute the query and lazily yield raw row batches.
+
+        Intended for exporters that write columnar output straight
+        from the cursor without building row dictionaries.
+
+        Args:
+            batch_size: Number of rows per batch.
+
+        Yields:
+            Tuples of (cursor description, list of row tuples).
+        """
+        yield from self.db.iter_batches(self.get_sql(), batch_size=batch_size)
+
+    def copy_to(self, file: BinaryIO, options: str = "FORMAT csv, HEADER true") -> int:
+        """Execute the query and let the server write its result to a file.
+
+        Args:
+            file: Binary file object receiving the output.
+            options: COPY options, e.g. "FORMAT csv, HEADER true".
+
+        Returns:
+            Number of rows written.
+        """
+        return self.db.copy_to(self.get_sql(), file, options)
 
     def _convert_to_dicts(self, rows: List[tuple]) -> List[Dict[str, Any]]:
         """Convert tuple rows to dictionaries using column names.
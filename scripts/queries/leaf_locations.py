@@ -10,8 +10,8 @@ from .base import BaseQuery
 class LeafLocationsQuery(BaseQuery):
     """Query to find all locations that have no child locations.
 
-    Uses a LEFT JOIN with self-reference to identify locations
-    that are not the parent of any other location.
+    Uses a LEFT JOIN against the location_closure table to identify
+    locations that have no descendant one level below them.
     """
 
     def get_query_name(self) -> str:
@@ -25,14 +25,17 @@ class LeafLocationsQuery(BaseQuery):
     def get_sql(self) -> str:
         """Return SQL to find locations without sublocations.
 
+        The anti-join is an indexed lookup on the closure table's
+        (ancestor_id, descendant_id) primary key.
+
         Returns:
             SQL query using LEFT JOIN to find leaf locations.
         """
         return """
             SELECT l.location_name
             FROM locations l
-            LEFT JOIN locations sub ON l.location_id = sub.parent_location_id
-            WHERE sub.location_id IS NULL
+            LEFT JOIN location_closure sub ON sub.ancestor_id = l.location_id AND sub.depth = 1
+            WHERE sub.descendant_id IS NULL
         """
 
     def get_columns(self) -> List[str]:
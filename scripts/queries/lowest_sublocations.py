@@ -1,7 +1,7 @@
-"""Query for finding the deepest sublocation for each root location.
+"""Query for finding the deepest sublocation for each location.
 
-This module uses recursive CTEs to traverse the location hierarchy
-and find the lowest level sublocation for each top-level location.
+This module reads the materialized location_closure table to find
+the lowest level sublocation below each location.
 """
 
 from typing import List
@@ -11,9 +11,9 @@ from .base import BaseQuery
 class LowestSublocationsQuery(BaseQuery):
     """Query to find the deepest sublocation for each location hierarchy.
 
-    Uses a recursive Common Table Expression (CTE) to traverse the
-    location tree and identify the maximum depth sublocation for
-    each root location.
+    Uses the location_closure table, which stores every
+    ancestor/descendant pair with its depth, to identify the maximum
+    depth sublocation for each location without recursing over the tree.
     """
 
     def get_query_name(self) -> str:
@@ -25,40 +25,26 @@ class LowestSublocationsQuery(BaseQuery):
         return "lowest_sublocations"
 
     def get_sql(self) -> str:
-        """Return SQL using recursive CTE to find deepest sublocations.
+        """Return SQL using the closure table to find deepest sublocations.
 
-        The recursive CTE builds the complete hierarchy with depth tracking,
-        then selects only the maximum depth nodes for each root.
+        Computes the maximum descendant depth per ancestor once, then
+        joins back to the closure rows at that depth.
 
         Returns:
-            SQL query with recursive CTE for hierarchy traversal.
+            SQL query over location_closure for hierarchy lookups.
         """
         return """
-            WITH RECURSIVE hierarchy AS (
-                SELECT
-                    location_id,
-                    location_name,
-                    location_id AS root_id,
-                    location_name AS root_name,
-                    0 AS depth
-                FROM locations
-
-                UNION ALL
-
-                SELECT
-                    child.location_id,
-                    child.location_name,
-                    parent.root_id,
-                    parent.root_name,
-                    parent.depth + 1
-                FROM locations child
-                JOIN hierarchy parent ON child.parent_location_id = parent.location_id
-            )
-            SELECT root_name AS location_name, location_name AS lowest_sublocation
-            FROM hierarchy h1
-            WHERE depth = (SELECT MAX(depth) FROM hierarchy h2 WHERE h2.root_id = h1.root_id)
-              AND depth > 0
-            ORDER BY root_name
+            SELECT root.location_name, leaf.location_name AS lowest_sublocation
+            FROM location_closure c
+            JOIN (
+                SELECT ancestor_id, MAX(depth) AS max_depth
+                FROM location_closure
+                GROUP BY ancestor_id
+            ) deepest ON deepest.ancestor_id = c.ancestor_id AND deepest.max_depth = c.depth
+            JOIN locations root ON root.location_id = c.ancestor_id
+            JOIN locations leaf ON leaf.location_id = c.descendant_id
+            WHERE c.depth > 0
+            ORDER BY root.location_name
         """
 
     def get_columns(self) -> List[str]:
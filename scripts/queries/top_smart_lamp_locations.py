@@ -1,7 +1,8 @@
 """Query for finding locations with the most Smart Lamp devices.
 
-This module ranks locations by their Smart Lamp device count
-and returns the top three.
+This module ranks locations by their Smart Lamp device count, read
+from the lamp count rollup maintained by DeviceImporter, and returns
+the top three.
 """
 
 from typing import List
@@ -26,17 +27,16 @@ class TopSmartLampLocationsQuery(BaseQuery):
     def get_sql(self) -> str:
         """Return SQL to find top 3 locations by Smart Lamp count.
 
-        Groups devices by location, counts Smart Lamps, orders
+        Sums the per-location lamp counts by location name, orders
         descending, and limits to 3 results.
 
         Returns:
             SQL query with GROUP BY, ORDER BY, and LIMIT clauses.
         """
         return """
-            SELECT l.location_name, COUNT(d.device_id) AS device_count
+            SELECT l.location_name, SUM(c.lamp_count) AS device_count
             FROM locations l
-            JOIN devices d ON l.location_id = d.location_id
-            WHERE d.device_type = 'Smart Lamp'
+            JOIN location_lamp_counts c ON l.location_id = c.location_id
             GROUP BY l.location_name
             ORDER BY device_count DESC
             LIMIT 3
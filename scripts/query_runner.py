@@ -4,7 +4,11 @@ This module provides the QueryRunner class that orchestrates
 the execution of multiple queries and exports results.
 """
 
-from typing import List, Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from scripts.cache import read_data_version
+from scripts.database import DEFAULT_ITERSIZE
 
 
 class QueryRunner:
@@ -17,35 +21,196 @@ class QueryRunner:
     Attributes:
         db: DatabaseManager instance for query execution.
         exporter: BaseExporter instance for result output.
+        workers: Number of queries executed concurrently.
+        cache: Optional QueryCache reused by run_all() while the data
+            version is unchanged.
     """
 
-    def __init__(self, db_manager, exporter):
+    def __init__(self, db_manager, exporter, workers: int = 1, cache=None):
         """Initialize QueryRunner with database and exporter.
 
         Args:
             db_manager: DatabaseManager instance for database operations.
             exporter: BaseExporter subclass instance for output formatting.
+            workers: Number of queries to run concurrently. With more than
+                one worker each query runs on its own connection, taken
+                from the manager's pool when it has one.
+            cache: Optional QueryCache for run_all() results.
         """
         self.db = db_manager
         self.exporter = exporter
+        self.workers = workers
+        self.cache = cache
 
     def run_all(self, queries: List[Type], output_path: str) -> None:
         """Execute all queries and export results to a single file.
 
         Instantiates each query class, executes it, collects results
         into a dictionary keyed by query name, and exports to the
-        specified file path.
+        specified file path. Results keep the order of the queries
+        list even when the queries run concurrently.
+
+        With a cache, the data version is read once up front and every
+        query whose result is cached for that version is answered
+        without touching the database.
+
+        Args:
+            queries: List of BaseQuery subclass types to execute.
+            output_path: Destination file path for exported results.
+        """
+        version = read_data_version(self.db) if self.cache else None
+
+        if self.workers > 1 and len(queries) > 1:
+            results = self._run_parallel(queries, version)
+        else:
+            results = {}
+            for QueryClass in queries:
+                query = QueryClass(self.db)
+                name = query.get_query_name()
+                data = self._execute(query, version)
+                results[name] = data
+
+        self.exporter.export(results, output_path)
+
+    def stream_all(self, queries: List[Type], output_path: str, itersize: int = DEFAULT_ITERSIZE) -> None:
+        """Execute all queries and stream their rows into a single file.
+
+        Each query is executed through a server-side cursor only when
+        the exporter reaches its section, and its rows are written as
+        they arrive. Queries run one after another on the shared
+        connection, in the order given.
 
         Args:
             queries: List of BaseQuery subclass types to execute.
             output_path: Destination file path for exported results.
+            itersize: Number of rows fetched from the server per round trip.
+        """
+        self.exporter.export_stream(self._iter_sections(queries, itersize), output_path)
+
+    def export_each(self, queries: List[Type], output_dir: str) -> List[str]:
+        """Execute all queries and export each result to its own file.
+
+        Used with per-query exporters (BaseQueryExporter), which read
+        the rows from the database themselves. With more than one
+        worker the queries are exported concurrently, each on its own
+        session.
+
+        Args:
+            queries: List of BaseQuery subclass types to execute.
+            output_dir: Directory receiving one file per query.
+
+        Returns:
+            Paths of the written files, in queries order.
+        """
+        if self.workers > 1 and len(queries) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self._export_isolated, QueryClass, output_dir) for QueryClass in queries]
+                return [future.result() for future in futures]
+
+        return [self.exporter.export_query(QueryClass(self.db), output_dir) for QueryClass in queries]
+
+    def profile_all(self, queries: List[Type], profiler) -> List[Dict[str, Any]]:
+        """Capture the plan of every query and write the profile report.
+
+        Queries are explained one after another on the shared
+        connection, so their timings do not compete with each other.
+
+        Args:
+            queries: List of BaseQuery subclass types to profile.
+            profiler: QueryProfiler storing the plans and the report.
+
+        Returns:
+            Plan summaries in queries order.
         """
-        results = {}
+        summaries = [profiler.profile(QueryClass(self.db)) for QueryClass in queries]
+        profiler.write_report(summaries)
+        return summaries
+
+    def _iter_sections(self, queries: List[Type], itersize: int) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """Lazily pair each query name with its streamed rows.
 
+        Args:
+            queries: List of BaseQuery subclass types to execute.
+            itersize: Number of rows fetched from the server per round trip.
+
+        Yields:
+            Tuples of (query name, iterator over row dictionaries).
+        """
         for QueryClass in queries:
             query = QueryClass(self.db)
-            name = query.get_query_name()
-            data = query.execute()
-            results[name] = data
+            yield query.get_query_name(), query.iter_execute(itersize)
 
-        self.exporter.export(results, output_path)
+    def _execute(self, query, version: Optional[int]) -> List[Dict[str, Any]]:
+        """Execute a query, going through the cache when one is configured.
+
+        Args:
+            query: BaseQuery instance.
+            version: Current data version, or None without a cache.
+
+        Returns:
+            List of result row dictionaries.
+        """
+        if self.cache is None:
+            return query.execute()
+        return self.cache.execute(query, version)
+
+    def _run_parallel(self, queries: List[Type], version: Optional[int] = None) -> Dict[str, Any]:
+        """Execute queries concurrently on a thread pool.
+
+        Queries spend their time waiting on PostgreSQL, so threads are
+        enough to overlap them. A psycopg2 connection cannot run two
+        statements at once, so every query runs in its own session.
+
+        Args:
+            queries: List of BaseQuery subclass types to execute.
+            version: Current data version, or None without a cache.
+
+        Returns:
+            Dictionary of results keyed by query name, in queries order.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_isolated, QueryClass, version) for QueryClass in queries]
+            results = {}
+            for future in futures:
+                name, data = future.result()
+                results[name] = data
+        return results
+
+    def _run_isolated(self, query_class: Type, version: Optional[int] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Execute a single query on a dedicated database session.
+
+        The cache is checked first, so a cached query never checks out
+        a pooled connection.
+
+        Args:
+            query_class: BaseQuery subclass type to execute.
+            version: Current data version, or None without a cache.
+
+        Returns:
+            Tuple of (query name, result rows).
+        """
+        if self.cache is not None:
+            query = query_class(self.db)
+            rows = self.cache.lookup(query, version)
+            if rows is not None:
+                return query.get_query_name(), rows
+
+        with self.db.session() as db:
+            query = query_class(db)
+            rows = query.execute()
+            if self.cache is not None:
+                self.cache.put(self.cache.key(query, version), rows)
+            return query.get_query_name(), rows
+
+    def _export_isolated(self, query_class: Type, output_dir: str) -> str:
+        """Export a single query result on a dedicated database session.
+
+        Args:
+            query_class: BaseQuery subclass type to execute.
+            output_dir: Directory receiving the exported file.
+
+        Returns:
+            Path of the written file.
+        """
+        with self.db.session() as db:
+            return self.exporter.export_query(query_class(db), output_dir)
@@ -0,0 +1,138 @@
+"""Low-overhead debug tracing of the data layer.
+
+This module provides the DataTracer class used by DatabaseManager in
+place of per-call f-string debug logs. Messages are formatted lazily by
+the logging module, so nothing is formatted unless the data logger is
+enabled for DEBUG. Rows are traced by sampling, one row out of every
+sample_every per table, and batch operations log a single summary line
+per batch instead of one line per row.
+
+Tracing is off under the default INFO logging. run.py turns it on with
+--trace-sample, which enables DEBUG on the data logger only.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+TRACE_LOGGER = "iot_pipeline.data"
+DEFAULT_SAMPLE_EVERY = 1000
+
+
+class DataTracer:
+    """Sampled row tracing and batch summaries on a dedicated logger.
+
+    Every method returns immediately, before any formatting or counting,
+    when the logger is not enabled for DEBUG.
+
+    Attributes:
+        logger: Logger receiving the trace messages.
+        sample_every: Trace one row out of every sample_every rows of a
+            table; 0 disables row tracing while keeping batch summaries.
+    """
+
+    def __init__(self, logger_name: str = TRACE_LOGGER, sample_every: int = DEFAULT_SAMPLE_EVERY):
+        """Initialize the tracer.
+
+        Args:
+            logger_name: Name of the logger to trace to.
+            sample_every: Row sampling interval, or 0 to trace no rows.
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.sample_every = sample_every
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        """Return whether trace messages are emitted.
+
+        Returns:
+            True if the logger is enabled for DEBUG.
+        """
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def configure(self, sample_every: int, level: int = logging.DEBUG) -> None:
+        """Set the sampling interval and the level of the data logger.
+
+        Args:
+            sample_every: Row sampling interval, or 0 to trace no rows.
+            level: Level of the data logger; DEBUG turns tracing on.
+        """
+        self.sample_every = sample_every
+        self.logger.setLevel(level)
+        with self._lock:
+            self._seen.clear()
+
+    def row(self, table: str, data: Dict[str, Any]) -> None:
+        """Count a row written to a table and trace it if it is sampled.
+
+        Args:
+            table: Target table name.
+            data: Row dictionary; only formatted when sampled.
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.rows(table, (data,))
+
+    def rows(self, table: str, rows: Sequence[Any]) -> None:
+        """Count a batch of rows written to a table and trace the sampled ones.
+
+        Args:
+            table: Target table name.
+            rows: Rows of the batch; only the sampled ones are formatted.
+        """
+        if not self.sample_every or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        with self._lock:
+            seen = self._seen.get(table, 0)
+            self._seen[table] = seen + len(rows)
+        first = -seen % self.sample_every
+        for index in range(first, len(rows), self.sample_every):
+            self.logger.debug("Row %d of %s: %r", seen + index + 1, table, rows[index])
+
+    def batch(
+        self,
+        operation: str,
+        table: str,
+        rows: int,
+        inserted: Optional[int] = None,
+        started: Optional[float] = None
+    ) -> None:
+        """Log a one-line summary of a batch operation.
+
+        Args:
+            operation: Operation name, e.g. 'insert_many' or 'copy_insert'.
+            table: Target table name.
+            rows: Number of rows sent in the batch.
+            inserted: Number of rows actually inserted, if known.
+            started: time.perf_counter() value at the start of the batch.
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        if inserted is None:
+            self.logger.debug("%s into %s: %d rows in %.3fs", operation, table, rows, elapsed)
+        else:
+            self.logger.debug(
+                "%s into %s: %d rows, %d inserted, %d skipped in %.3fs",
+                operation, table, rows, inserted, rows - inserted, elapsed
+            )
+
+    def query(self, action: str, query: str, rows: Optional[int] = None) -> None:
+        """Log a query, formatted only when tracing is enabled.
+
+        Args:
+            action: What was done, e.g. 'Fetched'.
+            query: SQL query text.
+            rows: Number of result rows, if known.
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if rows is None:
+            self.logger.debug("%s query: %s", action, query)
+        else:
+            self.logger.debug("%s %d rows for query: %s", action, rows, query)
+
+
+TRACE = DataTracer()
@@ -0,0 +1,141 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from scripts.async_pipeline import AsyncPipeline, _PagePrefetcher, _connect_params
+
+pytest.importorskip("asyncpg")
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def _mock_conn(column_types):
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=list(column_types.items()))
+    conn.fetchval = AsyncMock(side_effect=lambda sql, *arrays: len(arrays[0]))
+    conn.execute = AsyncMock()
+    return conn
+
+
+def _pipeline(conn):
+    pipeline = AsyncPipeline({"dbname": "iot"}, page_size=2)
+    pipeline.pool = MagicMock()
+    pipeline.pool.acquire.return_value.__aenter__.return_value = conn
+    return pipeline
+
+
+class TestPagePrefetcher:
+
+    def test_yields_pages_in_order(self):
+        async def collect():
+            return [page async for page in _PagePrefetcher(range(5), 2)]
+
+        assert _run(collect()) == [[0, 1], [2, 3], [4]]
+
+    def test_reads_next_page_while_caller_works(self):
+        consumed = []
+
+        def rows():
+            for i in range(4):
+                consumed.append(i)
+                yield i
+
+        async def scenario():
+            pages = _PagePrefetcher(rows(), 2)
+            first = await pages.next_page()
+            await asyncio.sleep(0.05)
+            read_ahead = list(consumed)
+            await pages.next_page()
+            return first, read_ahead
+
+        first, read_ahead = _run(scenario())
+
+        assert first == [0, 1]
+        assert read_ahead == [0, 1, 2, 3]
+
+
+class TestAsyncPipeline:
+
+    def test_connect_params_map_config_keys(self):
+        params = _connect_params({"dbname": "iot", "user": "u", "password": "p", "host": "h", "port": "5433"})
+
+        assert params == {"database": "iot", "user": "u", "password": "p", "host": "h", "port": 5433}
+
+    def test_load_requires_connect(self):
+        pipeline = AsyncPipeline({"dbname": "iot"})
+
+        with pytest.raises(RuntimeError, match="Database connection not established"):
+            _run(pipeline.load([], [], []))
+
+    def test_insert_sql_casts_text_arrays_and_keeps_rollup(self):
+        conn = _mock_conn({"event_id": "character varying", "timestamp": "timestamp without time zone"})
+        pipeline = _pipeline(conn)
+
+        sql = _run(pipeline._insert_sql(conn, "events", ["event_id", "timestamp"], "event_id, timestamp", "ROLLUP"))
+
+        assert "SELECT page.event_id::character varying, page.timestamp::timestamp without time zone" in sql
+        assert "FROM unnest($1::text[], $2::text[]) AS page (event_id, timestamp)" in sql
+        assert "ON CONFLICT (event_id, timestamp) DO NOTHING RETURNING *)" in sql
+        assert "derived AS (ROLLUP)" in sql
+        assert sql.endswith("SELECT COUNT(*) FROM inserted")
+
+    def test_column_types_leave_out_length_modifiers(self):
+        conn = _mock_conn({"event_id": "character varying"})
+        pipeline = _pipeline(conn)
+
+        _run(pipeline._get_column_types(conn, "events"))
+
+        assert "format_type(atttypid, NULL)" in conn.fetch.call_args[0][0]
+
+    def test_insert_pages_sends_columns_as_text(self):
+        conn = _mock_conn({"ancestor_id": "text", "descendant_id": "text", "depth": "integer"})
+        pipeline = _pipeline(conn)
+        rows = [
+            {"ancestor_id": "a", "descendant_id": "a", "depth": 0},
+            {"ancestor_id": "a", "descendant_id": "b", "depth": 1},
+            {"ancestor_id": "b", "descendant_id": "b", "depth": None},
+        ]
+
+        result = _run(pipeline._insert_pages(conn, "location_closure", _PagePrefetcher(rows, 2)))
+
+        assert result == (3, 0)
+        first_page = conn.fetchval.call_args_list[0][0][1:]
+        assert first_page == (["a", "a"], ["a", "b"], ["0", "1"])
+        assert conn.fetchval.call_args_list[1][0][3] == [None]
+        conn.fetch.assert_called_once()
+
+    @pytest.mark.parametrize("inserted, bumps", [(1, 1), (0, 0)])
+    def test_load_entity_bumps_data_version_in_its_transaction(self, inserted, bumps):
+        conn = _mock_conn({"device_id": "text"})
+        conn.fetchval = AsyncMock(return_value=inserted)
+        pipeline = _pipeline(conn)
+        importer = MagicMock()
+        importer.get_table_name.return_value = "devices"
+        importer.get_conflict_column.return_value = "device_id"
+        importer.get_rollup_sql.return_value = None
+
+        result = _run(pipeline._load_entity(importer, _PagePrefetcher([{"device_id": "d1"}], 2)))
+
+        assert result == (inserted, 1 - inserted)
+        assert conn.execute.await_count == bumps
+        if bumps:
+            assert "version + 1" in conn.execute.await_args[0][0]
+
+    def test_run_queries_returns_results_in_query_order(self):
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=lambda sql: [("Kitchen", 2)] if "first" in sql else [("Hall", 1)])
+        pipeline = _pipeline(conn)
+
+        def query_class(name, sql):
+            query_class = MagicMock()
+            query_class.return_value.get_query_name.return_value = name
+            query_class.return_value.get_sql.return_value = sql
+            query_class.return_value.get_columns.return_value = ["location_name", "device_count"]
+            return query_class
+
+        results = _run(pipeline.run_queries([query_class("a", "first"), query_class("b", "second")]))
+
+        assert list(results) == ["a", "b"]
+        assert results["a"] == [{"location_name": "Kitchen", "device_count": 2}]
+        assert results["b"] == [{"location_name": "Hall", "device_count": 1}]
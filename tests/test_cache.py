@@ -0,0 +1,111 @@
+import os
+import pickle
+import pytest
+from unittest.mock import Mock
+from scripts.cache import QueryCache, bump_data_version, read_data_version
+
+
+def _query(name="average_brightness", sql="SELECT 1", rows=None):
+    query = Mock()
+    query.get_query_name.return_value = name
+    query.get_sql.return_value = sql
+    query.execute.return_value = rows if rows is not None else [{"value": 1}]
+    return query
+
+
+class TestDataVersion:
+
+    def test_read_data_version_returns_counter(self):
+        db = Mock()
+        db.fetch_one.return_value = (7,)
+
+        assert read_data_version(db) == 7
+        assert "FROM data_version" in db.fetch_one.call_args[0][0]
+
+    def test_read_data_version_defaults_to_zero(self):
+        db = Mock()
+        db.fetch_one.return_value = None
+
+        assert read_data_version(db) == 0
+
+    def test_bump_data_version_increments_without_commit(self):
+        db = Mock()
+
+        bump_data_version(db)
+
+        assert "version = data_version.version + 1" in db.execute_query.call_args[0][0]
+        db.commit.assert_not_called()
+
+
+class TestQueryCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return QueryCache(tmp_path / "cache", namespace="localhost:5432/iot")
+
+    def test_key_depends_on_sql_version_and_namespace(self, cache, tmp_path):
+        query = _query()
+        other_db = QueryCache(tmp_path / "cache", namespace="localhost:5432/other")
+
+        key = cache.key(query, 1)
+
+        assert key.startswith("average_brightness-")
+        assert key == cache.key(_query(), 1)
+        assert key != cache.key(query, 2)
+        assert key != cache.key(_query(sql="SELECT 2"), 1)
+        assert key != other_db.key(query, 1)
+
+    def test_execute_runs_query_once_per_version(self, cache):
+        query = _query(rows=[{"location_name": "Kitchen"}])
+
+        first = cache.execute(query, 3)
+        second = cache.execute(query, 3)
+
+        assert first == second == [{"location_name": "Kitchen"}]
+        query.execute.assert_called_once()
+
+    def test_execute_reruns_query_after_version_bump(self, cache):
+        query = _query()
+
+        cache.execute(query, 3)
+        cache.execute(query, 4)
+
+        assert query.execute.call_count == 2
+
+    def test_lookup_never_executes_query(self, cache):
+        query = _query(rows=[{"location_name": "Kitchen"}])
+
+        assert cache.lookup(query, 3) is None
+        cache.execute(query, 3)
+
+        assert cache.lookup(query, 3) == [{"location_name": "Kitchen"}]
+        query.execute.assert_called_once()
+
+    def test_get_misses_unknown_key(self, cache):
+        assert cache.get("missing") is None
+
+    def test_get_ignores_corrupt_entry(self, cache):
+        cache.directory.mkdir(parents=True)
+        (cache.directory / "broken.pickle").write_bytes(b"not a pickle")
+
+        assert cache.get("broken") is None
+
+    def test_put_leaves_no_temporary_files(self, cache):
+        cache.put("key", [{"a": 1}])
+
+        assert [path.name for path in cache.directory.iterdir()] == ["key.pickle"]
+        assert pickle.loads((cache.directory / "key.pickle").read_bytes()) == [{"a": 1}]
+
+    def test_put_evicts_least_recently_used_entries(self, tmp_path):
+        rows = [{"payload": "x" * 1000}]
+        entry_size = len(pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL))
+        cache = QueryCache(tmp_path, max_bytes=entry_size * 2)
+
+        cache.put("old", rows)
+        cache.put("recent", rows)
+        os.utime(tmp_path / "old.pickle", (1, 1))
+        os.utime(tmp_path / "recent.pickle", (2, 2))
+        cache.get("old")
+        cache.put("new", rows)
+
+        assert sorted(path.stem for path in tmp_path.glob("*.pickle")) == ["new", "old"]
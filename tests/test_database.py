@@ -1,6 +1,6 @@
 import pytest
-from unittest.mock import Mock, patch
-from scripts.database import DatabaseManager
+from unittest.mock import MagicMock, Mock, patch
+from scripts.database import DatabaseManager, _CopyStream, _server_placeholders, _to_copy_line
 
 
 class TestDatabaseManagerConnection:
@@ -46,6 +46,102 @@ class TestDatabaseManagerConnection:
         db.close()
 
 
+class TestDatabaseManagerPool:
+
+    POOL_PARAMS = {"minconn": 1, "maxconn": 2}
+
+    @pytest.fixture
+    def mock_pool(self):
+        with patch("scripts.database.ThreadedConnectionPool") as mock_pool_class:
+            pool = mock_pool_class.return_value
+            pool.getconn.side_effect = lambda: MagicMock(closed=0)
+            yield pool
+
+    @pytest.fixture
+    def pooled_db(self, mock_pool):
+        db = DatabaseManager({"dbname": "test"}, pool_params=self.POOL_PARAMS)
+        db.connect()
+        return db
+
+    def test_connect_creates_pool_and_checks_out_primary(self, mock_pool):
+        db = DatabaseManager({"dbname": "test"}, pool_params=self.POOL_PARAMS)
+
+        with patch("scripts.database.ThreadedConnectionPool") as mock_pool_class:
+            mock_pool_class.return_value = mock_pool
+            db.connect()
+
+        mock_pool_class.assert_called_once_with(1, 2, dbname="test")
+        assert db.conn is not None
+        mock_pool.getconn.assert_called_once()
+
+    def test_connection_checks_out_and_returns(self, pooled_db, mock_pool):
+        with pooled_db.connection() as conn:
+            assert conn is not pooled_db.conn
+
+        mock_pool.putconn.assert_called_once_with(conn, close=False)
+
+    def test_connection_returns_on_error(self, pooled_db, mock_pool):
+        with pytest.raises(ValueError):
+            with pooled_db.connection():
+                raise ValueError("failure inside block")
+
+        mock_pool.putconn.assert_called_once()
+
+    def test_checkout_replaces_broken_connection(self, pooled_db, mock_pool):
+        broken = MagicMock(closed=1)
+        healthy = MagicMock(closed=0)
+        mock_pool.getconn.side_effect = [broken, healthy]
+
+        with pooled_db.connection() as conn:
+            assert conn is healthy
+
+        mock_pool.putconn.assert_any_call(broken, close=True)
+
+    def test_checkout_rejects_unresponsive_connection(self, pooled_db, mock_pool):
+        import psycopg2
+        unresponsive = MagicMock(closed=0)
+        unresponsive.cursor.return_value.__enter__.side_effect = psycopg2.OperationalError("gone")
+        healthy = MagicMock(closed=0)
+        mock_pool.getconn.side_effect = [unresponsive, healthy]
+
+        with pooled_db.connection() as conn:
+            assert conn is healthy
+
+    def test_session_yields_manager_bound_to_pooled_connection(self, pooled_db, mock_pool):
+        with pooled_db.session() as session_db:
+            assert isinstance(session_db, DatabaseManager)
+            assert session_db.conn is not pooled_db.conn
+            assert session_db.pool is None
+
+        mock_pool.putconn.assert_called_once()
+
+    def test_session_without_pool_opens_new_connection(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with patch("scripts.database.psycopg2.connect") as mock_connect:
+            with db.session() as session_db:
+                assert session_db.conn is mock_connect.return_value
+
+        mock_connect.return_value.close.assert_called_once()
+
+    def test_connection_requires_pool(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError, match="Connection pool not established"):
+            with db.connection():
+                pass
+
+    def test_close_returns_primary_and_closes_pool(self, pooled_db, mock_pool):
+        primary = pooled_db.conn
+
+        pooled_db.close()
+
+        mock_pool.putconn.assert_called_once_with(primary, close=False)
+        mock_pool.closeall.assert_called_once()
+        assert pooled_db.conn is None
+        assert pooled_db.pool is None
+
+
 class TestDatabaseManagerInsert:
 
     @pytest.fixture
@@ -103,6 +199,270 @@ class TestDatabaseManagerInsert:
         connected_db.conn.cursor.assert_not_called()
 
 
+class TestDatabaseManagerInsertMany:
+
+    @pytest.fixture
+    def connected_db(self):
+        config = {"dbname": "test"}
+        db = DatabaseManager(config)
+        db.conn = Mock()
+        db.conn.cursor.return_value.__enter__ = Mock(return_value=Mock())
+        db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+        return db
+
+    @pytest.fixture
+    def cursor(self, connected_db):
+        cursor = connected_db.conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(1,)]
+        return cursor
+
+    def test_insert_many_sends_pages(self, connected_db, cursor):
+        rows = [{"device_id": f"d{i}", "device_name": "Lamp"} for i in range(5)]
+        cursor.fetchall.return_value = [(1,), (1,)]
+
+        with patch("scripts.database.execute_values") as mock_execute_values:
+            mock_execute_values.side_effect = lambda cur, sql, page, page_size, fetch: [(1,)] * len(page)
+            result = connected_db.insert_many("devices", rows, conflict_column="device_id", page_size=2)
+
+        prepare, first, second = [call[0] for call in cursor.execute.call_args_list]
+        assert prepare[0].startswith("PREPARE stmt_")
+        assert "INSERT INTO devices (device_id, device_name) VALUES ($1, $2), ($3, $4)" in prepare[0]
+        assert "ON CONFLICT (device_id) DO NOTHING" in prepare[0]
+        assert first[0] == second[0]
+        assert first[0].startswith("EXECUTE stmt_") and first[0].endswith(" (%s, %s, %s, %s);")
+        assert first[1] == ["d0", "Lamp", "d1", "Lamp"]
+        assert second[1] == ["d2", "Lamp", "d3", "Lamp"]
+        last_page = mock_execute_values.call_args[0]
+        assert "INSERT INTO devices (device_id, device_name) VALUES %s" in last_page[1]
+        assert last_page[2] == [("d4", "Lamp")]
+        assert result == (5, 0)
+
+    def test_insert_many_prepares_per_table_columns_conflict_and_page_size(self, connected_db, cursor):
+        connected_db.insert_many("devices", [{"device_id": "d1"}], page_size=1)
+        connected_db.insert_many("devices", [{"device_id": "d1"}], conflict_column="device_id", page_size=1)
+        connected_db.insert_many("devices", [{"device_id": "d1", "device_name": "Lamp"}], page_size=1)
+        connected_db.insert_many("devices", [{"device_id": "d1"}, {"device_id": "d2"}], page_size=2)
+        connected_db.insert_many("devices", [{"device_id": "d3"}], page_size=1)
+
+        queries = [call[0][0] for call in cursor.execute.call_args_list]
+        assert sum(query.startswith("PREPARE") for query in queries) == 4
+        assert queries[-1] == queries[1]
+
+    def test_insert_many_deallocates_least_recently_used_statement(self, connected_db, cursor):
+        connected_db.statement_cache_size = 2
+
+        connected_db.insert_many("devices", [{"device_id": "d1"}], page_size=1)
+        connected_db.insert_many("locations", [{"location_id": "l1"}], page_size=1)
+        connected_db.insert_many("devices", [{"device_id": "d2"}], page_size=1)
+        connected_db.insert_many("events", [{"event_id": "e1"}], page_size=1)
+
+        queries = [call[0][0] for call in cursor.execute.call_args_list]
+        prepared = {query.split()[1]: query for query in queries if query.startswith("PREPARE")}
+        deallocated = [query.split()[1].rstrip(";") for query in queries if query.startswith("DEALLOCATE")]
+        assert len(prepared) == 3
+        assert len(deallocated) == 1
+        assert "INSERT INTO locations" in prepared[deallocated[0]]
+
+    def test_sessions_on_a_connection_share_its_statements(self, connected_db, cursor):
+        other = DatabaseManager({"dbname": "test"})
+        other.conn = connected_db.conn
+
+        connected_db.insert_many("devices", [{"device_id": "d1"}], page_size=1)
+        other.insert_many("devices", [{"device_id": "d2"}], page_size=1)
+
+        queries = [call[0][0] for call in cursor.execute.call_args_list]
+        assert sum(query.startswith("PREPARE") for query in queries) == 1
+
+    def test_insert_many_without_statement_cache_uses_execute_values(self, connected_db, cursor):
+        connected_db.statement_cache_size = 0
+
+        with patch("scripts.database.execute_values", return_value=[(1,)]) as mock_execute_values:
+            connected_db.insert_many("devices", [{"device_id": "d1"}], page_size=1)
+
+        mock_execute_values.assert_called_once()
+        cursor.execute.assert_not_called()
+
+    def test_insert_many_does_not_prepare_pages_over_parameter_limit(self, connected_db, cursor):
+        rows = [{"device_id": f"d{i}", "device_name": "Lamp"} for i in range(40000)]
+
+        with patch("scripts.database.execute_values", return_value=[]) as mock_execute_values:
+            connected_db.insert_many("devices", rows, page_size=40000)
+
+        mock_execute_values.assert_called_once()
+        cursor.execute.assert_not_called()
+
+    def test_insert_many_counts_skipped_conflicts(self, connected_db):
+        rows = [{"device_id": "d1"}, {"device_id": "d1"}, {"device_id": "d2"}]
+
+        with patch("scripts.database.execute_values") as mock_execute_values:
+            mock_execute_values.return_value = [(1,), (1,)]
+            result = connected_db.insert_many("devices", iter(rows), conflict_column="device_id")
+
+        assert result == (2, 1)
+
+    def test_insert_many_runs_on_inserted_in_same_statement(self, connected_db):
+        rows = [{"device_id": "d1"}, {"device_id": "d2"}]
+
+        with patch("scripts.database.execute_values") as mock_execute_values:
+            mock_execute_values.return_value = [(1,)]
+            result = connected_db.insert_many(
+                "devices", rows, conflict_column="device_id", on_inserted="INSERT INTO rollup SELECT * FROM inserted"
+            )
+
+        sql = mock_execute_values.call_args[0][1]
+        assert sql.startswith("WITH inserted AS (INSERT INTO devices (device_id) VALUES %s")
+        assert "ON CONFLICT (device_id) DO NOTHING RETURNING *)" in sql
+        assert "derived AS (INSERT INTO rollup SELECT * FROM inserted)" in sql
+        assert sql.endswith("SELECT 1 FROM inserted;")
+        assert result == (1, 1)
+
+    def test_insert_many_skips_empty_data(self, connected_db):
+        result = connected_db.insert_many("devices", [])
+
+        assert result == (0, 0)
+        connected_db.conn.cursor.assert_not_called()
+
+    def test_insert_many_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError, match="Database connection not established"):
+            db.insert_many("devices", [{"device_id": "d1"}])
+
+
+class TestDatabaseManagerCopyInsert:
+
+    @pytest.fixture
+    def connected_db(self):
+        config = {"dbname": "test"}
+        db = DatabaseManager(config)
+        db.conn = Mock()
+        return db
+
+    @pytest.fixture
+    def mock_cursor(self, connected_db):
+        mock_cursor = Mock()
+        mock_cursor.rowcount = 1
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+        mock_cursor.copy_expert.side_effect = lambda sql, stream: stream.read()
+        return mock_cursor
+
+    def test_copy_insert_streams_into_staging_and_merges(self, connected_db, mock_cursor):
+        rows = [{"device_id": "d1"}, {"device_id": "d2"}]
+
+        connected_db.copy_insert("devices", rows, conflict_column="device_id")
+
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "CREATE TEMP TABLE devices_staging" in executed[0]
+        assert "INSERT INTO devices (device_id)" in executed[1]
+        assert "SELECT device_id FROM devices_staging" in executed[1]
+        assert "ON CONFLICT (device_id) DO NOTHING" in executed[1]
+        copy_sql = mock_cursor.copy_expert.call_args[0][0]
+        assert copy_sql == "COPY devices_staging (device_id) FROM STDIN"
+
+    def test_copy_insert_returns_inserted_and_skipped(self, connected_db, mock_cursor):
+        rows = [{"device_id": "d1"}, {"device_id": "d1"}]
+
+        result = connected_db.copy_insert("devices", iter(rows), conflict_column="device_id")
+
+        assert result == (1, 1)
+
+    def test_copy_insert_runs_before_merge_between_copy_and_merge(self, connected_db, mock_cursor):
+        calls = []
+        mock_cursor.copy_expert.side_effect = lambda sql, stream: calls.append("copy") or stream.read()
+        mock_cursor.execute.side_effect = lambda sql: calls.append(sql.split()[0])
+
+        connected_db.copy_insert("devices", [{"device_id": "d1"}], before_merge=lambda: calls.append("hook"))
+
+        assert calls == ["CREATE", "copy", "hook", "INSERT", "DROP"]
+
+    def test_copy_insert_counts_rows_returned_to_on_inserted(self, connected_db, mock_cursor):
+        mock_cursor.fetchone.return_value = (1,)
+        rows = [{"device_id": "d1"}, {"device_id": "d1"}]
+
+        result = connected_db.copy_insert(
+            "devices", rows, conflict_column="device_id", on_inserted="INSERT INTO rollup SELECT * FROM inserted"
+        )
+
+        merge_sql = mock_cursor.execute.call_args_list[1][0][0]
+        assert merge_sql.startswith("WITH inserted AS (")
+        assert "ON CONFLICT (device_id) DO NOTHING RETURNING *)" in merge_sql
+        assert "SELECT COUNT(*) FROM inserted;" in merge_sql
+        assert result == (1, 1)
+
+    def test_copy_insert_skips_empty_data(self, connected_db):
+        result = connected_db.copy_insert("devices", [])
+
+        assert result == (0, 0)
+        connected_db.conn.cursor.assert_not_called()
+
+    def test_copy_insert_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError, match="Database connection not established"):
+            db.copy_insert("devices", [{"device_id": "d1"}])
+
+    def test_copy_rows_copies_straight_into_table(self, connected_db, mock_cursor):
+        rows = [{"event_id": "e1"}, {"event_id": "e2"}]
+
+        result = connected_db.copy_rows("events_load", iter(rows))
+
+        assert result == 2
+        assert mock_cursor.copy_expert.call_args[0][0] == "COPY events_load (event_id) FROM STDIN"
+        mock_cursor.execute.assert_not_called()
+
+    def test_copy_rows_skips_empty_data(self, connected_db):
+        assert connected_db.copy_rows("events_load", []) == 0
+        connected_db.conn.cursor.assert_not_called()
+
+    def test_merge_staging_returns_inserted_count(self, connected_db, mock_cursor):
+        mock_cursor.fetchone.return_value = (3,)
+
+        result = connected_db.merge_staging(
+            "events", "events_load", ["event_id", "timestamp"], "event_id, timestamp",
+            on_inserted="INSERT INTO rollup SELECT * FROM inserted"
+        )
+
+        merge_sql = mock_cursor.execute.call_args[0][0]
+        assert "INSERT INTO events (event_id, timestamp)" in merge_sql
+        assert "SELECT event_id, timestamp FROM events_load" in merge_sql
+        assert "SELECT COUNT(*) FROM inserted;" in merge_sql
+        assert result == 3
+
+    def test_merge_staging_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError, match="Database connection not established"):
+            db.merge_staging("events", "events_load", ["event_id"])
+
+
+class TestCopyFormatting:
+
+    def test_to_copy_line_writes_null_marker(self):
+        line = _to_copy_line({"a": "x", "b": None}, ["a", "b"])
+
+        assert line == "x\t\\N\n"
+
+    def test_to_copy_line_escapes_special_characters(self):
+        line = _to_copy_line({"a": "tab\there\nback\\slash"}, ["a"])
+
+        assert line == "tab\\there\\nback\\\\slash\n"
+
+    def test_copy_stream_reads_in_chunks(self):
+        rows = iter([{"a": "1"}, {"a": "2"}, {"a": "3"}])
+        stream = _CopyStream(rows, ["a"])
+
+        chunks = []
+        while True:
+            chunk = stream.read(3)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        assert "".join(chunks) == "1\n2\n3\n"
+        assert stream.row_count == 3
+
+
 class TestDatabaseManagerFetch:
 
     @pytest.fixture
@@ -153,6 +513,124 @@ class TestDatabaseManagerFetch:
 
         mock_cursor.execute.assert_called_with("SELECT * FROM test WHERE id = %s", (1,))
 
+    def test_fetch_all_prepared_runs_execute(self, connected_db):
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [("row1",)]
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        connected_db.fetch_all("SELECT name FROM test WHERE name LIKE 'a%';", prepare=True)
+        result = connected_db.fetch_all("SELECT name FROM test WHERE name LIKE 'a%';", prepare=True)
+
+        queries = [call[0] for call in mock_cursor.execute.call_args_list]
+        name = queries[0][0].split()[1]
+        assert queries[0][0] == f"PREPARE {name} AS SELECT name FROM test WHERE name LIKE 'a%';"
+        assert queries[1] == (f"EXECUTE {name};", None)
+        assert queries[2] == (f"EXECUTE {name};", None)
+        assert result == [("row1",)]
+
+    def test_fetch_all_prepared_with_params(self, connected_db):
+        mock_cursor = Mock()
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        mock_cursor.fetchall.return_value = []
+
+        connected_db.fetch_all("SELECT * FROM test WHERE id = %s AND name LIKE '%%x'", (1,), prepare=True)
+
+        prepare, (execute, params) = mock_cursor.execute.call_args_list[0][0][0], mock_cursor.execute.call_args[0]
+        assert prepare.endswith(" AS SELECT * FROM test WHERE id = $1 AND name LIKE '%x';")
+        assert execute.endswith(" (%s);")
+        assert params == (1,)
+
+    def test_server_placeholders_numbers_parameters(self):
+        assert _server_placeholders("a = %s AND b = %s AND c LIKE '%%'") == ("a = $1 AND b = $2 AND c LIKE '%'", 2)
+
+    def test_iter_all_uses_named_cursor(self, connected_db):
+        mock_cursor = MagicMock()
+        mock_cursor.__iter__.return_value = iter([("row1",), ("row2",)])
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        result = list(connected_db.iter_all("SELECT * FROM test", itersize=500))
+
+        assert result == [("row1",), ("row2",)]
+        cursor_name = connected_db.conn.cursor.call_args[1]["name"]
+        assert cursor_name.startswith("stream_cursor_")
+        assert mock_cursor.itersize == 500
+        mock_cursor.execute.assert_called_once_with("SELECT * FROM test", None)
+
+    def test_iter_all_is_lazy(self, connected_db):
+        connected_db.iter_all("SELECT 1")
+
+        connected_db.conn.cursor.assert_not_called()
+
+    def test_iter_all_uses_unique_cursor_names(self, connected_db):
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=MagicMock())
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        list(connected_db.iter_all("SELECT 1"))
+        list(connected_db.iter_all("SELECT 1"))
+
+        names = [c[1]["name"] for c in connected_db.conn.cursor.call_args_list]
+        assert names[0] != names[1]
+
+    def test_iter_all_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError):
+            db.iter_all("SELECT 1")
+
+    def test_iter_batches_yields_description_with_rows(self, connected_db):
+        mock_cursor = Mock()
+        mock_cursor.description = ("col",)
+        mock_cursor.fetchmany.side_effect = [[("row1",), ("row2",)], [("row3",)], []]
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        result = list(connected_db.iter_batches("SELECT * FROM test", batch_size=2))
+
+        assert result == [(("col",), [("row1",), ("row2",)]), (("col",), [("row3",)])]
+        mock_cursor.fetchmany.assert_called_with(2)
+        assert "name" in connected_db.conn.cursor.call_args[1]
+
+    def test_iter_batches_yields_one_batch_for_empty_result(self, connected_db):
+        mock_cursor = Mock()
+        mock_cursor.description = ("col",)
+        mock_cursor.fetchmany.return_value = []
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+
+        result = list(connected_db.iter_batches("SELECT * FROM test"))
+
+        assert result == [(("col",), [])]
+
+    def test_iter_batches_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError):
+            db.iter_batches("SELECT 1")
+
+    def test_copy_to_wraps_query_in_copy_command(self, connected_db):
+        mock_cursor = Mock()
+        mock_cursor.rowcount = 2
+        connected_db.conn.cursor.return_value.__enter__ = Mock(return_value=mock_cursor)
+        connected_db.conn.cursor.return_value.__exit__ = Mock(return_value=False)
+        output = Mock()
+
+        result = connected_db.copy_to("\n  SELECT * FROM test;\n", output)
+
+        assert result == 2
+        mock_cursor.copy_expert.assert_called_once_with(
+            "COPY (SELECT * FROM test) TO STDOUT WITH (FORMAT csv, HEADER true)", output
+        )
+
+    def test_copy_to_raises_when_not_connected(self):
+        db = DatabaseManager({"dbname": "test"})
+
+        with pytest.raises(RuntimeError):
+            db.copy_to("SELECT 1", Mock())
+
     def test_fetch_raises_when_not_connected(self):
         config = {"dbname": "test"}
         db = DatabaseManager(config)
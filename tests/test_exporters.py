@@ -1,9 +1,18 @@
+import io
 import pytest
 import json
-from unittest.mock import patch, mock_open
+from xml.dom.minidom import parseString
+from unittest.mock import Mock, patch, mock_open
+from collections import namedtuple
+from datetime import datetime
 from decimal import Decimal
 from scripts.exporters.json_exporter import JsonExporter, DecimalEncoder
 from scripts.exporters.xml_exporter import XmlExporter
+from scripts.exporters import parquet_exporter
+from scripts.exporters.parquet_exporter import ParquetExporter
+from scripts.exporters.csv_exporter import CsvExporter, TsvExporter
+
+Column = namedtuple("Column", ["name", "type_code", "precision", "scale"])
 
 
 class TestDecimalEncoder:
@@ -94,6 +103,32 @@ class TestJsonExporter:
 
         mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
+    def test_write_stream_matches_convert(self, exporter):
+        data = {
+            "leaf_locations": [{"location_name": "Kitchen"}, {"location_name": "Hall"}],
+            "average_brightness": [{"location_name": "Kitchen", "average_brightness": Decimal("75.5")}],
+            "devices_no_events": [],
+        }
+        output = io.StringIO()
+
+        exporter.write_stream(((name, iter(rows)) for name, rows in data.items()), output)
+
+        assert output.getvalue() == exporter.convert(data)
+
+    def test_write_stream_handles_no_sections(self, exporter):
+        output = io.StringIO()
+
+        exporter.write_stream(iter([]), output)
+
+        assert output.getvalue() == exporter.convert({})
+
+    def test_export_stream_writes_to_file(self, exporter, tmp_path):
+        path = tmp_path / "nested" / "results.json"
+
+        exporter.export_stream([("q", ({"id": i} for i in range(3)))], str(path))
+
+        assert json.loads(path.read_text()) == {"q": [{"id": 0}, {"id": 1}, {"id": 2}]}
+
 
 class TestXmlExporter:
 
@@ -143,9 +178,208 @@ class TestXmlExporter:
 
         mock_file.assert_called_once_with("output/test.xml", "w")
 
+    def test_convert_escapes_special_characters(self, exporter):
+        data = {"q": [{"name": "<a & 'b'> \"c\""}]}
+
+        result = exporter.convert(data)
+
+        assert "<name>&lt;a &amp; &apos;b&apos;&gt; &quot;c&quot;</name>" in result
+
+    def test_convert_renders_scalar_types(self, exporter):
+        data = {"q": [{
+            "flag": False,
+            "avg": Decimal("1.50"),
+            "seen": datetime(2024, 1, 2, 3, 4, 5),
+            "missing": None,
+        }]}
+
+        result = exporter.convert(data)
+
+        assert (
+            "<item><flag>false</flag><avg>1.50</avg><seen>2024-01-02T03:04:05</seen>"
+            "<missing></missing></item>"
+        ) in result
+
+    def test_convert_fixes_invalid_element_names(self, exporter):
+        data = {"q": [{"123": 1, "key with space": 2, "a&b": 3}]}
+
+        result = exporter.convert(data)
+
+        assert "<n123>1</n123>" in result
+        assert "<key_with_space>2</key_with_space>" in result
+        assert '<key name="a&amp;b">3</key>' in result
+
+    def test_convert_matches_dicttoxml(self, exporter):
+        dicttoxml = pytest.importorskip("dicttoxml")
+        data = {
+            "q1": [{"a": "x & <y>", "b": None, "c": True, "d": Decimal("2.5"), "1.5": "f", "a b": 1,
+                    "nested": {"x": [1, True, None, "s", [1, 2], {"y": False}]}, "empty": []}],
+            "q2": [],
+            "test": "data",
+        }
+
+        expected = dicttoxml.dicttoxml(data, custom_root="results", attr_type=False).decode("utf-8")
+
+        assert exporter.convert(data) == expected
+
     def test_convert_result_is_string_not_bytes(self, exporter):
         data = {"test": "value"}
 
         result = exporter.convert(data)
 
         assert isinstance(result, str)
+
+    def test_write_stream_matches_convert(self, exporter):
+        data = {
+            "leaf_locations": [{"location_name": "Kitchen & Bath"}, {"location_name": None}],
+            "top_smart_lamp_locations": [{"location_name": "Hall", "device_count": 3}],
+            "devices_no_events": [],
+        }
+        output = io.StringIO()
+
+        exporter.write_stream(((name, iter(rows)) for name, rows in data.items()), output)
+
+        assert output.getvalue() == exporter.convert(data)
+
+    def test_write_stream_flushes_in_chunks(self, exporter):
+        output = Mock()
+
+        exporter.write_stream([("q", ({"id": i} for i in range(5000)))], output)
+
+        assert output.write.call_count > 1
+        assert "".join(c.args[0] for c in output.write.call_args_list).count("<item>") == 5000
+
+    def test_write_stream_renders_scalars_like_convert(self, exporter):
+        output = io.StringIO()
+
+        exporter.write_stream([("q", [{"flag": True, "count": 0, "key with space": "x"}])], output)
+
+        assert "<flag>true</flag>" in output.getvalue()
+        assert "<count>0</count>" in output.getvalue()
+        assert "<key_with_space>x</key_with_space>" in output.getvalue()
+
+    def test_export_stream_writes_valid_xml(self, exporter, tmp_path):
+        path = tmp_path / "results.xml"
+
+        exporter.export_stream([("q", ({"id": i} for i in range(3)))], str(path))
+
+        document = parseString(path.read_bytes())
+        assert len(document.getElementsByTagName("item")) == 3
+
+
+class TestParquetExporter:
+
+    @pytest.fixture
+    def pq(self):
+        return pytest.importorskip("pyarrow.parquet")
+
+    @pytest.fixture
+    def exporter(self, pq):
+        return ParquetExporter(batch_size=2)
+
+    def _make_query(self, name, columns, description, batches):
+        query = Mock()
+        query.get_query_name.return_value = name
+        query.get_columns.return_value = columns
+        query.iter_batches.return_value = iter([(description, rows) for rows in batches])
+        return query
+
+    def test_get_file_extension(self, exporter):
+        assert exporter.get_file_extension() == "parquet"
+
+    def test_export_query_writes_batches_to_named_file(self, exporter, pq, tmp_path):
+        description = (
+            Column("location_name", 1043, None, None),
+            Column("device_count", 20, None, None),
+        )
+        query = self._make_query(
+            "top_smart_lamp_locations",
+            ["location_name", "device_count"],
+            description,
+            [[("Kitchen", 3), ("Hall", 2)], [("Attic", None)]],
+        )
+
+        path = exporter.export_query(query, str(tmp_path / "parquet"))
+
+        assert path == str(tmp_path / "parquet" / "top_smart_lamp_locations.parquet")
+        table = pq.read_table(path)
+        assert table.to_pydict() == {
+            "location_name": ["Kitchen", "Hall", "Attic"],
+            "device_count": [3, 2, None],
+        }
+        assert pq.ParquetFile(path).metadata.num_row_groups == 2
+        query.iter_batches.assert_called_once_with(2)
+
+    def test_types_follow_cursor_description(self, exporter, pq, tmp_path):
+        description = (
+            Column("is_smart", 16, None, None),
+            Column("average_brightness", 1700, None, None),
+            Column("price", 1700, 5, 2),
+            Column("timestamp", 1114, None, None),
+            Column("details", 3802, None, None),
+            Column("other", 2950, None, None),
+        )
+        row = (True, Decimal("75.5"), Decimal("1.25"), datetime(2024, 1, 2, 3, 4, 5), {"on": True}, "abc")
+        query = self._make_query("q", [c.name for c in description], description, [[row]])
+
+        path = exporter.export_query(query, str(tmp_path))
+
+        table = pq.read_table(path)
+        assert [str(field.type) for field in table.schema] == [
+            "bool", "double", "decimal128(5, 2)", "timestamp[us]", "string", "string",
+        ]
+        assert table.to_pylist() == [{
+            "is_smart": True,
+            "average_brightness": 75.5,
+            "price": Decimal("1.25"),
+            "timestamp": datetime(2024, 1, 2, 3, 4, 5),
+            "details": '{"on": true}',
+            "other": "abc",
+        }]
+
+    def test_empty_result_writes_schema_only_file(self, exporter, pq, tmp_path):
+        description = (Column("device_id", 1043, None, None),)
+        query = self._make_query("devices_no_events", ["device_id"], description, [[]])
+
+        path = exporter.export_query(query, str(tmp_path))
+
+        table = pq.read_table(path)
+        assert table.num_rows == 0
+        assert table.schema.names == ["device_id"]
+
+    def test_requires_pyarrow(self):
+        with patch.object(parquet_exporter, "pa", None):
+            with pytest.raises(RuntimeError, match="pyarrow"):
+                ParquetExporter()
+
+
+class TestCsvExporter:
+
+    def _make_query(self, name, output=b"device_id\r\nd1\r\n"):
+        query = Mock()
+        query.get_query_name.return_value = name
+
+        def copy_to(file, options):
+            file.write(output)
+            return 1
+
+        query.copy_to.side_effect = copy_to
+        return query
+
+    def test_get_file_extension(self):
+        assert CsvExporter().get_file_extension() == "csv"
+        assert TsvExporter().get_file_extension() == "tsv"
+
+    def test_copy_options(self):
+        assert CsvExporter().get_copy_options() == "FORMAT csv, HEADER true, DELIMITER ','"
+        assert TsvExporter().get_copy_options() == "FORMAT csv, HEADER true, DELIMITER E'\\t'"
+
+    def test_export_query_streams_copy_output_to_file(self, tmp_path):
+        query = self._make_query("devices_no_events")
+
+        path = CsvExporter().export_query(query, str(tmp_path / "csv"))
+
+        assert path == str(tmp_path / "csv" / "devices_no_events.csv")
+        assert (tmp_path / "csv" / "devices_no_events.csv").read_bytes() == b"device_id\r\nd1\r\n"
+        query.copy_to.assert_called_once()
+        query.execute.assert_not_called()
@@ -1,6 +1,7 @@
 import json
+import pytest
 from unittest.mock import mock_open, patch
-from scripts.file_handler import FileHandler
+from scripts.file_handler import FileHandler, _parse_ndjson_range
 
 
 class TestFileHandler:
@@ -48,3 +49,128 @@ class TestFileHandler:
 
         assert result == nested_data
         assert len(result[0]["children"]) == 2
+
+
+class TestFileHandlerIterJson:
+
+    def test_iter_json_yields_records_lazily(self, tmp_path):
+        records = [{"event_id": f"e{i}", "details": {"brightness": i}} for i in range(50)]
+        path = tmp_path / "events.json"
+        path.write_text(json.dumps(records, indent=2))
+
+        result = FileHandler.iter_json(str(path), read_size=16)
+
+        assert next(result) == records[0]
+        assert list(result) == records[1:]
+
+    def test_iter_json_handles_strings_with_brackets(self, tmp_path):
+        records = [{"name": "Room [1], \"east\""}, {"name": "]"}]
+        path = tmp_path / "tricky.json"
+        path.write_text(json.dumps(records))
+
+        assert list(FileHandler.iter_json(str(path), read_size=3)) == records
+
+    @pytest.mark.parametrize("document, read_size", [
+        ("[1.5]", 1), ("[1.5]", 3), ("[12.25, 3]", 8), ("[1e5]", 8), ("[123456.789]", 8),
+        ("[-0.5e-3, 7]", 2), ("[10, 2.5E+2]", 5),
+    ])
+    def test_iter_json_keeps_numbers_split_across_reads(self, tmp_path, document, read_size):
+        path = tmp_path / "numbers.json"
+        path.write_text(document)
+
+        assert list(FileHandler.iter_json(str(path), read_size=read_size)) == json.loads(document)
+
+    def test_iter_json_yields_nothing_on_file_not_found(self):
+        with patch("builtins.open", side_effect=FileNotFoundError("No such file")):
+            result = list(FileHandler.iter_json("nonexistent.json"))
+
+        assert result == []
+
+    def test_iter_json_handles_empty_file(self, tmp_path):
+        path = tmp_path / "empty.json"
+        path.write_text("")
+
+        assert list(FileHandler.iter_json(str(path))) == []
+
+    def test_iter_json_raises_on_invalid_json(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text('[{"id": 1} {"id": 2}]')
+
+        with pytest.raises(ValueError):
+            list(FileHandler.iter_json(str(path)))
+
+    def test_iter_json_rejects_non_array_document(self, tmp_path):
+        path = tmp_path / "object.json"
+        path.write_text('{"id": 1}')
+
+        with pytest.raises(ValueError, match="top-level JSON array"):
+            list(FileHandler.iter_json(str(path)))
+
+
+class TestFileHandlerNdjson:
+
+    @pytest.fixture
+    def ndjson_file(self, tmp_path):
+        records = [{"event_id": f"e{i}", "details": {"brightness": i}} for i in range(100)]
+        path = tmp_path / "events.ndjson"
+        path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n")
+        return path, records
+
+    def test_iter_ndjson_reads_all_lines(self, ndjson_file):
+        path, records = ndjson_file
+
+        assert list(FileHandler.iter_ndjson(str(path))) == records
+
+    def test_ranges_do_not_split_or_duplicate_lines(self, ndjson_file):
+        path, records = ndjson_file
+        size = path.stat().st_size
+
+        parsed = []
+        for start in range(0, size, 37):
+            parsed.extend(_parse_ndjson_range(str(path), start, min(start + 37, size)))
+
+        assert parsed == records
+
+    def test_iter_ndjson_range_yields_line_offsets(self, ndjson_file):
+        path, records = ndjson_file
+        size = path.stat().st_size
+        content = path.read_bytes()
+
+        pairs = []
+        for start in range(0, size, 37):
+            pairs.extend(FileHandler.iter_ndjson_range(str(path), start, min(start + 37, size)))
+
+        assert [record for _, record in pairs] == records
+        assert all(json.loads(content[offset:content.index(b"\n", offset)]) == record for offset, record in pairs)
+
+    def test_iter_ndjson_parallel_preserves_order(self, ndjson_file):
+        path, records = ndjson_file
+
+        result = list(FileHandler.iter_ndjson(str(path), workers=2, range_size=256))
+
+        assert result == records
+
+    def test_iter_ndjson_raises_on_invalid_line(self, tmp_path):
+        path = tmp_path / "bad.ndjson"
+        path.write_text('{"id": 1}\nnot json\n')
+
+        with pytest.raises(ValueError, match="byte offset 10"):
+            list(FileHandler.iter_ndjson(str(path)))
+
+    def test_iter_ndjson_yields_nothing_on_file_not_found(self):
+        assert list(FileHandler.iter_ndjson("nonexistent.ndjson")) == []
+
+    def test_detect_format_uses_extension(self):
+        assert FileHandler.detect_format("data/events.ndjson") == "ndjson"
+        assert FileHandler.detect_format("data/events.JSONL") == "ndjson"
+        assert FileHandler.detect_format("data/events.json") == "json"
+
+    def test_iter_records_honours_explicit_format(self, tmp_path):
+        path = tmp_path / "events.json"
+        path.write_text('{"id": 1}\n{"id": 2}\n')
+
+        assert list(FileHandler.iter_records(str(path), input_format="ndjson")) == [{"id": 1}, {"id": 2}]
+
+    def test_iter_records_rejects_unknown_format(self):
+        with pytest.raises(ValueError, match="Unsupported input format"):
+            FileHandler.iter_records("events.json", input_format="csv")
@@ -1,15 +1,25 @@
+import json
 import pytest
-from unittest.mock import Mock
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import Mock, patch
+from scripts.importers import sharded
 from scripts.importers.devices import DeviceImporter
 from scripts.importers.events import EventImporter
 from scripts.importers.locations import LocationImporter
+from scripts.importers.sharded import ShardedEventImporter
+from scripts.metrics import MetricsRegistry
 
 
 class TestDeviceImporter:
 
     @pytest.fixture
     def mock_db(self):
-        return Mock()
+        db = Mock()
+        db.insert_many.return_value = (0, 0)
+        db.copy_insert.return_value = (0, 0)
+        return db
 
     @pytest.fixture
     def importer(self, mock_db):
@@ -54,31 +64,109 @@ class TestDeviceImporter:
 
         importer.process_entities(data)
 
-        assert mock_db.insert.call_count == 2
+        mock_db.insert_many.assert_called_once()
+        rows = list(mock_db.insert_many.call_args[1]["rows"])
+        assert [row["device_id"] for row in rows] == ["d1", "d2"]
         mock_db.commit.assert_called_once()
 
-    def test_process_entities_calls_insert_with_correct_params(self, mock_db, importer):
+    def test_process_entities_accepts_generator(self, mock_db, importer):
+        captured = []
+        mock_db.insert_many.side_effect = lambda **kwargs: captured.extend(kwargs["rows"]) or (2, 0)
+        data = ({"device_id": f"d{i}"} for i in range(2))
+
+        importer.process_entities(data)
+
+        assert [row["device_id"] for row in captured] == ["d0", "d1"]
+
+    def test_process_entities_returns_insert_and_skip_counts(self, mock_db, importer):
+        mock_db.insert_many.return_value = (1, 1)
+        data = [{"device_id": "d1"}, {"device_id": "d1"}]
+
+        result = importer.process_entities(data)
+
+        assert result == (1, 1)
+
+    def test_process_entities_copy_mode_uses_bulk_load(self, mock_db):
+        importer = DeviceImporter(mock_db, load_mode="copy")
+        data = [
+            {"device_id": "d1", "device_type": "Lamp", "device_name": "L1", "location_id": "loc1"},
+            {"device_id": "d2", "device_type": "Sensor", "device_name": "S1", "location_id": "loc2"}
+        ]
+
+        importer.process_entities(data)
+
+        mock_db.insert_many.assert_not_called()
+        mock_db.copy_insert.assert_called_once()
+        kwargs = mock_db.copy_insert.call_args[1]
+        assert kwargs["table"] == "devices"
+        assert kwargs["conflict_column"] == "device_id"
+        mock_db.commit.assert_called_once()
+
+    def test_rejects_unknown_load_mode(self, mock_db):
+        with pytest.raises(ValueError, match="Unsupported load mode"):
+            DeviceImporter(mock_db, load_mode="bogus")
+
+    def test_process_entities_bumps_data_version_last_before_commit(self, mock_db, importer):
+        calls = []
+        mock_db.insert_many.side_effect = lambda **kwargs: calls.append("insert") or (1, 0)
+        mock_db.execute_query.side_effect = lambda sql, params=None: calls.append(sql)
+        mock_db.commit.side_effect = lambda: calls.append("commit")
+
+        importer.process_entities([{"device_id": "d1"}])
+
+        assert calls[0] == "insert" and calls[-1] == "commit"
+        assert "data_version" in calls[1] and "version + 1" in calls[1]
+
+    def test_process_entities_keeps_data_version_when_nothing_inserted(self, mock_db, importer):
+        mock_db.insert_many.return_value = (0, 1)
+
+        importer.process_entities([{"device_id": "d1"}])
+
+        mock_db.execute_query.assert_not_called()
+        mock_db.commit.assert_called_once()
+
+    def test_get_rollup_sql_counts_inserted_smart_lamps(self, importer):
+        sql = importer.get_rollup_sql()
+
+        assert "INSERT INTO location_lamp_counts" in sql
+        assert "FROM inserted" in sql
+        assert "device_type = 'Smart Lamp'" in sql
+        assert "lamp_count = location_lamp_counts.lamp_count + EXCLUDED.lamp_count" in sql
+
+    def test_process_entities_copy_mode_maintains_rollup(self, mock_db):
+        mock_db.copy_insert.return_value = (1, 0)
+        importer = DeviceImporter(mock_db, load_mode="copy")
+
+        importer.process_entities([{"device_id": "d1", "device_type": "Smart Lamp", "location_id": "loc1"}])
+
+        assert mock_db.copy_insert.call_args[1]["on_inserted"] == importer.get_rollup_sql()
+
+    def test_process_entities_calls_insert_many_with_correct_params(self, mock_db, importer):
         data = [{"device_id": "d1", "device_type": "Lamp", "device_name": "L1", "location_id": "loc1"}]
 
         importer.process_entities(data)
 
-        mock_db.insert.assert_called_once_with(
-            table="devices",
-            data={
-                "device_id": "d1",
-                "device_type": "Lamp",
-                "device_name": "L1",
-                "location_id": "loc1"
-            },
-            conflict_column="device_id"
-        )
+        kwargs = mock_db.insert_many.call_args[1]
+        assert kwargs["table"] == "devices"
+        assert kwargs["conflict_column"] == "device_id"
+        assert kwargs["page_size"] == importer.page_size
+        assert "location_lamp_counts" in kwargs["on_inserted"]
+        assert list(kwargs["rows"]) == [{
+            "device_id": "d1",
+            "device_type": "Lamp",
+            "device_name": "L1",
+            "location_id": "loc1"
+        }]
 
 
 class TestEventImporter:
 
     @pytest.fixture
     def mock_db(self):
-        return Mock()
+        db = Mock()
+        db.insert_many.return_value = (0, 0)
+        db.copy_insert.return_value = (0, 0)
+        return db
 
     @pytest.fixture
     def importer(self, mock_db):
@@ -88,7 +176,20 @@ class TestEventImporter:
         assert importer.get_table_name() == "events"
 
     def test_get_conflict_column(self, importer):
-        assert importer.get_conflict_column() == "event_id"
+        assert importer.get_conflict_column() == "event_id, timestamp"
+
+    def test_get_rollup_sql_adds_lamp_on_events_per_location_and_day(self, importer):
+        sql = importer.get_rollup_sql()
+
+        assert "INSERT INTO location_brightness_daily" in sql
+        assert "FROM inserted" in sql
+        assert "GROUP BY d.location_id, inserted.timestamp::date" in sql
+        assert "ON CONFLICT (location_id, day) DO UPDATE" in sql
+
+    def test_process_entities_maintains_rollup_with_load(self, mock_db, importer):
+        importer.process_entities([{"event_id": "e1", "details": {"device_id": "d1"}}])
+
+        assert mock_db.insert_many.call_args[1]["on_inserted"] == importer.get_rollup_sql()
 
     def test_transform_data_extracts_device_id_and_timestamp(self, importer):
         raw = {
@@ -146,16 +247,339 @@ class TestEventImporter:
         assert details["color"] == "warm"
 
 
+class TestEventImporterIncremental:
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.fetch_one.return_value = None
+        db.insert_many.side_effect = lambda table, rows, conflict_column, page_size, on_inserted: (len(list(rows)), 0)
+        return db
+
+    @pytest.fixture
+    def importer(self, mock_db):
+        return EventImporter(mock_db, source="events.json")
+
+    def _event(self, event_id, timestamp):
+        return {"event_id": event_id, "details": {"device_id": "d1", "timestamp": timestamp}}
+
+    def _watermark_saves(self, mock_db):
+        return [c[0] for c in mock_db.execute_query.call_args_list if "ingest_watermarks" in c[0][0]]
+
+    def test_new_source_loads_everything_and_records_newest_timestamp(self, importer, mock_db):
+        events = [self._event("e1", "2024-01-01T10:00:00"), self._event("e2", "2024-01-02T08:00:00")]
+
+        result = importer.process_entities(events)
+
+        assert result == (2, 0)
+        mock_db.fetch_one.assert_called_once()
+        assert mock_db.fetch_one.call_args[0][1] == ("events.json",)
+        saved = self._watermark_saves(mock_db)[-1]
+        assert saved[1] == ("events.json", datetime(2024, 1, 2, 8, 0))
+        mock_db.commit.assert_called_once()
+
+    def test_skips_events_older_than_watermark(self, importer, mock_db):
+        mock_db.fetch_one.return_value = (datetime(2024, 1, 2, 0, 0),)
+        sent = []
+        mock_db.insert_many.side_effect = lambda table, rows, conflict_column, page_size, on_inserted: (
+            sent.extend(row["event_id"] for row in rows) or (len(sent), 0)
+        )
+        events = [
+            self._event("old", "2024-01-01T10:00:00"),
+            self._event("same", "2024-01-02T00:00:00"),
+            self._event("new", "2024-01-03T00:00:00+02:00"),
+            self._event("undated", None),
+        ]
+
+        importer.process_entities(events)
+
+        assert sent == ["same", "new", "undated"]
+        assert self._watermark_saves(mock_db)[-1][1] == ("events.json", datetime(2024, 1, 3, 0, 0))
+
+    def test_nothing_new_keeps_watermark(self, importer, mock_db):
+        mock_db.fetch_one.return_value = (datetime(2024, 1, 2, 0, 0),)
+
+        importer.process_entities([self._event("old", "2024-01-01T10:00:00")])
+
+        assert mock_db.execute_query.call_args[0][1] == ("events.json", datetime(2024, 1, 2, 0, 0))
+
+    def test_watermark_not_saved_when_load_fails(self, importer, mock_db):
+        mock_db.insert_many.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            importer.process_entities([self._event("e1", "2024-01-01T10:00:00")])
+
+        mock_db.execute_query.assert_not_called()
+        mock_db.rollback.assert_called_once()
+        mock_db.commit.assert_not_called()
+
+    def test_without_source_skips_watermark(self, mock_db):
+        importer = EventImporter(mock_db)
+
+        importer.process_entities([self._event("e1", "2024-01-01T10:00:00")])
+
+        mock_db.fetch_one.assert_not_called()
+        assert self._watermark_saves(mock_db) == []
+
+
+class TestEventImporterPartitions:
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.fetch_all.return_value = [("events_p2024_01",)]
+        return db
+
+    def _event(self, event_id, timestamp):
+        return {"event_id": event_id, "details": {"device_id": "d1", "timestamp": timestamp}}
+
+    def _created(self, mock_db):
+        return [c[0][0] for c in mock_db.execute_query.call_args_list if "ATTACH PARTITION" in c[0][0]]
+
+    def test_insert_mode_creates_missing_partitions_while_reading(self, mock_db):
+        order = []
+        mock_db.execute_query.side_effect = lambda sql, params=None: order.append(sql.split()[0])
+
+        def insert_many(table, rows, conflict_column, page_size, on_inserted):
+            for row in rows:
+                order.append(row["event_id"])
+            return 3, 0
+
+        mock_db.insert_many.side_effect = insert_many
+        importer = EventImporter(mock_db, partition_interval="month")
+        events = [
+            self._event("e1", "2024-01-05T10:00:00"),
+            self._event("e2", "2024-02-01T00:00:00"),
+            self._event("e3", "2024-02-20T00:00:00"),
+        ]
+
+        importer.process_entities(events)
+
+        assert order == ["e1", "CREATE", "WITH", "ALTER", "e2", "e3", "INSERT"]
+        assert "events_p2024_02" in self._created(mock_db)[0]
+        assert mock_db.insert_many.call_args[1]["conflict_column"] == "event_id, timestamp"
+
+    def test_copy_mode_creates_partitions_before_merge(self, mock_db):
+        def copy_insert(table, rows, conflict_column, before_merge, on_inserted):
+            list(rows)
+            mock_db.execute_query.assert_not_called()
+            before_merge()
+            return 2, 0
+
+        mock_db.copy_insert.side_effect = copy_insert
+        importer = EventImporter(mock_db, load_mode="copy", partition_interval="day")
+
+        importer.process_entities([
+            self._event("e1", "2024-03-01T10:00:00"),
+            self._event("e2", "2024-03-02T10:00:00"),
+        ])
+
+        created = self._created(mock_db)
+        assert len(created) == 2
+        assert "events_p2024_03_01" in created[0]
+        assert "events_p2024_03_02" in created[1]
+        mock_db.commit.assert_called_once()
+
+    def test_without_interval_does_not_manage_partitions(self, mock_db):
+        mock_db.insert_many.return_value = (1, 0)
+        importer = EventImporter(mock_db)
+
+        importer.process_entities([self._event("e1", "2030-01-01T00:00:00")])
+
+        mock_db.fetch_all.assert_not_called()
+        assert all("data_version" in c[0][0] for c in mock_db.execute_query.call_args_list)
+
+
+class TestShardedEventImporter:
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.merge_staging.return_value = 5
+        db.fetch_all.return_value = []
+        db.fetch_one.return_value = (True,)
+        return db
+
+    @pytest.fixture
+    def thread_pool(self):
+        with patch.object(sharded, "ProcessPoolExecutor", ThreadPoolExecutor):
+            yield
+
+    @pytest.fixture
+    def events_file(self, tmp_path):
+        path = tmp_path / "events.ndjson"
+        path.write_text("".join(json.dumps(self._event(f"e{i}")) + "\n" for i in range(20)))
+        return path
+
+    def _event(self, event_id, device_id="d1"):
+        return {"event_id": event_id, "details": {"device_id": device_id, "timestamp": "2024-01-05T10:00:00"}}
+
+    def test_rejects_invalid_settings(self, mock_db):
+        with pytest.raises(ValueError, match="shards"):
+            ShardedEventImporter(mock_db, {}, 0)
+
+    def test_load_shard_copies_its_byte_range_with_positions(self, events_file):
+        size = events_file.stat().st_size
+        copied = []
+
+        with patch.object(sharded, "DatabaseManager") as manager:
+            manager.return_value.copy_rows.side_effect = lambda table, rows: copied.extend(rows) or len(copied)
+            rows, seconds, cpu_seconds = sharded._load_shard(
+                {}, str(events_file), "ndjson", "staging", size // 3, 2 * size // 3
+            )
+
+        lines = events_file.read_bytes().splitlines(keepends=True)
+        offsets = [sum(len(line) for line in lines[:index]) for index in range(len(lines))]
+        expected = [index for index, offset in enumerate(offsets) if size // 3 <= offset < 2 * size // 3]
+        assert [row["event_id"] for row in copied] == [f"e{index}" for index in expected]
+        assert [row["load_position"] for row in copied] == [offsets[index] for index in expected]
+        assert rows == len(expected)
+        manager.return_value.commit.assert_called_once()
+        manager.return_value.close.assert_called_once()
+
+    def test_load_shard_positions_json_array_records_by_index(self, tmp_path):
+        path = tmp_path / "events.json"
+        path.write_text(json.dumps([self._event("e1"), self._event("e2")]))
+        copied = []
+
+        with patch.object(sharded, "DatabaseManager") as manager:
+            manager.return_value.copy_rows.side_effect = lambda table, rows: copied.extend(rows) or len(copied)
+            sharded._load_shard({}, str(path), "json", "staging", 0, path.stat().st_size)
+
+        assert [(row["event_id"], row["load_position"]) for row in copied] == [("e1", 0), ("e2", 1)]
+
+    def test_import_file_gives_each_shard_its_own_range(self, mock_db, thread_pool, events_file):
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 3)
+
+        with patch.object(sharded, "_load_shard", return_value=(2, 1.0, 0.5)) as load_shard:
+            importer.import_file(str(events_file))
+
+        ranges = sorted(call.args[4:] for call in load_shard.call_args_list)
+        assert ranges[0][0] == 0 and ranges[-1][1] == events_file.stat().st_size
+        assert all(previous[1] == following[0] for previous, following in zip(ranges, ranges[1:]))
+        assert {call.args[2] for call in load_shard.call_args_list} == {"ndjson"}
+
+    def test_import_file_records_shard_metrics(self, mock_db, thread_pool, events_file):
+        registry = MetricsRegistry()
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 2)
+
+        with patch.object(sharded, "METRICS", registry), \
+                patch.object(sharded, "_load_shard", return_value=(3, 1.5, 0.5)):
+            importer.import_file(str(events_file))
+
+        stages = {stage["name"]: stage for stage in registry.summary()["stages"]}
+        assert stages["import.events.shard_1"]["rows_out"] == 3
+        assert stages["import.events.shard_1"]["wall_seconds"] == 1.5
+        assert stages["import.events"]["rows_in"] == 6
+
+    def test_import_file_loads_json_array_in_one_shard(self, mock_db, thread_pool, tmp_path, caplog):
+        path = tmp_path / "events.json"
+        path.write_text(json.dumps([self._event("e1")]))
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 3)
+
+        with patch.object(sharded, "_load_shard", return_value=(1, 1.0, 0.5)) as load_shard:
+            importer.import_file(str(path))
+
+        load_shard.assert_called_once()
+        assert load_shard.call_args.args[2] == "json"
+        assert "cannot be split" in caplog.text
+
+    def test_import_file_merges_after_all_shards(self, mock_db, thread_pool, events_file):
+        order = []
+        mock_db.execute_query.side_effect = lambda sql, params=None: order.append(sql.split()[0])
+        mock_db.merge_staging.side_effect = lambda *args, **kwargs: order.append("MERGE") or 5
+        mock_db.commit.side_effect = lambda: order.append("COMMIT")
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 3)
+
+        with patch.object(sharded, "_load_shard", side_effect=lambda *args: (order.append("shard") or 2, 1.0, 0.5)):
+            result = importer.import_file(str(events_file))
+
+        assert result == (5, 1)
+        assert order == [
+            "SELECT", "CREATE", "COMMIT", "shard", "shard", "shard", "MERGE", "DROP", "INSERT", "COMMIT", "COMMIT"
+        ]
+        assert "version + 1" in mock_db.execute_query.call_args_list[-1][0][0]
+        assert [stats["rows"] for stats in importer.shard_stats] == [2, 2, 2]
+        assert importer.shard_stats[0]["rows_per_second"] == 2.0
+        table, staging, columns, conflict, rollup = mock_db.merge_staging.call_args[0]
+        assert staging.startswith("events_load_")
+        assert "pg_advisory_lock" in mock_db.execute_query.call_args_list[0][0][0]
+        assert "load_position BIGINT NOT NULL" in mock_db.execute_query.call_args_list[1][0][0]
+        assert "pg_advisory_unlock" in mock_db.fetch_one.call_args[0][0]
+        assert mock_db.merge_staging.call_args[1]["order_by"] == "load_position"
+        assert conflict == "event_id, timestamp"
+        assert "location_brightness_daily" in rollup
+
+    def test_import_file_loads_nothing_when_a_shard_fails(self, mock_db, thread_pool, events_file):
+        def load_shard(db_params, file_path, input_format, staging, start, end):
+            if start > 0 and end < events_file.stat().st_size:
+                raise ValueError("bad timestamp")
+            return 2, 1.0, 0.5
+
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 3)
+
+        with patch.object(sharded, "_load_shard", side_effect=load_shard):
+            with pytest.raises(RuntimeError, match=r"shard\(s\) 1: bad timestamp"):
+                importer.import_file(str(events_file))
+
+        mock_db.merge_staging.assert_not_called()
+        mock_db.rollback.assert_called_once()
+        assert "DROP TABLE IF EXISTS events_load_" in mock_db.execute_query.call_args[0][0]
+
+    def test_drop_stale_staging_keeps_tables_of_running_imports(self, mock_db):
+        mock_db.fetch_all.return_value = [("events_load_dead",), ("events_load_live",)]
+        mock_db.fetch_one.side_effect = lambda sql, params: (params[0] == "events_load_dead",)
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 2)
+
+        dropped = importer.drop_stale_staging()
+
+        assert dropped == ["events_load_dead"]
+        assert mock_db.fetch_all.call_args[0][1] == ("events\\_load\\_%",)
+        drops = [c[0][0] for c in mock_db.execute_query.call_args_list if c[0][0].startswith("DROP")]
+        assert drops == ["DROP TABLE IF EXISTS events_load_dead;"]
+        unlocked = [c[0][1] for c in mock_db.fetch_one.call_args_list if "unlock" in c[0][0]]
+        assert unlocked == [("events_load_dead",)]
+
+    def test_import_file_creates_partitions_before_merge(self, mock_db, thread_pool, events_file):
+        mock_db.fetch_all.side_effect = [[], [(datetime(2024, 2, 1),)], [("events_p2024_01",)]]
+        mock_db.merge_staging.side_effect = lambda *args, **kwargs: self._assert_partition_created(mock_db) or 1
+        importer = ShardedEventImporter(mock_db, {"dbname": "test"}, 2, partition_interval="month")
+
+        with patch.object(sharded, "_load_shard", return_value=(1, 1.0, 0.5)):
+            importer.import_file(str(events_file))
+
+        mock_db.merge_staging.assert_called_once()
+
+    def _assert_partition_created(self, mock_db):
+        attached = [c[0][0] for c in mock_db.execute_query.call_args_list if "ATTACH PARTITION" in c[0][0]]
+        assert len(attached) == 1 and "events_p2024_02" in attached[0]
+
+
 class TestLocationImporter:
 
     @pytest.fixture
     def mock_db(self):
-        return Mock()
+        db = Mock()
+        db.insert_many.return_value = (0, 0)
+        db.copy_insert.return_value = (0, 0)
+        return db
 
     @pytest.fixture
     def importer(self, mock_db):
         return LocationImporter(mock_db)
 
+    @pytest.fixture
+    def loaded(self, mock_db):
+        loaded = defaultdict(list)
+
+        def capture(table, rows, **kwargs):
+            loaded[table].extend(rows)
+            return len(loaded[table]), 0
+
+        mock_db.insert_many.side_effect = capture
+        mock_db.copy_insert.side_effect = capture
+        return loaded
+
     def test_get_table_name(self, importer):
         assert importer.get_table_name() == "locations"
 
@@ -175,7 +599,7 @@ class TestLocationImporter:
         assert result["parent_location_id"] == "parent1"
         assert result["location_name"] == "Living Room"
 
-    def test_process_entities_handles_hierarchy(self, mock_db, importer):
+    def test_process_entities_handles_hierarchy(self, mock_db, importer, loaded):
         data = [
             {"location_id": "child", "parent_location_id": "parent", "location_name": "Child"},
             {"location_id": "parent", "parent_location_id": None, "location_name": "Parent"}
@@ -183,21 +607,126 @@ class TestLocationImporter:
 
         importer.process_entities(data)
 
-        calls = mock_db.insert.call_args_list
-        first_inserted = calls[0][1]["data"]["location_id"]
-        second_inserted = calls[1][1]["data"]["location_id"]
-
-        assert first_inserted == "parent"
-        assert second_inserted == "child"
+        assert [row["location_id"] for row in loaded["locations"]] == ["parent", "child"]
 
-    def test_process_entities_handles_self_reference(self, mock_db, importer):
+    def test_process_entities_handles_self_reference(self, mock_db, importer, loaded):
         data = [
             {"location_id": "loc1", "parent_location_id": "loc1", "location_name": "Self Ref"}
         ]
 
         importer.process_entities(data)
 
-        mock_db.insert.assert_called_once()
+        assert len(loaded["locations"]) == 1
+
+    def test_process_entities_copy_mode_keeps_hierarchy_order(self, mock_db, loaded):
+        importer = LocationImporter(mock_db, load_mode="copy")
+        data = [
+            {"location_id": "child", "parent_location_id": "parent", "location_name": "Child"},
+            {"location_id": "parent", "parent_location_id": None, "location_name": "Parent"}
+        ]
+
+        importer.process_entities(data)
+
+        assert [row["location_id"] for row in loaded["locations"]] == ["parent", "child"]
+        mock_db.insert_many.assert_not_called()
+
+    def test_process_entities_accepts_generator(self, mock_db, importer, loaded):
+        data = iter([
+            {"location_id": "child", "parent_location_id": "parent", "location_name": "Child"},
+            {"location_id": "parent", "parent_location_id": None, "location_name": "Parent"}
+        ])
+
+        importer.process_entities(data)
+
+        assert [row["location_id"] for row in loaded["locations"]] == ["parent", "child"]
+
+    def test_resolve_insert_order_is_breadth_first(self, importer):
+        data = [
+            {"location_id": "room", "parent_location_id": "floor"},
+            {"location_id": "floor", "parent_location_id": "building"},
+            {"location_id": "wing", "parent_location_id": "building"},
+            {"location_id": "building", "parent_location_id": None},
+        ]
+
+        ordered = importer.resolve_insert_order(data)
+
+        assert [item["location_id"] for item in ordered] == ["building", "floor", "wing", "room"]
+
+    def test_resolve_insert_order_reports_orphans(self, importer, caplog):
+        data = [
+            {"location_id": "root", "parent_location_id": None},
+            {"location_id": "orphan", "parent_location_id": "missing"},
+            {"location_id": "orphan_child", "parent_location_id": "orphan"},
+        ]
+
+        ordered = importer.resolve_insert_order(data)
+
+        assert [item["location_id"] for item in ordered] == ["root"]
+        assert "2 locations due to missing parents" in caplog.text
+        assert "orphan_child" in caplog.text
+
+    def test_resolve_insert_order_reports_cycles(self, importer, caplog):
+        data = [
+            {"location_id": "a", "parent_location_id": "b"},
+            {"location_id": "b", "parent_location_id": "a"},
+            {"location_id": "c", "parent_location_id": "a"},
+        ]
+
+        ordered = importer.resolve_insert_order(data)
+
+        assert ordered == []
+        assert "3 locations due to cycles" in caplog.text
+        assert "missing parents" not in caplog.text
+
+    def test_resolve_insert_order_handles_deep_reversed_chain(self, importer):
+        depth = 5000
+        data = [
+            {"location_id": str(i), "parent_location_id": str(i - 1) if i else None}
+            for i in reversed(range(depth))
+        ]
+
+        ordered = importer.resolve_insert_order(data)
+
+        assert [item["location_id"] for item in ordered] == [str(i) for i in range(depth)]
+
+    def test_process_entities_loads_closure_rows(self, mock_db, importer, loaded):
+        data = [
+            {"location_id": 3, "parent_location_id": 2, "location_name": "Room"},
+            {"location_id": 2, "parent_location_id": 1, "location_name": "Floor"},
+            {"location_id": 1, "parent_location_id": 1, "location_name": "Building"},
+        ]
+
+        importer.process_entities(data)
+
+        closure = {(r["ancestor_id"], r["descendant_id"]): r["depth"] for r in loaded["location_closure"]}
+        assert closure == {
+            ("1", "1"): 0,
+            ("2", "2"): 0,
+            ("1", "2"): 1,
+            ("3", "3"): 0,
+            ("2", "3"): 1,
+            ("1", "3"): 2,
+        }
+
+    def test_process_entities_loads_closure_before_commit(self, mock_db, importer, loaded):
+        data = [{"location_id": "loc1", "parent_location_id": None, "location_name": "Test"}]
+        calls = []
+        mock_db.commit.side_effect = lambda: calls.append("commit")
+        mock_db.insert_many.side_effect = lambda table, rows, **kwargs: calls.append(table) or (1, 0)
+
+        importer.process_entities(data)
+
+        assert calls == ["locations", "location_closure", "commit"]
+        closure_kwargs = mock_db.insert_many.call_args_list[1][1]
+        assert closure_kwargs["conflict_column"] == "ancestor_id, descendant_id"
+
+    def test_process_entities_bumps_data_version_for_new_closure_rows_only(self, mock_db, importer):
+        data = [{"location_id": "loc1", "parent_location_id": None, "location_name": "Test"}]
+        mock_db.insert_many.side_effect = lambda table, rows, **kwargs: (0, 1) if table == "locations" else (1, 0)
+
+        importer.process_entities(data)
+
+        assert "version + 1" in mock_db.execute_query.call_args[0][0]
 
     def test_process_entities_commits_at_end(self, mock_db, importer):
         data = [{"location_id": "loc1", "parent_location_id": None, "location_name": "Test"}]
@@ -207,7 +736,7 @@ class TestLocationImporter:
         mock_db.commit.assert_called_once()
 
     def test_process_entities_rollback_on_error(self, mock_db, importer):
-        mock_db.insert.side_effect = Exception("DB Error")
+        mock_db.insert_many.side_effect = Exception("DB Error")
         data = [{"location_id": "loc1", "parent_location_id": None, "location_name": "Test"}]
 
         with pytest.raises(Exception):
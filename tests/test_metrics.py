@@ -0,0 +1,160 @@
+import json
+import pytest
+from unittest.mock import Mock
+from scripts.exporters import JsonExporter
+from scripts.file_handler import FileHandler
+from scripts.importers.devices import DeviceImporter
+from scripts.metrics import METRICS, MetricsRegistry, StageRecord, file_size
+from scripts.queries import LeakLocationsQuery
+
+
+def _stages(registry):
+    return {stage["name"]: stage for stage in registry.summary()["stages"]}
+
+
+class TestMetricsRegistry:
+
+    @pytest.fixture
+    def registry(self):
+        return MetricsRegistry()
+
+    def test_stage_records_time_and_counters(self, registry):
+        with registry.stage("import.devices") as stage:
+            stage.rows_in = 3
+            stage.rows_out = 2
+
+        recorded = _stages(registry)["import.devices"]
+        assert recorded["calls"] == 1
+        assert recorded["rows_in"] == 3
+        assert recorded["rows_out"] == 2
+        assert recorded["wall_seconds"] >= 0
+        assert recorded["cpu_seconds"] >= 0
+
+    def test_stage_is_recorded_when_block_raises(self, registry):
+        with pytest.raises(ValueError):
+            with registry.stage("query.failing"):
+                raise ValueError("boom")
+
+        assert _stages(registry)["query.failing"]["calls"] == 1
+
+    def test_runs_of_a_stage_are_summed(self, registry):
+        for rows in (2, 5):
+            with registry.stage("export.csv") as stage:
+                stage.rows_in = rows
+                stage.bytes_written = 10
+
+        recorded = _stages(registry)["export.csv"]
+        assert recorded["calls"] == 2
+        assert recorded["rows_in"] == 7
+        assert recorded["bytes_written"] == 20
+
+    def test_track_counts_items_and_bytes(self, registry):
+        items = list(registry.track("read.events.json", iter([{"a": 1}, {"a": 2}]), bytes_read=64))
+
+        assert items == [{"a": 1}, {"a": 2}]
+        recorded = _stages(registry)["read.events.json"]
+        assert recorded["rows_out"] == 2
+        assert recorded["bytes_read"] == 64
+
+    def test_track_records_only_when_iteration_ends(self, registry):
+        items = registry.track("read.events.json", iter([1, 2, 3]))
+        next(items)
+
+        assert "read.events.json" not in _stages(registry)
+        items.close()
+        assert _stages(registry)["read.events.json"]["rows_out"] == 1
+
+    def test_record_adds_stage_measured_elsewhere(self, registry):
+        record = StageRecord("import.events.shard_0")
+        record.rows_out = 7
+
+        registry.record(record, 1.5, 0.25)
+
+        stage = _stages(registry)["import.events.shard_0"]
+        assert (stage["calls"], stage["wall_seconds"], stage["cpu_seconds"], stage["rows_out"]) == (1, 1.5, 0.25, 7)
+
+    def test_summary_includes_process_totals(self, registry):
+        summary = registry.summary()
+
+        assert summary["wall_seconds"] >= 0
+        assert summary["peak_rss_bytes"] is None or summary["peak_rss_bytes"] > 0
+        assert summary["stages"] == []
+
+    def test_reset_forgets_stages(self, registry):
+        with registry.stage("import.devices"):
+            pass
+
+        registry.reset()
+
+        assert registry.summary()["stages"] == []
+
+    def test_write_json(self, registry, tmp_path):
+        with registry.stage("query.leak_locations") as stage:
+            stage.rows_out = 4
+        path = tmp_path / "metrics" / "summary.json"
+
+        registry.write_json(str(path))
+
+        document = json.loads(path.read_text(encoding="utf-8"))
+        assert document["stages"][0]["name"] == "query.leak_locations"
+        assert document["stages"][0]["rows_out"] == 4
+
+    def test_write_prometheus(self, registry, tmp_path):
+        with registry.stage('query."odd"\\name') as stage:
+            stage.rows_out = 4
+        path = tmp_path / "metrics.prom"
+
+        registry.write_prometheus(str(path))
+
+        text = path.read_text(encoding="utf-8")
+        assert "# TYPE iot_pipeline_stage_wall_seconds gauge" in text
+        assert 'iot_pipeline_stage_rows_out{stage="query.\\"odd\\"\\\\name"} 4' in text
+
+    def test_file_size_of_missing_file_is_zero(self, tmp_path):
+        assert file_size(str(tmp_path / "missing.json")) == 0
+
+
+class TestInstrumentation:
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        METRICS.reset()
+        yield
+        METRICS.reset()
+
+    def test_iter_records_reports_read_stage(self, tmp_path):
+        path = tmp_path / "devices.ndjson"
+        path.write_text('{"device_id": "d1"}\n{"device_id": "d2"}\n', encoding="utf-8")
+
+        list(FileHandler.iter_records(str(path)))
+
+        recorded = _stages(METRICS)["read.devices.ndjson"]
+        assert recorded["rows_out"] == 2
+        assert recorded["bytes_read"] == path.stat().st_size
+
+    def test_importer_reports_rows_in_and_out(self):
+        db = Mock()
+        db.insert_many.return_value = (1, 1)
+
+        DeviceImporter(db).process_entities([{"device_id": "d1"}, {"device_id": "d1"}])
+
+        recorded = _stages(METRICS)["import.devices"]
+        assert recorded["rows_in"] == 2
+        assert recorded["rows_out"] == 1
+
+    def test_query_reports_result_rows(self):
+        db = Mock()
+        db.fetch_all.return_value = [("Kitchen",), ("Basement",)]
+
+        LeakLocationsQuery(db).execute()
+
+        assert _stages(METRICS)["query.leak_locations"]["rows_out"] == 2
+
+    def test_exporter_reports_rows_and_bytes(self, tmp_path):
+        path = tmp_path / "results.json"
+
+        JsonExporter().export({"leak_locations": [{"location_name": "Kitchen"}]}, str(path))
+
+        recorded = _stages(METRICS)["export.json"]
+        assert recorded["rows_in"] == 1
+        assert recorded["bytes_written"] == path.stat().st_size
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import Mock
+from scripts.migrations import MigrationRunner, MIGRATIONS_DIR
+
+
+class TestMigrationRunner:
+
+    @pytest.fixture
+    def migrations_dir(self, tmp_path):
+        (tmp_path / "002_second.sql").write_text("CREATE INDEX b ON t (b);")
+        (tmp_path / "001_first.sql").write_text("CREATE INDEX a ON t (a);")
+        (tmp_path / "notes.sql").write_text("-- not a migration")
+        return tmp_path
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.fetch_all.return_value = []
+        return db
+
+    def _executed(self, mock_db):
+        return [c[0][0] for c in mock_db.execute_query.call_args_list]
+
+    def test_available_lists_numbered_files_in_order(self, mock_db, migrations_dir):
+        runner = MigrationRunner(mock_db, migrations_dir)
+
+        assert [path.name for path in runner.available()] == ["001_first.sql", "002_second.sql"]
+
+    def test_applied_creates_tracking_table(self, mock_db, migrations_dir):
+        mock_db.fetch_all.return_value = [("001_first.sql",)]
+
+        applied = MigrationRunner(mock_db, migrations_dir).applied()
+
+        assert applied == {"001_first.sql"}
+        assert "CREATE TABLE IF NOT EXISTS schema_migrations" in self._executed(mock_db)[0]
+
+    def test_apply_all_runs_pending_migrations_and_records_them(self, mock_db, migrations_dir):
+        mock_db.fetch_all.return_value = [("001_first.sql",)]
+
+        applied = MigrationRunner(mock_db, migrations_dir).apply_all()
+
+        assert applied == ["002_second.sql"]
+        executed = self._executed(mock_db)
+        assert "CREATE INDEX b ON t (b);" in executed
+        assert "CREATE INDEX a ON t (a);" not in executed
+        assert mock_db.execute_query.call_args[0][1] == ("002_second.sql",)
+        assert mock_db.commit.call_count == 2
+
+    def test_apply_all_rolls_back_failed_migration(self, mock_db, migrations_dir):
+        mock_db.execute_query.side_effect = [None, RuntimeError("syntax error")]
+
+        with pytest.raises(RuntimeError):
+            MigrationRunner(mock_db, migrations_dir).apply_all()
+
+        mock_db.rollback.assert_called_once()
+        assert mock_db.commit.call_count == 1
+
+    def test_apply_all_with_nothing_pending(self, mock_db, migrations_dir):
+        mock_db.fetch_all.return_value = [("001_first.sql",), ("002_second.sql",)]
+
+        assert MigrationRunner(mock_db, migrations_dir).apply_all() == []
+
+    def test_repository_migrations_follow_naming_pattern(self, mock_db):
+        names = [path.name for path in MigrationRunner(mock_db).available()]
+
+        assert names
+        assert len(names) == len(list(MIGRATIONS_DIR.glob("*.sql")))
@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from scripts.partitions import PartitionManager
+
+
+class TestPartitionManager:
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.fetch_all.return_value = [
+            ("events_default",),
+            ("events_p2023_11",),
+            ("events_p2023_12",),
+            ("events_p2024_01",),
+        ]
+        return db
+
+    @pytest.fixture
+    def manager(self, mock_db):
+        return PartitionManager(mock_db)
+
+    def _statements(self, mock_db):
+        return [c[0][0] for c in mock_db.execute_query.call_args_list]
+
+    def test_rejects_unknown_interval(self, mock_db):
+        with pytest.raises(ValueError):
+            PartitionManager(mock_db, interval="week")
+
+    def test_monthly_bounds_and_name(self, manager):
+        start, end = manager.period_bounds(datetime(2024, 12, 31, 23, 59))
+
+        assert (start, end) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+        assert manager.partition_name(start) == "events_p2024_12"
+
+    def test_daily_bounds_and_name(self, mock_db):
+        manager = PartitionManager(mock_db, interval="day")
+
+        start, end = manager.period_bounds(datetime(2024, 2, 29, 8, 30))
+
+        assert (start, end) == (datetime(2024, 2, 29), datetime(2024, 3, 1))
+        assert manager.partition_name(start) == "events_p2024_02_29"
+
+    def test_note_ignores_existing_and_repeated_periods(self, manager, mock_db):
+        assert manager.note(datetime(2024, 1, 10)) is False
+        assert manager.note(datetime(2024, 2, 10)) is True
+        assert manager.note(datetime(2024, 2, 11)) is False
+        assert manager.note(None) is False
+        mock_db.fetch_all.assert_called_once()
+
+    def test_create_pending_moves_default_rows_then_attaches(self, manager, mock_db):
+        manager.note(datetime(2024, 2, 10))
+
+        created = manager.create_pending()
+
+        assert created == ["events_p2024_02"]
+        statements = self._statements(mock_db)
+        assert "CREATE TABLE IF NOT EXISTS events_p2024_02 (LIKE events" in statements[0]
+        assert "DELETE FROM events_default" in statements[1]
+        assert "INSERT INTO events_p2024_02" in statements[1]
+        assert "ATTACH PARTITION events_p2024_02" in statements[2]
+        assert mock_db.execute_query.call_args_list[2][0][1] == (datetime(2024, 2, 1), datetime(2024, 3, 1))
+        assert manager.note(datetime(2024, 2, 15)) is False
+
+    def test_ensure_partition_skips_existing(self, manager, mock_db):
+        assert manager.ensure_partition(datetime(2024, 1, 1)) == "events_p2024_01"
+
+        mock_db.execute_query.assert_not_called()
+
+    def test_drop_before_drops_only_expired_partitions(self, manager, mock_db):
+        dropped = manager.drop_before(datetime(2024, 1, 15))
+
+        assert dropped == ["events_p2023_11", "events_p2023_12"]
+        assert self._statements(mock_db) == ["DROP TABLE events_p2023_11;", "DROP TABLE events_p2023_12;"]
+
+    def test_drop_before_dry_run_drops_nothing(self, manager, mock_db):
+        dropped = manager.drop_before(datetime(2024, 2, 1), dry_run=True)
+
+        assert dropped == ["events_p2023_11", "events_p2023_12", "events_p2024_01"]
+        mock_db.execute_query.assert_not_called()
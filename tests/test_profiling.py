@@ -0,0 +1,96 @@
+import json
+import pytest
+from unittest.mock import Mock
+from scripts.profiling import QueryProfiler, describe_node, iter_nodes, self_time
+
+EXPLAIN = {
+    "Plan": {
+        "Node Type": "Hash Join", "Total Cost": 120.0, "Plan Rows": 1, "Actual Rows": 500,
+        "Actual Total Time": 9.0, "Actual Loops": 1, "Shared Hit Blocks": 40, "Shared Read Blocks": 2,
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "events", "Total Cost": 90.0, "Plan Rows": 480,
+             "Actual Rows": 500, "Actual Total Time": 6.0, "Actual Loops": 1,
+             "Rows Removed by Filter": 19500, "Filter": "((details ->> 'leak_detected') = 'true')"},
+            {"Node Type": "Index Scan", "Index Name": "devices_pkey", "Relation Name": "devices",
+             "Total Cost": 0.3, "Plan Rows": 1, "Actual Rows": 1, "Actual Total Time": 0.002, "Actual Loops": 500},
+        ],
+    },
+    "Planning Time": 0.4,
+    "Execution Time": 9.5,
+}
+
+
+def _query(name="leak_locations", explain=EXPLAIN):
+    query = Mock()
+    query.get_query_name.return_value = name
+    query.explain.return_value = explain
+    return query
+
+
+class TestPlanHelpers:
+
+    def test_iter_nodes_walks_depth_first(self):
+        assert [node["Node Type"] for node in iter_nodes(EXPLAIN["Plan"])] == ["Hash Join", "Seq Scan", "Index Scan"]
+
+    def test_self_time_excludes_children_and_counts_loops(self):
+        assert self_time(EXPLAIN["Plan"]) == pytest.approx(9.0 - 6.0 - 1.0)
+        assert self_time(EXPLAIN["Plan"]["Plans"][1]) == pytest.approx(1.0)
+
+    def test_describe_node_names_index_and_relation(self):
+        assert describe_node(EXPLAIN["Plan"]["Plans"][1]) == "Index Scan using devices_pkey on devices"
+        assert describe_node(EXPLAIN["Plan"]) == "Hash Join"
+
+
+class TestQueryProfiler:
+
+    @pytest.fixture
+    def profiler(self, tmp_path):
+        return QueryProfiler(str(tmp_path / "plans"))
+
+    def test_summarize_reports_times_and_buffers(self, profiler):
+        summary = profiler.summarize("leak_locations", EXPLAIN)
+
+        assert summary["execution_ms"] == 9.5
+        assert summary["planning_ms"] == 0.4
+        assert summary["shared_hit_blocks"] == 40
+        assert summary["top_nodes"][0]["node"] == "Seq Scan on events"
+        assert summary["top_nodes"][0]["self_ms"] == 6.0
+
+    def test_summarize_flags_row_estimate_mismatches(self, profiler):
+        mismatches = profiler.summarize("leak_locations", EXPLAIN)["row_estimate_mismatches"]
+
+        assert [mismatch["node"] for mismatch in mismatches] == ["Hash Join"]
+        assert mismatches[0]["estimated_rows"] == 1
+        assert mismatches[0]["actual_rows"] == 500
+
+    def test_summarize_flags_large_seq_scans(self, profiler):
+        scans = profiler.summarize("leak_locations", EXPLAIN)["large_seq_scans"]
+
+        assert scans == [{
+            "relation": "events", "rows_scanned": 20000, "rows_returned": 500,
+            "filter": "((details ->> 'leak_detected') = 'true')",
+        }]
+
+    def test_small_seq_scans_are_not_reported(self, tmp_path):
+        profiler = QueryProfiler(str(tmp_path), large_scan_rows=50000)
+
+        assert profiler.summarize("leak_locations", EXPLAIN)["large_seq_scans"] == []
+
+    def test_profile_saves_plan_file(self, profiler):
+        profiler.profile(_query())
+
+        saved = json.loads((profiler.directory / "leak_locations.json").read_text(encoding="utf-8"))
+        assert saved == EXPLAIN
+
+    def test_write_report_orders_slowest_first(self, profiler):
+        fast = dict(EXPLAIN, **{"Execution Time": 1.0})
+        summaries = [profiler.profile(_query("fast", fast)), profiler.profile(_query("slow"))]
+
+        json_path, text_path = profiler.write_report(summaries)
+
+        assert [summary["query"] for summary in json.loads(json_path.read_text(encoding="utf-8"))] == ["slow", "fast"]
+        text = text_path.read_text(encoding="utf-8")
+        assert text.startswith("slow: 9.50 ms execution")
+        assert "seq scan on events: 20000 rows read, 500 returned" in text
+        assert "Index Scan using devices_pkey on devices (1 rows x 500 loops)" in text
+        assert "estimate off 250.5x at Hash Join" in text
@@ -28,8 +28,9 @@ class TestLeafLocationsQuery:
 
     def test_get_sql_uses_left_join(self, query):
         sql = query.get_sql()
-        assert "LEFT JOIN" in sql
-        assert "WHERE sub.location_id IS NULL" in sql
+        assert "LEFT JOIN location_closure" in sql
+        assert "sub.depth = 1" in sql
+        assert "WHERE sub.descendant_id IS NULL" in sql
 
     def test_execute_returns_list_of_dicts(self, mock_db, query):
         mock_db.fetch_all.return_value = [("Kitchen",), ("Bedroom",)]
@@ -41,6 +42,51 @@ class TestLeafLocationsQuery:
             {"location_name": "Bedroom"}
         ]
 
+    def test_execute_prepares_only_when_asked(self, mock_db, query):
+        mock_db.fetch_all.return_value = []
+
+        query.execute()
+        query.execute(prepare=True)
+
+        assert [call.kwargs["prepare"] for call in mock_db.fetch_all.call_args_list] == [False, True]
+
+    def test_explain_runs_explain_analyze(self, mock_db, query):
+        mock_db.fetch_one.return_value = ([{"Plan": {"Node Type": "Hash Join"}, "Execution Time": 1.5}],)
+
+        result = query.explain()
+
+        sql = mock_db.fetch_one.call_args[0][0]
+        assert sql.startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)")
+        assert query.get_sql() in sql
+        assert result["Execution Time"] == 1.5
+
+    def test_iter_execute_streams_dicts(self, mock_db, query):
+        mock_db.iter_all.return_value = iter([("Kitchen",), ("Bedroom",)])
+
+        result = query.iter_execute(itersize=100)
+
+        assert next(result) == {"location_name": "Kitchen"}
+        assert list(result) == [{"location_name": "Bedroom"}]
+        mock_db.iter_all.assert_called_once_with(query.get_sql(), itersize=100)
+        mock_db.fetch_all.assert_not_called()
+
+    def test_iter_batches_delegates_to_db(self, mock_db, query):
+        mock_db.iter_batches.return_value = iter([(("location_name",), [("Kitchen",)])])
+
+        result = list(query.iter_batches(batch_size=10))
+
+        assert result == [(("location_name",), [("Kitchen",)])]
+        mock_db.iter_batches.assert_called_once_with(query.get_sql(), batch_size=10)
+
+    def test_copy_to_delegates_to_db(self, mock_db, query):
+        mock_db.copy_to.return_value = 3
+        output = Mock()
+
+        result = query.copy_to(output, "FORMAT csv")
+
+        assert result == 3
+        mock_db.copy_to.assert_called_once_with(query.get_sql(), output, "FORMAT csv")
+
 
 class TestLowestSublocationsQuery:
 
@@ -58,10 +104,11 @@ class TestLowestSublocationsQuery:
     def test_get_columns(self, query):
         assert query.get_columns() == ["location_name", "lowest_sublocation"]
 
-    def test_get_sql_uses_recursive_cte(self, query):
+    def test_get_sql_uses_closure_table(self, query):
         sql = query.get_sql()
-        assert "WITH RECURSIVE" in sql
-        assert "hierarchy" in sql
+        assert "location_closure" in sql
+        assert "MAX(depth)" in sql
+        assert "WITH RECURSIVE" not in sql
 
     def test_execute_maps_columns_correctly(self, mock_db, query):
         mock_db.fetch_all.return_value = [
@@ -123,9 +170,11 @@ class TestAvgBrightnessQuery:
     def test_get_columns(self, query):
         assert query.get_columns() == ["location_name", "average_brightness"]
 
-    def test_get_sql_uses_avg_and_group_by(self, query):
+    def test_get_sql_reads_brightness_rollup(self, query):
         sql = query.get_sql()
-        assert "AVG" in sql
+        assert "location_brightness_daily" in sql
+        assert "NULLIF" in sql
+        assert "events" not in sql
         assert "GROUP BY" in sql
         assert "location_name" in sql
 
@@ -216,9 +265,10 @@ class TestTopSmartLampLocationsQuery:
     def test_get_columns(self, query):
         assert query.get_columns() == ["location_name", "device_count"]
 
-    def test_get_sql_uses_count_and_limit(self, query):
+    def test_get_sql_reads_lamp_count_rollup(self, query):
         sql = query.get_sql()
-        assert "COUNT" in sql
+        assert "location_lamp_counts" in sql
+        assert "devices" not in sql
         assert "LIMIT 3" in sql
         assert "ORDER BY" in sql
         assert "DESC" in sql
@@ -0,0 +1,297 @@
+"""Query plan checks against a real PostgreSQL database.
+
+These tests are skipped unless RUN_DB_TESTS=1. They connect with the
+same DB_* environment variables as the pipeline, build the schema and
+migrations in a throwaway schema, and run EXPLAIN ANALYZE on each query
+with sequential scans disabled to prove the migration indexes are usable.
+The rollup-backed queries are compared with the raw aggregates instead.
+"""
+
+import os
+import pytest
+from datetime import datetime
+from pathlib import Path
+from config import Config
+from scripts.database import DatabaseManager
+from scripts.importers.devices import DeviceImporter
+from scripts.importers.events import EventImporter
+from scripts.importers.locations import LocationImporter
+from scripts.migrations import MigrationRunner, MIGRATIONS_DIR
+from scripts.partitions import PartitionManager
+from scripts.profiling import QueryProfiler
+from scripts.queries import (
+    LeafLocationsQuery,
+    SmartLampEventsQuery,
+    AvgBrightnessQuery,
+    LeakLocationsQuery,
+    DevicesNoEventsQuery,
+    TopSmartLampLocationsQuery
+)
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_DB_TESTS") != "1", reason="set RUN_DB_TESTS=1 to run against PostgreSQL"
+)
+
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "db" / "schema.sql"
+TEST_SCHEMA = "query_plan_check"
+TEST_SCHEMA_COMMENT = "Created by tests/test_query_plans.py; dropped after each run."
+
+
+@pytest.fixture(scope="module")
+def db():
+    db = DatabaseManager(Config.get_db_params())
+    db.connect()
+    if _test_schema_exists(db):
+        db.execute_query(f"DROP SCHEMA {TEST_SCHEMA} CASCADE;")
+    db.execute_query(f"CREATE SCHEMA {TEST_SCHEMA}; COMMENT ON SCHEMA {TEST_SCHEMA} IS %s;", (TEST_SCHEMA_COMMENT,))
+    db.execute_query(f"SET search_path TO {TEST_SCHEMA};")
+    db.execute_query(SCHEMA_FILE.read_text(encoding="utf-8"))
+    db.commit()
+    MigrationRunner(db).apply_all()
+
+    device_types = ["Smart Lamp", "Leak Sensor", "Thermostat"]
+    db.insert_many("locations", [
+        {"location_id": str(i), "parent_location_id": None, "location_name": f"Room {i}"} for i in range(20)
+    ])
+    db.insert_many("devices", [
+        {"device_id": f"d{i}", "device_type": device_types[i % 3], "device_name": f"Device {i}",
+         "location_id": str(i % 20)}
+        for i in range(300)
+    ], conflict_column="device_id", on_inserted=DeviceImporter(db).get_rollup_sql())
+    db.insert_many("events", _events(20000), conflict_column="event_id, timestamp",
+                   on_inserted=EventImporter(db).get_rollup_sql())
+    db.execute_query("ANALYZE locations; ANALYZE devices; ANALYZE events;")
+    db.commit()
+
+    yield db
+
+    db.rollback()
+    if _test_schema_exists(db):
+        db.execute_query(f"DROP SCHEMA {TEST_SCHEMA} CASCADE;")
+        db.commit()
+    db.close()
+
+
+def _test_schema_exists(db):
+    row = db.fetch_one(
+        "SELECT obj_description(oid, 'pg_namespace') FROM pg_namespace WHERE nspname = %s;", (TEST_SCHEMA,)
+    )
+    if row is None:
+        return False
+    if row[0] != TEST_SCHEMA_COMMENT:
+        raise RuntimeError(f"Schema {TEST_SCHEMA} was not created by these tests; refusing to drop it.")
+    return True
+
+
+def _events(count):
+    return [
+        {"event_id": f"e{i}", "device_id": f"d{i % 290}", "timestamp": f"2024-01-{i % 28 + 1:02d}T00:00:00",
+         "details": '{"new_status": "on", "brightness": %d}' % (i % 100) if i % 3 == 0
+         else '{"leak_detected": %s}' % ("true" if i % 50 == 1 else "false")}
+        for i in range(count)
+    ]
+
+
+def _index_names(plan):
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def _with_partition_indexes(db, indexes):
+    names = set(indexes)
+    for index in indexes:
+        rows = db.fetch_all(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s);
+            """,
+            (index,)
+        )
+        names |= {row[0] for row in rows}
+    return names
+
+
+@pytest.mark.parametrize("query_class, indexes", [
+    (SmartLampEventsQuery, {"idx_events_lamp_on"}),
+    (LeakLocationsQuery, {"idx_events_leak"}),
+    (DevicesNoEventsQuery, {"idx_events_device_id"}),
+])
+def test_query_uses_migration_indexes(db, query_class, indexes):
+    db.execute_query("SET enable_seqscan = off;")
+
+    plan = db.fetch_one(f"EXPLAIN (ANALYZE, FORMAT JSON) {query_class(db).get_sql()}")[0]
+
+    used = _index_names(plan[0]["Plan"])
+    db.rollback()
+    assert used & _with_partition_indexes(db, indexes), f"{query_class.__name__} used {sorted(used)}"
+
+
+RAW_AVG_BRIGHTNESS = """
+    SELECT locations.location_name, AVG((events.details->>'brightness')::int)
+    FROM locations
+    JOIN devices ON devices.location_id = locations.location_id
+    JOIN events ON events.device_id = devices.device_id
+    WHERE devices.device_type = 'Smart Lamp'
+    AND events.details->>'new_status' = 'on'
+    GROUP BY locations.location_name
+"""
+
+RAW_LAMP_COUNTS = """
+    SELECT l.location_name, COUNT(d.device_id)
+    FROM locations l
+    JOIN devices d ON l.location_id = d.location_id
+    WHERE d.device_type = 'Smart Lamp'
+    GROUP BY l.location_name
+"""
+
+
+def test_avg_brightness_rollup_matches_raw_events(db):
+    rollup = db.fetch_all(AvgBrightnessQuery(db).get_sql())
+
+    assert sorted(rollup) == sorted(db.fetch_all(RAW_AVG_BRIGHTNESS))
+
+
+def test_top_smart_lamp_rollup_matches_raw_devices(db):
+    rollup = db.fetch_all(TopSmartLampLocationsQuery(db).get_sql())
+    raw = dict(db.fetch_all(RAW_LAMP_COUNTS))
+
+    assert len(rollup) == 3
+    assert all(count == raw[name] for name, count in rollup)
+    assert rollup[-1][1] == sorted(raw.values())[-3]
+
+
+def test_rollups_ignore_rows_skipped_as_duplicates(db):
+    before = db.fetch_all(AvgBrightnessQuery(db).get_sql())
+
+    inserted, skipped = db.copy_insert("events", _events(300), conflict_column="event_id, timestamp",
+                                       on_inserted=EventImporter(db).get_rollup_sql())
+
+    assert (inserted, skipped) == (0, 300)
+    assert sorted(db.fetch_all(AvgBrightnessQuery(db).get_sql())) == sorted(before)
+    db.rollback()
+
+
+def test_profiler_summarizes_real_plans(db, tmp_path):
+    summary = QueryProfiler(str(tmp_path), large_scan_rows=1000).profile(DevicesNoEventsQuery(db))
+
+    assert summary["execution_ms"] > 0
+    assert summary["top_nodes"]
+    assert (tmp_path / "devices_no_events.json").exists()
+    db.rollback()
+
+
+def test_prepared_statements_match_plain_queries(db):
+    query = AvgBrightnessQuery(db)
+
+    assert sorted(query.execute(prepare=True), key=str) == sorted(query.execute(), key=str)
+    assert query.execute(prepare=True) == query.execute(prepare=True)
+
+    rows = [{"location_id": f"p{index}", "location_name": "Prepared"} for index in range(5)]
+    assert db.insert_many("locations", rows, conflict_column="location_id", page_size=2) == (5, 0)
+    db.rollback()
+    assert db.insert_many("locations", rows[:4], conflict_column="location_id", page_size=2) == (4, 0)
+    assert db.insert_many("locations", rows, conflict_column="location_id", page_size=2) == (1, 4)
+    assert db.fetch_one("SELECT COUNT(*) FROM locations WHERE location_name = 'Prepared';") == (5,)
+    db.rollback()
+
+
+def test_prepared_statements_are_bounded_per_connection(db):
+    with db.session() as session:
+        session.statement_cache_size = 2
+        session.execute_query(f"SET search_path TO {TEST_SCHEMA};")
+        for table, column in [("locations", "location_id"), ("devices", "device_id"), ("events", "event_id")]:
+            session.fetch_all(f"SELECT {column} FROM {table} LIMIT 1;", prepare=True)
+
+        assert session.fetch_one("SELECT COUNT(*) FROM pg_prepared_statements;") == (2,)
+        session.rollback()
+
+
+def test_closure_backfill_matches_importer(db):
+    db.insert_many("locations", [
+        {"location_id": "b0", "parent_location_id": None, "location_name": "Building"},
+        {"location_id": "b1", "parent_location_id": "b0", "location_name": "Floor"},
+        {"location_id": "b2", "parent_location_id": "b1", "location_name": "Room"},
+    ])
+    expected = {
+        (row["ancestor_id"], row["descendant_id"], row["depth"])
+        for row in LocationImporter(db).iter_closure_rows([
+            {"location_id": "b0"}, {"location_id": "b1", "parent_location_id": "b0"},
+            {"location_id": "b2", "parent_location_id": "b1"},
+        ])
+    }
+
+    db.execute_query((MIGRATIONS_DIR / "004_location_closure_backfill.sql").read_text(encoding="utf-8"))
+
+    rows = set(db.fetch_all(
+        "SELECT ancestor_id, descendant_id, depth FROM location_closure WHERE descendant_id LIKE 'b%';"
+    ))
+    assert rows == expected
+    leaves = {row["location_name"] for row in LeafLocationsQuery(db).execute()}
+    assert "Room" in leaves and "Floor" not in leaves
+    db.rollback()
+
+
+def test_lamp_index_accepts_non_integer_brightness(db):
+    rollup = "SELECT brightness_sum, brightness_count FROM location_brightness_daily " \
+             "WHERE location_id = '0' AND day = '2024-01-05';"
+    before = db.fetch_one(rollup)
+    db.insert_many("events", [
+        {"event_id": "odd-brightness", "device_id": "d0", "timestamp": "2024-01-05T00:00:00",
+         "details": '{"new_status": "on", "brightness": "high"}'},
+    ], conflict_column="event_id, timestamp", on_inserted=EventImporter(db).get_rollup_sql())
+
+    assert db.fetch_one("SELECT COUNT(*) FROM events WHERE event_id = 'odd-brightness';") == (1,)
+    assert db.fetch_one(rollup) == before
+    db.rollback()
+
+
+def test_partition_migration_converts_plain_events_table(db):
+    db.execute_query("CREATE SCHEMA legacy_events_check; SET search_path TO legacy_events_check;")
+    db.execute_query("""
+        CREATE TABLE devices (device_id VARCHAR(50) PRIMARY KEY);
+        CREATE TABLE events (
+            event_id VARCHAR(50) PRIMARY KEY,
+            device_id VARCHAR(50) REFERENCES devices(device_id),
+            timestamp TIMESTAMP,
+            details JSONB
+        );
+        CREATE INDEX idx_events_device_id ON events (device_id);
+        INSERT INTO devices VALUES ('d1');
+        INSERT INTO events VALUES ('e1', 'd1', '2024-01-02', '{}'), ('e2', 'd1', '2024-02-03', '{}');
+    """)
+
+    db.execute_query((MIGRATIONS_DIR / "006_partition_events.sql").read_text(encoding="utf-8"))
+
+    assert db.fetch_one("SELECT relkind FROM pg_class WHERE oid = 'events'::regclass;") == ("p",)
+    assert db.fetch_one("SELECT COUNT(*) FROM events_default;") == (2,)
+    PartitionManager(db).ensure_partition(datetime(2024, 1, 1))
+    assert db.fetch_all("SELECT event_id FROM events_p2024_01;") == [("e1",)]
+    db.rollback()
+    db.execute_query(f"SET search_path TO {TEST_SCHEMA};")
+
+
+def test_event_id_stays_unique_across_timestamps(db):
+    before = db.fetch_all(AvgBrightnessQuery(db).get_sql())
+    redelivered = [dict(event, timestamp="2024-03-15T00:00:00") for event in _events(30)]
+
+    inserted, skipped = db.insert_many("events", redelivered, conflict_column="event_id, timestamp",
+                                       on_inserted=EventImporter(db).get_rollup_sql())
+
+    assert (inserted, skipped) == (0, 30)
+    assert db.fetch_one("SELECT COUNT(*) FROM events WHERE event_id = 'e0';") == (1,)
+    assert sorted(db.fetch_all(AvgBrightnessQuery(db).get_sql())) == sorted(before)
+    db.rollback()
+
+
+def test_watermark_migration_creates_missing_table(db):
+    db.execute_query("DROP TABLE ingest_watermarks;")
+
+    db.execute_query((MIGRATIONS_DIR / "008_ingest_watermarks.sql").read_text(encoding="utf-8"))
+
+    assert db.fetch_one("SELECT to_regclass('ingest_watermarks') IS NOT NULL;") == (True,)
+    db.execute_query((MIGRATIONS_DIR / "008_ingest_watermarks.sql").read_text(encoding="utf-8"))
+    db.rollback()
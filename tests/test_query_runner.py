@@ -1,4 +1,6 @@
+import time
 import pytest
+from contextlib import contextmanager
 from unittest.mock import Mock
 from scripts.query_runner import QueryRunner
 
@@ -97,3 +99,228 @@ class TestQueryRunner:
         assert "query_0" in results
         assert "query_1" in results
         assert "query_2" in results
+
+
+class TestQueryRunnerCache:
+
+    @pytest.fixture
+    def mock_db(self):
+        db = Mock()
+        db.fetch_one.return_value = (5,)
+        return db
+
+    def _query_class(self, name, rows):
+        query_class = Mock()
+        query_class.return_value.get_query_name.return_value = name
+        query_class.return_value.execute.return_value = rows
+        return query_class
+
+    def test_run_all_goes_through_cache_at_current_version(self, mock_db):
+        cache = Mock()
+        cache.execute.side_effect = lambda query, version: [{"cached": version}]
+        runner = QueryRunner(mock_db, Mock(), cache=cache)
+        query_class = self._query_class("q", [{"fresh": True}])
+
+        runner.run_all([query_class], "output.json")
+
+        assert runner.exporter.export.call_args[0][0] == {"q": [{"cached": 5}]}
+        query_class.return_value.execute.assert_not_called()
+        mock_db.fetch_one.assert_called_once()
+
+    def test_run_all_without_cache_skips_version_lookup(self, mock_db):
+        runner = QueryRunner(mock_db, Mock())
+
+        runner.run_all([self._query_class("q", [])], "output.json")
+
+        mock_db.fetch_one.assert_not_called()
+
+    def test_parallel_run_all_answers_hits_without_a_session(self, mock_db):
+        mock_db.session = Mock()
+        cache = Mock()
+        cache.lookup.side_effect = lambda query, version: [{"version": version}]
+        runner = QueryRunner(mock_db, Mock(), workers=2, cache=cache)
+
+        runner.run_all([self._query_class("a", []), self._query_class("b", [])], "output.json")
+
+        assert runner.exporter.export.call_args[0][0] == {"a": [{"version": 5}], "b": [{"version": 5}]}
+        mock_db.session.assert_not_called()
+
+    def test_parallel_run_all_stores_misses(self, mock_db):
+        @contextmanager
+        def session():
+            yield Mock()
+
+        mock_db.session = session
+        cache = Mock()
+        cache.lookup.return_value = None
+        cache.key.side_effect = lambda query, version: f"{query.get_query_name()}-{version}"
+        runner = QueryRunner(mock_db, Mock(), workers=2, cache=cache)
+
+        runner.run_all([self._query_class("a", [{"x": 1}]), self._query_class("b", [])], "output.json")
+
+        assert runner.exporter.export.call_args[0][0] == {"a": [{"x": 1}], "b": []}
+        stored = sorted(call.args for call in cache.put.call_args_list)
+        assert stored == [("a-5", [{"x": 1}]), ("b-5", [])]
+
+
+class TestQueryRunnerStream:
+
+    def test_stream_all_passes_lazy_sections_to_exporter(self):
+        mock_db = Mock()
+        mock_exporter = Mock()
+        runner = QueryRunner(mock_db, mock_exporter)
+        query_class = Mock()
+        query_class.return_value.get_query_name.return_value = "events"
+        query_class.return_value.iter_execute.return_value = iter([{"event_id": "e1"}])
+        captured = {}
+        mock_exporter.export_stream.side_effect = lambda sections, path: captured.update(
+            {name: list(rows) for name, rows in sections}
+        )
+
+        runner.stream_all([query_class], "output.xml", itersize=50)
+
+        assert captured == {"events": [{"event_id": "e1"}]}
+        query_class.assert_called_once_with(mock_db)
+        query_class.return_value.iter_execute.assert_called_once_with(50)
+        mock_exporter.export.assert_not_called()
+
+    def test_stream_all_defers_query_execution(self):
+        mock_exporter = Mock()
+        runner = QueryRunner(Mock(), mock_exporter)
+        query_class = Mock()
+
+        runner.stream_all([query_class], "output.xml")
+
+        query_class.assert_not_called()
+
+
+class TestQueryRunnerExportEach:
+
+    def test_export_each_writes_one_file_per_query(self):
+        mock_db = Mock()
+        mock_exporter = Mock()
+        mock_exporter.export_query.side_effect = (
+            lambda query, output_dir: f"{output_dir}/{query.get_query_name()}.parquet"
+        )
+        runner = QueryRunner(mock_db, mock_exporter)
+        queries = [Mock(), Mock()]
+        queries[0].return_value.get_query_name.return_value = "q1"
+        queries[1].return_value.get_query_name.return_value = "q2"
+
+        paths = runner.export_each(queries, "output/parquet")
+
+        assert paths == ["output/parquet/q1.parquet", "output/parquet/q2.parquet"]
+        queries[0].assert_called_once_with(mock_db)
+        mock_exporter.export.assert_not_called()
+
+
+class TestQueryRunnerProfile:
+
+    def test_profile_all_profiles_each_query_and_writes_report(self):
+        mock_db = Mock()
+        profiler = Mock()
+        profiler.profile.side_effect = lambda query: {"query": query.get_query_name()}
+        runner = QueryRunner(mock_db, Mock())
+        queries = [Mock(), Mock()]
+        queries[0].return_value.get_query_name.return_value = "q1"
+        queries[1].return_value.get_query_name.return_value = "q2"
+
+        summaries = runner.profile_all(queries, profiler)
+
+        assert summaries == [{"query": "q1"}, {"query": "q2"}]
+        queries[0].assert_called_once_with(mock_db)
+        profiler.write_report.assert_called_once_with(summaries)
+
+
+class TestQueryRunnerParallel:
+
+    @pytest.fixture
+    def sessions(self):
+        return []
+
+    @pytest.fixture
+    def mock_db(self, sessions):
+        db = Mock()
+
+        @contextmanager
+        def session():
+            session_db = Mock()
+            sessions.append(session_db)
+            yield session_db
+            session_db.closed = True
+
+        db.session.side_effect = session
+        return db
+
+    @pytest.fixture
+    def mock_exporter(self):
+        return Mock()
+
+    @pytest.fixture
+    def runner(self, mock_db, mock_exporter):
+        return QueryRunner(mock_db, mock_exporter, workers=3)
+
+    def _make_query(self, name, delay=0.0):
+        query_class = Mock()
+        query_instance = Mock()
+        query_class.return_value = query_instance
+        query_instance.get_query_name.return_value = name
+
+        def execute():
+            time.sleep(delay)
+            return [{"name": name}]
+
+        query_instance.execute.side_effect = execute
+        return query_class
+
+    def test_parallel_results_keep_query_order(self, runner, mock_exporter):
+        queries = [
+            self._make_query("slow", delay=0.05),
+            self._make_query("medium", delay=0.02),
+            self._make_query("fast"),
+        ]
+
+        runner.run_all(queries, "output.json")
+
+        results = mock_exporter.export.call_args[0][0]
+        assert list(results) == ["slow", "medium", "fast"]
+        assert results["slow"] == [{"name": "slow"}]
+
+    def test_parallel_uses_dedicated_sessions(self, runner, mock_db, sessions):
+        queries = [self._make_query("q1"), self._make_query("q2")]
+
+        runner.run_all(queries, "output.json")
+
+        assert mock_db.session.call_count == 2
+        assert all(session.closed is True for session in sessions)
+        called_with = {q.call_args[0][0] for q in queries}
+        assert called_with == set(sessions)
+
+    def test_parallel_releases_session_when_query_fails(self, runner, sessions):
+        failing = self._make_query("broken")
+        failing.return_value.execute.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            runner.run_all([failing, self._make_query("ok")], "output.json")
+
+        assert len(sessions) == 2
+
+    def test_single_worker_uses_shared_connection(self, mock_db, mock_exporter):
+        runner = QueryRunner(mock_db, mock_exporter, workers=1)
+        query_class = self._make_query("q1")
+
+        runner.run_all([query_class, self._make_query("q2")], "output.json")
+
+        mock_db.session.assert_not_called()
+        query_class.assert_called_once_with(mock_db)
+
+    def test_parallel_export_each_uses_dedicated_sessions(self, runner, mock_db, mock_exporter, sessions):
+        queries = [self._make_query("q1"), self._make_query("q2")]
+        mock_exporter.export_query.side_effect = lambda query, output_dir: query.get_query_name()
+
+        paths = runner.export_each(queries, "output/parquet")
+
+        assert paths == ["q1", "q2"]
+        assert mock_db.session.call_count == 2
+        called_with = {q.call_args[0][0] for q in queries}
+        assert called_with == set(sessions)
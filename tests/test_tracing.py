@@ -0,0 +1,102 @@
+import logging
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from scripts.database import DatabaseManager
+from scripts.tracing import DataTracer
+
+
+class Unformattable:
+
+    def __repr__(self):
+        raise AssertionError("row was formatted")
+
+    __str__ = __repr__
+
+
+class TestDataTracer:
+
+    @pytest.fixture
+    def tracer(self):
+        tracer = DataTracer("tests.tracing", sample_every=3)
+        tracer.configure(3)
+        yield tracer
+        tracer.configure(3, logging.NOTSET)
+
+    def test_disabled_tracer_formats_nothing(self, caplog):
+        tracer = DataTracer("tests.tracing.off", sample_every=1)
+        tracer.logger.setLevel(logging.INFO)
+
+        tracer.row("events", {"details": Unformattable()})
+        tracer.rows("events", [Unformattable()])
+        tracer.query("Fetched", Unformattable(), 1)
+
+        assert not tracer.enabled()
+        assert caplog.records == []
+
+    def test_rows_are_sampled_per_table(self, tracer, caplog):
+        with caplog.at_level(logging.DEBUG, logger="tests.tracing"):
+            for index in range(7):
+                tracer.row("events", {"event_id": index})
+            tracer.row("devices", {"device_id": "d1"})
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages == [
+            "Row 1 of events: {'event_id': 0}",
+            "Row 4 of events: {'event_id': 3}",
+            "Row 7 of events: {'event_id': 6}",
+            "Row 1 of devices: {'device_id': 'd1'}",
+        ]
+
+    def test_sampling_continues_across_batches(self, tracer, caplog):
+        with caplog.at_level(logging.DEBUG, logger="tests.tracing"):
+            tracer.rows("events", [1, 2])
+            tracer.rows("events", [3, 4, 5, 6, 7])
+
+        assert [record.args[0] for record in caplog.records] == [1, 4, 7]
+
+    def test_zero_sample_interval_traces_no_rows(self, tracer, caplog):
+        tracer.configure(0)
+
+        with caplog.at_level(logging.DEBUG, logger="tests.tracing"):
+            tracer.rows("events", [Unformattable()])
+
+        assert caplog.records == []
+
+    def test_batch_summary(self, tracer, caplog):
+        with caplog.at_level(logging.DEBUG, logger="tests.tracing"):
+            tracer.batch("insert_many", "events", 10, 8)
+
+        assert caplog.records[0].getMessage() == "insert_many into events: 10 rows, 8 inserted, 2 skipped in 0.000s"
+
+    def test_query_with_row_count(self, tracer, caplog):
+        with caplog.at_level(logging.DEBUG, logger="tests.tracing"):
+            tracer.query("Fetched", "SELECT 1;", 1)
+
+        assert caplog.records[0].getMessage() == "Fetched 1 rows for query: SELECT 1;"
+
+
+class TestDatabaseManagerTracing:
+
+    @pytest.fixture
+    def connected_db(self):
+        db = DatabaseManager({"host": "localhost"}, statement_cache_size=0)
+        db.conn = MagicMock()
+        return db
+
+    def test_insert_does_not_format_row_when_tracing_is_off(self, connected_db):
+        connected_db.insert("events", {"event_id": "e1", "details": Unformattable()})
+
+        connected_db.conn.cursor.return_value.__enter__.return_value.execute.assert_called_once()
+
+    def test_insert_many_reports_pages_to_tracer(self, connected_db):
+        rows = [{"event_id": "e1"}, {"event_id": "e2"}, {"event_id": "e3"}]
+
+        with patch("scripts.database.execute_values", side_effect=[[(1,), (1,)], []]), \
+                patch("scripts.database.TRACE", Mock()) as trace:
+            connected_db.insert_many("events", rows, page_size=2)
+
+        assert trace.rows.call_count == 2
+        assert [call.args[:4] for call in trace.batch.call_args_list] == [
+            ("insert_many", "events", 2, 2),
+            ("insert_many", "events", 1, 0),
+        ]